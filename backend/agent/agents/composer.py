@@ -3,7 +3,7 @@
 import sys
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 
 # Handle both module and direct execution contexts
 current_dir = Path(__file__).parent.parent
@@ -11,7 +11,7 @@ if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
 from models import GenerationSpec
-from llm_client import llm_client
+from llm_client import llm_client, stream_to_callback
 from prompts.system_prompts import COMPOSER_SYSTEM_PROMPT
 from prompts.templates import COMPOSER_PROMPT_TEMPLATE
 
@@ -63,7 +63,13 @@ class ComposerAgent:
 
         return response.strip()
 
-    async def compose_draft(self, topic: str, retriever_output: Dict[str, Any], spec: GenerationSpec) -> Dict[str, Any]:
+    async def compose_draft(
+        self,
+        topic: str,
+        retriever_output: Dict[str, Any],
+        spec: GenerationSpec,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
         """
         Create an initial blog post draft based on retriever context.
 
@@ -71,6 +77,7 @@ class ComposerAgent:
             topic: The blog post topic
             retriever_output: Output from the Retriever agent
             spec: Generation specifications
+            on_delta: Optional coroutine called with each streamed chunk of the draft
 
         Returns:
             Dictionary containing the draft content and metadata
@@ -107,10 +114,16 @@ class ComposerAgent:
             )
 
             # Generate the draft content (body only, frontmatter will be added later)
-            response = await self.llm_client.chat([
+            messages = [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt}
-            ], temperature=0.7)  # Higher temperature for creative writing
+            ]
+            if on_delta:
+                response = await stream_to_callback(
+                    self.llm_client.stream_chat(messages, temperature=0.7, route="composer"), on_delta
+                )
+            else:
+                response = await self.llm_client.chat(messages, temperature=0.7, route="composer")  # Higher temperature for creative writing
 
             # Clean the response to remove any accidental frontmatter
             full_content = self._clean_frontmatter_from_response(response)
@@ -11,8 +11,9 @@ current_dir = Path(__file__).parent.parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
-from models import GenerationSpec, ValidationResult
-from llm_client import llm_client
+from models import GenerationSpec, ValidationResult, EvaluationVerdict
+from llm_client import llm_client, StructuredOutputError
+from config import config
 from prompts.system_prompts import EVALUATOR_SYSTEM_PROMPT
 from prompts.templates import EVALUATOR_PROMPT_TEMPLATE
 from utils.validator import validate_generation_spec
@@ -23,6 +24,10 @@ logger = logging.getLogger(__name__)
 class EvaluatorAgent:
     """Agent responsible for evaluating blog post quality and providing approval."""
 
+    # The prompt asks for the Vietnamese verdicts; accept both languages
+    APPROVED_VERDICTS = ('APPROVED', 'PHÊ DUYỆT')
+    REJECTED_VERDICTS = ('REJECTED', 'TỪ CHỐI')
+
     def __init__(self, llm_client_instance=None):
         self.llm_client = llm_client_instance or llm_client
         self.system_prompt = EVALUATOR_SYSTEM_PROMPT
@@ -59,13 +64,20 @@ class EvaluatorAgent:
                 current_words=draft.get('word_count', 0)
             )
 
-            response = await self.llm_client.chat([
+            messages = [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt}
-            ], temperature=0.1)  # Low temperature for consistent evaluation
+            ]
+
+            if config.llm_structured_output != "off":
+                evaluation = await self._structured_evaluation(messages, basic_checks)
+            else:
+                response = await self.llm_client.chat(
+                    messages, temperature=0.1, use_cache=True, route="evaluator"
+                )  # Low temperature for consistent evaluation
 
-            # Parse evaluation response
-            evaluation = self._parse_evaluation_response(response)
+                # Parse evaluation response
+                evaluation = self._parse_evaluation_response(response)
 
             result = {
                 "approved": evaluation['approved'],
@@ -147,16 +159,35 @@ class EvaluatorAgent:
         lines = content.strip().split('\n')
         return len(lines) >= 3 and lines[0] == '---' and '---' in lines[1:]
 
+    async def _structured_evaluation(self, messages: List[Dict[str, str]], basic_checks: Dict[str, Any]) -> Dict[str, Any]:
+        """Get the LLM verdict as validated JSON; an unreadable verdict never approves."""
+        try:
+            verdict = await self.llm_client.chat_structured(
+                messages, EvaluationVerdict, temperature=0.1, use_cache=True, route="evaluator"
+            )
+        except StructuredOutputError as e:
+            # The model may have answered with a plain-text verdict instead of JSON
+            raw = (e.raw or "").strip()
+            if raw.upper().startswith(self.APPROVED_VERDICTS + self.REJECTED_VERDICTS):
+                logger.warning(f"Unreadable evaluation verdict, using its text: {e}")
+                return self._parse_evaluation_response(raw)
+            logger.warning(f"Unreadable evaluation verdict, rejecting the draft: {e}")
+            return {
+                "approved": False,
+                "feedback": f"LLM verdict unavailable; basic checks: {basic_checks['feedback']}"
+            }
+        return verdict.model_dump()
+
     def _parse_evaluation_response(self, response: str) -> Dict[str, Any]:
         """Parse the LLM evaluation response."""
         response_upper = response.upper()
 
-        if response_upper.startswith('APPROVED'):
+        if response_upper.startswith(self.APPROVED_VERDICTS):
             return {
                 "approved": True,
                 "feedback": "Content meets quality standards"
             }
-        elif response_upper.startswith('REJECTED'):
+        elif response_upper.startswith(self.REJECTED_VERDICTS):
             # Extract feedback after "REJECTED"
             feedback = response.split('\n', 1)[1] if '\n' in response else "Content needs improvement"
             return {
@@ -3,7 +3,7 @@
 import sys
 import logging
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 
 # Handle both module and direct execution contexts
 current_dir = Path(__file__).parent.parent
@@ -11,7 +11,7 @@ if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
 from models import GenerationSpec
-from llm_client import llm_client
+from llm_client import llm_client, stream_to_callback
 from prompts.system_prompts import REFFINER_SYSTEM_PROMPT
 from prompts.templates import REFINER_PROMPT_TEMPLATE
 
@@ -25,7 +25,13 @@ class RefinerAgent:
         self.llm_client = llm_client_instance or llm_client
         self.system_prompt = REFFINER_SYSTEM_PROMPT
 
-    async def refine_draft(self, draft: Dict[str, Any], spec: GenerationSpec, feedback: str = None) -> Dict[str, Any]:
+    async def refine_draft(
+        self,
+        draft: Dict[str, Any],
+        spec: GenerationSpec,
+        feedback: str = None,
+        on_delta: Optional[Callable[[str], Awaitable[None]]] = None
+    ) -> Dict[str, Any]:
         """
         Refine the blog post draft to improve quality and engagement.
 
@@ -33,6 +39,7 @@ class RefinerAgent:
             draft: Current draft content and metadata
             spec: Generation specifications
             feedback: Optional feedback from evaluator for targeted improvements
+            on_delta: Optional coroutine called with each streamed chunk of the refined draft
 
         Returns:
             Refined draft with improvements
@@ -71,10 +78,16 @@ class RefinerAgent:
                 prompt += f"\n\nIMPORTANT: Stay within {spec.min_words}-{spec.max_words} word range. Make improvements while respecting word count limits and maintaining the original structure."
 
             # Refine the content body only
-            response = await self.llm_client.chat([
+            messages = [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt}
-            ], temperature=0.3)  # Lower temperature for more controlled refinement
+            ]
+            if on_delta:
+                response = await stream_to_callback(
+                    self.llm_client.stream_chat(messages, temperature=0.3, route="refiner"), on_delta
+                )
+            else:
+                response = await self.llm_client.chat(messages, temperature=0.3, route="refiner")  # Lower temperature for more controlled refinement
 
             # Combine frontmatter back with refined content
             full_content = frontmatter + response if frontmatter else response
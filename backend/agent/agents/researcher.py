@@ -12,7 +12,7 @@ current_dir = Path(__file__).parent.parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
-from models import ResearchBrief, Document
+from models import ResearchBrief, ResearchAnalysis, Document
 from llm_client import llm_client
 from retrieval import gather_context_for_topic
 from config import config
@@ -88,14 +88,22 @@ class ResearcherAgent:
         prompt = render_researcher_prompt(topic, context_text, spec)
 
         try:
-            # Get LLM analysis
-            response = await self.llm_client.chat([
+            messages = [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": prompt}
-            ], temperature=0.3)
-
-            # Parse LLM response into structured brief
-            enhanced_brief = self._parse_llm_research_response(response)
+            ]
+
+            if config.llm_structured_output != "off":
+                analysis = await self.llm_client.chat_structured(
+                    messages, ResearchAnalysis, temperature=0.3, route="researcher"
+                )
+                enhanced_brief = self._ensure_minimum_brief(analysis.to_brief())
+            else:
+                # Get LLM analysis
+                response = await self.llm_client.chat(messages, temperature=0.3, route="researcher")
+
+                # Parse LLM response into structured brief
+                enhanced_brief = self._parse_llm_research_response(response)
             enhanced_brief.context_documents = context_docs  # Preserve context docs
 
             return enhanced_brief
@@ -143,7 +151,10 @@ class ResearcherAgent:
                 elif current_section == 'focus':
                     brief.recommended_focus.append(content)
 
-        # Ensure we have at least basic content
+        return self._ensure_minimum_brief(brief)
+
+    def _ensure_minimum_brief(self, brief: ResearchBrief) -> ResearchBrief:
+        """Ensure we have at least basic content."""
         if not brief.key_themes:
             brief.key_themes = ["Topic research in progress"]
         if not brief.recommended_focus:
@@ -10,9 +10,9 @@ current_dir = Path(__file__).parent.parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
-from models import Document, GenerationSpec
+from models import Document, GenerationSpec, RetrieverSynthesis
 from llm_client import llm_client
-from retrieval import retrieve_relevant_context, assemble_context_window
+from retrieval import retrieve_relevant_context, compress_context, assemble_context_window
 from config import config
 from prompts.system_prompts import RETRIEVER_SYSTEM_PROMPT
 from prompts.templates import RETRIEVER_PROMPT_TEMPLATE
@@ -32,7 +32,8 @@ class RetrieverAgent:
         Search the entire ingested knowledge base and synthesize relevant context.
 
         Retrieves from all sources: blog posts, RSS articles, and any other ingested content
-        to provide comprehensive context for blog post generation.
+        to provide comprehensive context for blog post generation, unless the spec narrows
+        the search to recent chunks or some source types.
 
         Args:
             topic: The search topic
@@ -49,7 +50,9 @@ class RetrieverAgent:
             context_docs = await retrieve_relevant_context(
                 topic,
                 top_k=top_k,
-                expand_queries=True
+                expand_queries=True,
+                max_age_days=spec.context_max_age_days,
+                source_types=spec.context_source_types
             )
 
             if not context_docs:
@@ -69,8 +72,12 @@ class RetrieverAgent:
 
             logger.info(f"Retrieved context from {len(context_docs)} documents spanning {len(sources)} sources: {', '.join(list(sources)[:5])}{'...' if len(sources) > 5 else ''}")
 
+            # Keep only the sentences relevant to the topic
+            if config.compression_enabled:
+                context_docs = await compress_context(topic, context_docs, route="retriever_synthesis")
+
             # Assemble context window
-            context_window = await assemble_context_window(context_docs, max_tokens=2000)
+            context_window = await assemble_context_window(context_docs, max_tokens=2000, route="retriever_synthesis")
 
             # Synthesize summary and key excerpts
             synthesis_prompt = RETRIEVER_PROMPT_TEMPLATE.substitute(
@@ -79,13 +86,22 @@ class RetrieverAgent:
                 excerpt_limit=5
             )
 
-            response = await self.llm_client.chat([
+            messages = [
                 {"role": "system", "content": self.system_prompt},
                 {"role": "user", "content": synthesis_prompt}
-            ], temperature=0.2)
-
-            # Parse response into summary and excerpts
-            parsed = self._parse_synthesis_response(response)
+            ]
+
+            if config.llm_structured_output != "off":
+                synthesis = await self.llm_client.chat_structured(
+                    messages, RetrieverSynthesis, temperature=0.2, use_cache=True, route="retriever_synthesis"
+                )
+                parsed = {"summary": synthesis.summary, "excerpts": synthesis.excerpts[:5]}
+            else:
+                response = await self.llm_client.chat(
+                    messages, temperature=0.2, use_cache=True, route="retriever_synthesis"
+                )
+                # Parse response into summary and excerpts
+                parsed = self._parse_synthesis_response(response)
 
             return {
                 "summary": parsed["summary"],
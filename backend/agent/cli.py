@@ -201,11 +201,15 @@ def generate(topic, style, length, categories, tags, keywords, tone, interactive
 @cli.command()
 @click.argument('query', required=True)
 @click.option('--top-k', '-k', default=5, help='Number of results to return')
-def search(query, top_k):
+@click.option('--days', type=int, help='Only search content published within this many days')
+@click.option('--source-type', multiple=True, help='Only search this source type (blog_post, rss_feed); repeatable')
+def search(query, top_k, days, source_type):
     """Search the knowledge base for relevant content."""
     with console.status(f"[bold green]Searching for '{query}'...", spinner="dots"):
         try:
-            results = search_knowledge_base(query, top_k=top_k)
+            results = search_knowledge_base(
+                query, top_k=top_k, max_age_days=days, source_types=list(source_type) or None
+            )
 
             if not results:
                 console.print("[yellow]No results found.[/yellow]")
@@ -0,0 +1,172 @@
+"""
+Sentence-level compression of retrieved chunks.
+
+A chunk is retrieved because part of it matches the topic, but the whole
+chunk goes into the synthesis prompt. ``compress_documents`` splits the
+selected chunks into sentences, embeds all of them in one batch and scores
+each against the query embeddings (the best cosine similarity over the
+topic and its expansions). A sentence is kept when its score reaches
+``compression_threshold``, together with ``compression_neighbours``
+sentences on each side so the kept text still reads coherently. Each
+chunk keeps at least its best sentence; short chunks are kept whole.
+
+The token counts before and after are recorded with the job's usage
+tracker, which reports the compression ratio.
+"""
+
+import re
+import sys
+import logging
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .models import Document
+    from .embeddings import Embedder, embedder as default_embedder
+    from .tokenizer import count_tokens
+    from .llm_metrics import record_compression
+except ImportError:
+    from config import config
+    from models import Document
+    from embeddings import Embedder, embedder as default_embedder
+    from tokenizer import count_tokens
+    from llm_metrics import record_compression
+
+logger = logging.getLogger(__name__)
+
+# Sentence ends (including the Vietnamese/Unicode ellipsis) followed by whitespace, or line breaks
+_SENTENCE_BOUNDARY = re.compile(r"(?<=[.!?…])\s+|\s*\n+\s*")
+# Marks the text left out between two kept spans of a chunk
+GAP = " [...] "
+
+
+def split_sentences(text: str) -> List[str]:
+    """Split a chunk into sentences, treating each markdown line (heading, list item) as one."""
+    return [sentence for sentence in _SENTENCE_BOUNDARY.split(text.strip()) if sentence]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.maximum(norms, 1e-12)
+
+
+def _kept(scores: np.ndarray, threshold: float, neighbours: int) -> np.ndarray:
+    """Mask of the sentences to keep: those at the threshold (at least the best one) and their neighbours."""
+    selected = scores >= threshold
+    if not selected.any():
+        selected[int(np.argmax(scores))] = True
+    # Widen every selected sentence by the neighbour window
+    kept = selected.copy()
+    for offset in range(1, neighbours + 1):
+        kept[offset:] |= selected[:-offset]
+        kept[:-offset] |= selected[offset:]
+    return kept
+
+
+def _join(sentences: List[str], kept: np.ndarray) -> str:
+    parts, previous = [], None
+    for i in np.flatnonzero(kept).tolist():
+        if previous is not None and i != previous + 1:
+            parts.append(GAP)
+        elif previous is not None:
+            parts.append(" ")
+        parts.append(sentences[i])
+        previous = i
+    text = "".join(parts)
+    # Say so when the chunk's opening or ending was cut as well
+    if not kept[0]:
+        text = GAP.lstrip() + text
+    if not kept[-1]:
+        text = text + GAP.rstrip()
+    return text
+
+
+class CompressionResult:
+    """Compressed chunks and their size before and after."""
+
+    def __init__(self, documents: List[Document], tokens: int, compressed_tokens: int, sentences: int, kept: int):
+        self.documents = documents
+        self.tokens = tokens
+        self.compressed_tokens = compressed_tokens
+        self.sentences = sentences
+        self.kept = kept
+
+    @property
+    def ratio(self) -> float:
+        """Compressed size over original size, in tokens (1.0 when nothing was removed)."""
+        return self.compressed_tokens / self.tokens if self.tokens else 1.0
+
+
+def compress_documents(
+    queries: List[str],
+    documents: List[Document],
+    threshold: Optional[float] = None,
+    neighbours: Optional[int] = None,
+    model: Optional[str] = None,
+    embedder: Optional[Embedder] = None,
+) -> CompressionResult:
+    """
+    Keep the sentences of each chunk that are relevant to the queries.
+
+    Args:
+        queries: Topic and its expanded queries (their embeddings are usually cached)
+        documents: Selected chunks, best first
+        threshold: Minimum cosine similarity to a query (defaults to ``config.compression_threshold``)
+        neighbours: Sentences kept on each side of a relevant one (defaults to ``config.compression_neighbours``)
+        model: Model whose tokenizer counts the tokens
+        embedder: Embedding model (defaults to the shared one)
+
+    Returns:
+        Copies of the chunks with only the kept sentences; unchanged chunks
+        keep their text, compressed ones get ``compressed`` and
+        ``original_tokens`` in their metadata
+    """
+    threshold = threshold if threshold is not None else config.compression_threshold
+    neighbours = neighbours if neighbours is not None else config.compression_neighbours
+    embedder = embedder or default_embedder
+
+    split = [split_sentences(doc.page_content) for doc in documents]
+    # Chunks that fit in one neighbour window would be kept whole anyway
+    candidates = [i for i, sentences in enumerate(split) if len(sentences) > 2 * neighbours + 1]
+    original_tokens = [count_tokens(doc.page_content, model) for doc in documents]
+
+    compressed = [doc.model_copy(update={"metadata": dict(doc.metadata)}) for doc in documents]
+    total_sentences = sum(len(sentences) for sentences in split)
+    kept_sentences = total_sentences
+
+    if candidates and queries:
+        # One embedding pass over every sentence of every chunk
+        spans: List[Tuple[int, int, int]] = []
+        sentences: List[str] = []
+        for i in candidates:
+            spans.append((i, len(sentences), len(sentences) + len(split[i])))
+            sentences.extend(split[i])
+        sentence_vectors = _normalize(embedder.embed_documents(sentences))
+        query_vectors = _normalize(embedder.embed_queries(queries))
+        scores = (sentence_vectors @ query_vectors.T).max(axis=1)
+
+        for i, start, end in spans:
+            kept = _kept(scores[start:end], threshold, neighbours)
+            if kept.all():
+                continue
+            kept_sentences -= int((~kept).sum())
+            compressed[i].page_content = _join(split[i], kept)
+            compressed[i].metadata["compressed"] = True
+            compressed[i].metadata["original_tokens"] = original_tokens[i]
+
+    tokens = sum(original_tokens)
+    compressed_tokens = sum(
+        count_tokens(doc.page_content, model) if doc.metadata.get("compressed") else original
+        for doc, original in zip(compressed, original_tokens)
+    )
+    record_compression(tokens, compressed_tokens)
+    return CompressionResult(compressed, tokens, compressed_tokens, total_sentences, kept_sentences)
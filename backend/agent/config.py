@@ -8,7 +8,7 @@ import sys
 from pathlib import Path
 from dotenv import load_dotenv
 from pydantic_settings import BaseSettings
-from pydantic import Field
+from pydantic import BaseModel, Field, field_validator
 
 # Load environment variables from .env file at the project root
 # This must happen before any config instantiation
@@ -22,6 +22,36 @@ if str(Path(__file__).parent) not in sys.path:
     sys.path.insert(0, str(Path(__file__).parent))
 
 
+class LLMRoute(BaseModel):
+    """Model and limits for one agent role (unset fields fall back to the global settings)."""
+
+    model: str | None = None
+    max_tokens: int | None = None
+    timeout: int | None = None  # seconds
+    # Send a duplicate request when the first is slower than usual (see llm_hedge_percentile)
+    hedge: bool = False
+
+
+def _default_llm_routes() -> dict[str, LLMRoute]:
+    return {
+        # Four short search queries
+        "expansion": LLMRoute(model="gpt-4.1-mini", max_tokens=256, timeout=30),
+        # Summary plus a handful of excerpts
+        "retriever_synthesis": LLMRoute(model="gpt-4.1-mini", max_tokens=1500, timeout=60),
+        # Research brief sections
+        "researcher": LLMRoute(max_tokens=2000, timeout=90),
+        # Full drafts need the strongest model and the full token budget
+        "composer": LLMRoute(),
+        "refiner": LLMRoute(),
+        # APPROVED/REJECTED verdict with short feedback
+        "evaluator": LLMRoute(model="gpt-4.1-mini", max_tokens=1000, timeout=60),
+        # Topic and writing prompt for the RSS pipeline
+        "topic_generator": LLMRoute(max_tokens=1500, timeout=90),
+        # Re-emitting an invalid structured answer as valid JSON
+        "structured_repair": LLMRoute(model="gpt-4.1-mini", max_tokens=2000, timeout=60),
+    }
+
+
 class AgentConfig(BaseSettings):
     """Comprehensive configuration for the blog post generation system."""
 
@@ -50,6 +80,7 @@ class AgentConfig(BaseSettings):
 
     # Embedding settings
     embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_cache_size: int = 1024  # query embeddings kept in memory
     chunk_size: int = 500
     chunk_overlap: int = 50
 
@@ -57,6 +88,49 @@ class AgentConfig(BaseSettings):
     collection_name: str = "blog_knowledge_base"
     top_k_retrieval: int = 5
     vector_db_provider: str = "chromadb"  # or "qdrant"
+    # Worker threads for vector store calls made from async code (searches / writes)
+    vector_store_read_concurrency: int = 4
+    vector_store_write_concurrency: int = 1
+    # Maximal marginal relevance: pick retrieved chunks trading relevance (1.0) against
+    # similarity to chunks already picked (0.0), from top_k * multiplier candidates per query
+    mmr_enabled: bool = True
+    mmr_lambda: float = 0.7
+    mmr_fetch_multiplier: int = 3
+    # Near-duplicate RSS chunks (MinHash over word shingles, LSH banding): chunks whose estimated
+    # Jaccard similarity to a stored chunk reaches the threshold are not embedded or stored
+    near_duplicate_enabled: bool = True
+    near_duplicate_threshold: float = 0.8
+    near_duplicate_num_perm: int = 128
+    near_duplicate_bands: int = 16
+    near_duplicate_shingle_size: int = 5
+    # BM25 index kept next to the collection; hybrid search fuses its ranking with the dense one
+    # by reciprocal rank fusion, 1 / (rrf_k + rank) summed over both lists
+    sparse_index_enabled: bool = True
+    bm25_k1: float = 1.2
+    bm25_b: float = 0.75
+    hybrid_rrf_k: int = 60
+    # Search results cached per (query embedding, filters, top_k, collection version); every write
+    # bumps the version, the TTL covers writes made by other processes (0 bytes disables)
+    retrieval_cache_max_bytes: int = 64 * 1024 * 1024
+    retrieval_cache_ttl: int = 600  # seconds
+    # Optional cross-encoder pass over the top candidates of retrieve_relevant_context; past the
+    # budget (seconds, model loading included) the existing order is kept
+    cross_encoder_enabled: bool = False
+    cross_encoder_model: str = "cross-encoder/mmarco-mMiniLMv2-L12-H384-v1"  # multilingual, covers Vietnamese
+    cross_encoder_top_n: int = 20
+    cross_encoder_batch_size: int = 16
+    cross_encoder_max_length: int = 256  # tokens per (query, chunk) pair
+    cross_encoder_budget: float = 0.5
+    cross_encoder_cache_size: int = 20000  # (query, chunk) scores kept in memory
+    # Sentence compression of the chunks sent to the retriever synthesis: sentences whose cosine
+    # similarity to the topic or one of its expansions reaches the threshold are kept, with this
+    # many neighbouring sentences on each side
+    compression_enabled: bool = True
+    compression_threshold: float = 0.35
+    compression_neighbours: int = 1
+    # The RSS pipeline only retrieves chunks published within this many days, filtered in the
+    # vector query (0 searches the whole archive)
+    news_context_max_age_days: int = 30
 
     # Generation settings
     min_word_count: int = 800
@@ -83,6 +157,63 @@ class AgentConfig(BaseSettings):
     retry_delay: float = 1.0
     retry_backoff: float = 2.0
 
+    # LLM response cache settings (stored under cache_dir)
+    llm_cache_enabled: bool = True
+    llm_cache_ttl: int = 7 * 24 * 3600  # seconds
+    llm_cache_max_entries: int = 5000
+    # Requests at or below this temperature are cached without opting in
+    llm_cache_max_temperature: float = 0.0
+    # Share one upstream call between identical concurrent requests that are cache-eligible
+    llm_coalesce_requests: bool = True
+
+    # Query expansion cache (stored under cache_dir): exact normalised match first, then the most
+    # similar previously expanded query if its cosine similarity reaches the threshold and it names
+    # the same model numbers/years (tokens with digits)
+    expansion_cache_enabled: bool = True
+    expansion_cache_similarity: float = 0.92
+    expansion_cache_ttl: int = 30 * 24 * 3600  # seconds
+    expansion_cache_max_entries: int = 2000
+
+    # Request scheduler settings (shared by every LLM client in a process, 0 disables a limit)
+    llm_requests_per_minute: int = 500
+    llm_tokens_per_minute: int = 200000
+    llm_max_concurrency: int = 8
+    # Requests estimated at or below this many tokens go ahead of longer ones in their lane
+    llm_short_request_tokens: int = 3000
+
+    # Hedged requests: a duplicate is sent once a request outlasts this percentile of the
+    # route's recent latencies (needs llm_hedge_min_samples first, never sooner than the min delay)
+    llm_hedge_percentile: float = 95.0
+    llm_hedge_min_samples: int = 20
+    llm_hedge_min_delay: float = 2.0  # seconds
+    llm_latency_window: int = 200  # recent latencies kept per route
+
+    # Adaptive timeouts: this percentile of the route's recent latencies times the multiplier,
+    # never below the minimum nor above the route's timeout (grows with each retry)
+    llm_adaptive_timeouts: bool = True
+    llm_timeout_percentile: float = 99.0
+    llm_timeout_multiplier: float = 3.0
+    llm_min_timeout: float = 30.0  # seconds
+
+    # Circuit breaker per base URL and model: open after this many consecutive transient
+    # failures, fail fast while open, then let a few probe requests through after the reset time
+    llm_breaker_failure_threshold: int = 5
+    llm_breaker_reset_timeout: float = 30.0  # seconds
+    llm_breaker_half_open_requests: int = 1
+
+    # Structured agent outputs: "json_schema" (strict schema), "json_object" (schema in the prompt,
+    # for compatible servers without json_schema support) or "off" (free-text parsing)
+    llm_structured_output: str = "json_schema"
+
+    # Per-role routing (set LLM_ROUTES as JSON to override, e.g. {"evaluator": {"model": "gpt-4.1"}})
+    llm_routes: dict[str, LLMRoute] = Field(default_factory=_default_llm_routes)
+
+    @field_validator("llm_routes")
+    @classmethod
+    def _merge_default_routes(cls, routes: dict[str, LLMRoute]) -> dict[str, LLMRoute]:
+        # Overriding one role must not drop the defaults of the others
+        return {**_default_llm_routes(), **routes}
+
     # CLI settings
     interactive_mode: bool = False
     verbose: bool = False
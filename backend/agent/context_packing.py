@@ -0,0 +1,271 @@
+"""
+Token-budgeted packing of retrieved chunks into a context window.
+
+The previous assembly assumed 4 characters per token, which is far off for
+Vietnamese text, appended chunks greedily and cut the last one mid-chunk.
+``pack_context`` counts real tokens (``tokenizer.count_tokens``) and picks
+the set of chunks with the highest total score that fits the budget: a
+knapsack over the chunks, grouped by source because a source header is
+paid once when any of its chunks is included. Headers, separators and the
+closing summary line all count against the budget, and chunks are never
+truncated unless not even one fits.
+
+Each packing also measures what the character heuristic would have sent
+and records the difference with the job's usage tracker.
+"""
+
+import sys
+import math
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .models import Document
+    from .tokenizer import count_tokens
+    from .llm_metrics import record_context_packing
+except ImportError:
+    from models import Document
+    from tokenizer import count_tokens
+    from llm_metrics import record_context_packing
+
+logger = logging.getLogger(__name__)
+
+SEPARATOR = "\n\n---\n\n"
+
+
+class PackedContext:
+    """A packed context window and how it compares with the character heuristic."""
+
+    def __init__(self, text: str, tokens: int, documents: List[Document], sources: int, heuristic_tokens: int):
+        self.text = text
+        self.tokens = tokens
+        self.documents = documents
+        self.sources = sources
+        self.heuristic_tokens = heuristic_tokens
+
+    @property
+    def tokens_saved(self) -> int:
+        """Prompt tokens saved compared with the heuristic (negative when the heuristic undershot the budget)."""
+        return self.heuristic_tokens - self.tokens
+
+
+def _source(doc: Document) -> str:
+    return doc.metadata.get("title", doc.metadata.get("source_file", "Unknown"))
+
+
+def _header(doc: Document) -> str:
+    source = _source(doc)
+    if doc.metadata.get("date"):
+        try:
+            post_date = datetime.fromisoformat(str(doc.metadata["date"])).strftime("%B %Y")
+            return f"\n## From: {source} ({post_date})\n"
+        except ValueError:
+            pass
+    return f"\n## From: {source}\n"
+
+
+def _value(doc: Document) -> float:
+    """Packing value of a chunk: its reranked score, kept positive."""
+    metadata = doc.metadata
+    if metadata.get("cross_encoder_score") is not None:
+        # Cross-encoder logits can be negative
+        return 1.0 / (1.0 + math.exp(-metadata["cross_encoder_score"]))
+    return max(metadata.get("final_score", metadata.get("relevance_score", 0.0)) or 0.0, 0.0) + 1e-3
+
+
+def _footer(sources: int, tokens: int) -> str:
+    return f"\n\n--- Context assembled from {sources} sources, {tokens} tokens ---"
+
+
+def _render(groups: List[Tuple[str, List[Document]]]) -> str:
+    parts = []
+    for header, docs in groups:
+        parts.append(header)
+        for doc in docs:
+            parts.append(doc.page_content.strip())
+            parts.append(SEPARATOR)
+    return "".join(parts).strip()
+
+
+def _shift(values: np.ndarray, cost: int) -> np.ndarray:
+    """Values indexed by capacity after spending ``cost`` (unreachable capacities are -inf)."""
+    shifted = np.full(len(values), -np.inf)
+    if cost < len(values):
+        shifted[cost:] = values[:len(values) - cost]
+    return shifted
+
+
+def _knapsack(
+    groups: List[Tuple[int, List[Tuple[int, float]]]],
+    budget: int,
+) -> List[List[int]]:
+    """
+    Best total value within the budget, paying a group's header cost once if any of its chunks is chosen.
+
+    Dynamic programming over capacities: for each group, the chunks are added
+    one by one to a copy of the table that has the header paid, and the group
+    is used wherever that copy beats the table without it.
+
+    Args:
+        groups: Per source, its header cost and ``(cost, value)`` per chunk
+        budget: Token budget
+
+    Returns:
+        Chosen chunk positions per group
+    """
+    # Best value with at most ``capacity`` tokens used
+    best = np.zeros(budget + 1)
+    decisions = []
+
+    for header_cost, chunks in groups:
+        opened = _shift(best, header_cost)
+        takes = []
+        for cost, value in chunks:
+            candidate = _shift(opened, cost) + value
+            take = candidate > opened
+            opened = np.where(take, candidate, opened)
+            takes.append(take)
+        use_group = opened > best
+        best = np.where(use_group, opened, best)
+        decisions.append((use_group, takes))
+
+    # Walk back from the full budget
+    capacity = budget
+    selection: List[List[int]] = []
+    for (use_group, takes), (header_cost, chunks) in zip(reversed(decisions), reversed(groups)):
+        chosen: List[int] = []
+        if use_group[capacity]:
+            for position in range(len(chunks) - 1, -1, -1):
+                if takes[position][capacity]:
+                    chosen.append(position)
+                    capacity -= chunks[position][0]
+            capacity -= header_cost
+        selection.append(sorted(chosen))
+    selection.reverse()
+    return selection
+
+
+def _truncate_to_tokens(text: str, max_tokens: int, model: Optional[str]) -> str:
+    """Longest prefix of text within max_tokens (binary search on characters)."""
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if count_tokens(text[:middle] + "...", model) <= max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    return text[:low] + "..." if low else ""
+
+
+def heuristic_context(results: List[Document], max_tokens: int) -> str:
+    """The previous assembly: 4 characters per token, greedy, last chunk cut to fit."""
+    max_chars = max_tokens * 4
+    context_parts = []
+    included_sources = set()
+    total_chars = 0
+
+    for doc in results:
+        source = _source(doc)
+        if source not in included_sources:
+            header = f"\n## From: {source}\n"
+            if total_chars + len(header) > max_chars:
+                break
+            header = _header(doc)
+            context_parts.append(header)
+            total_chars += len(header)
+            included_sources.add(source)
+
+        content = doc.page_content.strip()
+        if total_chars + len(content) > max_chars:
+            remaining_chars = max_chars - total_chars - 50
+            if remaining_chars > 100:
+                context_parts.append(content[:remaining_chars] + "...\n")
+            break
+
+        context_parts.append(content)
+        total_chars += len(content)
+        if total_chars + len(SEPARATOR) < max_chars:
+            context_parts.append(SEPARATOR)
+            total_chars += len(SEPARATOR)
+
+    context = "".join(context_parts).strip()
+    stats = f"\n\n--- Context assembled from {len(included_sources)} sources, {total_chars} characters ---"
+    if total_chars + len(stats) < max_chars * 1.1:
+        context += stats
+    return context
+
+
+def pack_context(results: List[Document], max_tokens: int, model: Optional[str] = None) -> PackedContext:
+    """
+    Pack the highest scoring chunks into ``max_tokens`` real tokens.
+
+    Args:
+        results: Retrieved chunks, best first
+        max_tokens: Token budget for the whole context text
+        model: Model whose tokenizer counts the tokens
+
+    Returns:
+        The packed context; chunks keep their retrieval order within the
+        sources, which keep the order of their first chunk
+    """
+    heuristic_tokens = count_tokens(heuristic_context(results, max_tokens), model)
+
+    # Group by source in order of first appearance
+    grouped: Dict[str, List[Document]] = {}
+    for doc in results:
+        grouped.setdefault(_source(doc), []).append(doc)
+    sources = list(grouped)
+
+    separator_tokens = count_tokens(SEPARATOR, model)
+    groups = [
+        (
+            count_tokens(_header(grouped[source][0]), model),
+            [(count_tokens(doc.page_content.strip(), model) + separator_tokens, _value(doc)) for doc in grouped[source]],
+        )
+        for source in sources
+    ]
+
+    # Leave room for the summary line; tokens of separately counted parts can differ
+    # slightly from the joined text, so shrink the budget until the result fits
+    budget = max_tokens - count_tokens(_footer(len(sources), max_tokens), model)
+    text, tokens, selected, used_sources = "", 0, [], 0
+    while budget > 0:
+        selection = _knapsack(groups, budget)
+        chosen = [
+            (_header(grouped[source][0]), [grouped[source][i] for i in positions])
+            for source, positions in zip(sources, selection) if positions
+        ]
+        selected = [doc for _, docs in chosen for doc in docs]
+        used_sources = len(chosen)
+        body = _render(chosen)
+        tokens = count_tokens(body, model)
+        text = body + _footer(used_sources, tokens) if chosen else ""
+        total = count_tokens(text, model)
+        if total <= max_tokens:
+            tokens = total
+            break
+        budget -= total - max_tokens
+
+    if not selected and results:
+        # Not even one chunk fits whole: cut the best one
+        best = results[0]
+        header = _header(best)
+        room = max_tokens - count_tokens(header, model)
+        content = _truncate_to_tokens(best.page_content.strip(), room, model)
+        if content:
+            text = header.strip() + "\n" + content
+            tokens = count_tokens(text, model)
+            selected, used_sources = [best], 1
+
+    packed = PackedContext(text, tokens, selected, used_sources, heuristic_tokens)
+    record_context_packing(packed.tokens, packed.heuristic_tokens)
+    return packed
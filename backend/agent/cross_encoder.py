@@ -0,0 +1,234 @@
+"""
+Optional cross-encoder reranking of the best retrieval candidates.
+
+Bi-encoder scores compare a query and a chunk embedded separately; a
+cross-encoder reads both together and ranks much better, at the cost of
+one model pass per (query, chunk) pair. ``retrieve_relevant_context``
+therefore only sends the top ``cross_encoder_top_n`` candidates, scored in
+batches on a worker thread.
+
+Scoring has a hard latency budget: when it is exceeded (including while
+the model is first loaded) retrieval keeps the existing order, and the
+scoring stops after the batch in progress. Scores are cached by (query
+hash, chunk id), so retries and repeated topics skip the model, and pairs
+scored after a timeout still help the next call.
+"""
+
+import sys
+import time
+import asyncio
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .models import Document
+    from .embeddings import normalize_query
+    from .utils.lazy import LazyProxy
+except ImportError:
+    from config import config
+    from models import Document
+    from embeddings import normalize_query
+    from utils.lazy import LazyProxy
+
+logger = logging.getLogger(__name__)
+
+
+class BudgetExceeded(Exception):
+    """Cross-encoder scoring ran past its latency budget."""
+    pass
+
+
+class CrossEncoderReranker:
+    """Sentence-transformers cross-encoder with a (query, chunk) score cache."""
+
+    def __init__(
+        self,
+        model_name: Optional[str] = None,
+        cache_size: Optional[int] = None,
+        model: Any = None,
+    ):
+        """
+        Args:
+            model_name: Cross-encoder model (defaults to ``config.cross_encoder_model``)
+            cache_size: Scores kept (defaults to ``config.cross_encoder_cache_size``, 0 disables)
+            model: Already loaded model with a ``predict`` method, instead of loading ``model_name``
+        """
+        self.model_name = model_name or config.cross_encoder_model
+        self.cache_size = cache_size if cache_size is not None else config.cross_encoder_cache_size
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._load_error: Optional[Exception] = None
+
+        self._cache: "OrderedDict[Tuple[str, str], float]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.applied = 0
+        self.fallbacks = 0
+
+    @property
+    def model(self) -> Any:
+        """The cross-encoder, loaded on first use; a failed load is remembered and re-raised."""
+        if self._model is None:
+            with self._model_lock:
+                if self._load_error is not None:
+                    raise self._load_error
+                if self._model is None:
+                    from sentence_transformers import CrossEncoder
+
+                    logger.info(f"Loading cross-encoder: {self.model_name}")
+                    try:
+                        self._model = CrossEncoder(
+                            self.model_name, max_length=config.cross_encoder_max_length, device="cpu"
+                        )
+                    except Exception as e:
+                        self._load_error = e
+                        raise
+        return self._model
+
+    @staticmethod
+    def _keys(query: str, docs: List[Document]) -> List[Tuple[str, str]]:
+        query_hash = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return [
+            (query_hash, doc.metadata.get("chunk_id") or hashlib.sha1(doc.page_content.encode("utf-8")).hexdigest())
+            for doc in docs
+        ]
+
+    def score(
+        self,
+        query: str,
+        docs: List[Document],
+        batch_size: Optional[int] = None,
+        deadline: Optional[float] = None,
+    ) -> np.ndarray:
+        """
+        Score (query, chunk) pairs, reusing cached scores.
+
+        Args:
+            query: Search query
+            docs: Candidate chunks
+            batch_size: Pairs per model call (defaults to ``config.cross_encoder_batch_size``)
+            deadline: ``time.perf_counter()`` value after which no new batch is started
+
+        Returns:
+            One score per document (higher is more relevant)
+
+        Raises:
+            BudgetExceeded: The deadline passed before every pair was scored
+        """
+        batch_size = batch_size or config.cross_encoder_batch_size
+        keys = self._keys(query, docs)
+        scores = np.empty(len(docs), dtype=np.float32)
+        missing = []
+        with self._cache_lock:
+            for i, key in enumerate(keys):
+                cached = self._cache.get(key)
+                if cached is None:
+                    missing.append(i)
+                else:
+                    self._cache.move_to_end(key)
+                    scores[i] = cached
+            self.hits += len(docs) - len(missing)
+            self.misses += len(missing)
+
+        for start in range(0, len(missing), batch_size):
+            if deadline is not None and time.perf_counter() > deadline:
+                raise BudgetExceeded(f"scored {start}/{len(missing)} pairs")
+            batch = missing[start:start + batch_size]
+            pairs = [(query, docs[i].page_content) for i in batch]
+            batch_scores = np.asarray(self.model.predict(pairs, batch_size=batch_size, show_progress_bar=False))
+            scores[batch] = batch_scores
+            self._remember((keys[i], float(s)) for i, s in zip(batch, batch_scores))
+
+        return scores
+
+    def _remember(self, items: Any) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for key, value in items:
+                self._cache[key] = value
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    async def rerank(
+        self,
+        query: str,
+        results: List[Document],
+        top_n: Optional[int] = None,
+        budget: Optional[float] = None,
+    ) -> Tuple[List[Document], bool]:
+        """
+        Reorder the top candidates by cross-encoder score within a latency budget.
+
+        Args:
+            query: Search query
+            results: Candidates, best first
+            top_n: Candidates to score (defaults to ``config.cross_encoder_top_n``)
+            budget: Seconds allowed (defaults to ``config.cross_encoder_budget``)
+
+        Returns:
+            ``(documents, applied)``: the top ``top_n`` sorted by
+            ``cross_encoder_score`` and True, or ``results`` unchanged and False
+            when the budget was exceeded or scoring failed
+        """
+        top_n = top_n or config.cross_encoder_top_n
+        budget = budget if budget is not None else config.cross_encoder_budget
+        candidates = results[:top_n]
+        if not candidates:
+            return results, False
+
+        started = time.perf_counter()
+        try:
+            # The model runs on a worker thread; past the budget we stop waiting for it
+            scores = await asyncio.wait_for(
+                asyncio.to_thread(self.score, query, candidates, deadline=started + budget),
+                timeout=budget,
+            )
+        except (asyncio.TimeoutError, BudgetExceeded):
+            with self._cache_lock:
+                self.fallbacks += 1
+            logger.info(f"Cross-encoder exceeded its {budget * 1000:.0f} ms budget, keeping retrieval order")
+            return results, False
+        except Exception as e:
+            with self._cache_lock:
+                self.fallbacks += 1
+            logger.warning(f"Cross-encoder reranking failed, keeping retrieval order: {e}")
+            return results, False
+
+        for doc, score in zip(candidates, scores.tolist()):
+            doc.metadata["cross_encoder_score"] = score
+        order = np.argsort(-scores, kind="stable")
+        with self._cache_lock:
+            self.applied += 1
+        logger.debug(f"Cross-encoder scored {len(candidates)} candidates in {(time.perf_counter() - started) * 1000:.1f} ms")
+        return [candidates[i] for i in order], True
+
+    def stats(self) -> Dict[str, Any]:
+        """Get score cache counters and how often reranking was applied or fell back."""
+        with self._cache_lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._cache),
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "applied": self.applied,
+                "fallbacks": self.fallbacks,
+            }
+
+
+# Global reranker, model loaded on first use (only when cross_encoder_enabled)
+cross_encoder_reranker: CrossEncoderReranker = LazyProxy(CrossEncoderReranker, "cross_encoder_reranker")
@@ -0,0 +1,121 @@
+"""
+Maximal marginal relevance (MMR) selection of retrieved chunks.
+
+Overlapping chunks and syndicated copies of the same article embed almost
+identically, so picking the top-k by relevance alone fills the context
+window with near-duplicates. MMR picks chunks one at a time, trading
+relevance against similarity to the chunks already picked:
+
+    score(d) = lambda * relevance(d) - (1 - lambda) * max_{s in picked} cos(d, s)
+
+The selection runs on the candidate embeddings in NumPy; each step updates
+the running maximum similarity with one matrix-vector product.
+"""
+
+import sys
+import logging
+from pathlib import Path
+from typing import List, Optional, Sequence
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .models import Document
+except ImportError:
+    from config import config
+    from models import Document
+
+logger = logging.getLogger(__name__)
+
+
+def mmr_select(
+    embeddings: np.ndarray,
+    relevance: Sequence[float],
+    k: int,
+    lambda_mult: Optional[float] = None,
+) -> List[int]:
+    """
+    Select up to ``k`` diverse, relevant candidates.
+
+    Args:
+        embeddings: Candidate embeddings, shape (n, dimensions)
+        relevance: Relevance score per candidate (any scale, min-max normalised here)
+        k: Number of candidates to select
+        lambda_mult: 1.0 ranks by relevance only, 0.0 by diversity only
+            (defaults to ``config.mmr_lambda``)
+
+    Returns:
+        Indices of the selected candidates, in selection order
+    """
+    if lambda_mult is None:
+        lambda_mult = config.mmr_lambda
+
+    vectors = np.asarray(embeddings, dtype=np.float32)
+    n = vectors.shape[0]
+    k = min(k, n)
+    if k <= 0:
+        return []
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    vectors = vectors / np.where(norms == 0, 1.0, norms)
+
+    scores = np.asarray(relevance, dtype=np.float32)
+    spread = scores.max() - scores.min()
+    scores = (scores - scores.min()) / spread if spread > 0 else np.ones(n, dtype=np.float32)
+
+    # Highest similarity of each candidate to anything selected so far
+    max_similarity = np.full(n, -np.inf, dtype=np.float32)
+    available = np.ones(n, dtype=bool)
+    selected: List[int] = []
+
+    first = int(np.argmax(scores))
+    for _ in range(k):
+        if selected:
+            marginal = lambda_mult * scores - (1.0 - lambda_mult) * max_similarity
+            marginal[~available] = -np.inf
+            index = int(np.argmax(marginal))
+        else:
+            index = first
+        selected.append(index)
+        available[index] = False
+        np.maximum(max_similarity, vectors @ vectors[index], out=max_similarity)
+
+    return selected
+
+
+def diversify_results(
+    results: List[Document],
+    k: int,
+    lambda_mult: Optional[float] = None,
+    score_key: str = "final_score",
+) -> List[Document]:
+    """
+    Pick ``k`` documents with MMR over their embeddings.
+
+    Documents without an embedding cannot be compared, so if any is missing
+    the top ``k`` by score are returned unchanged.
+
+    Args:
+        results: Candidates sorted by score, with ``embedding`` set
+        k: Number of documents to return
+        lambda_mult: Relevance/diversity trade-off (defaults to ``config.mmr_lambda``)
+        score_key: Metadata key holding the relevance score
+
+    Returns:
+        Selected documents, in selection order
+    """
+    if len(results) <= 1 or any(doc.embedding is None for doc in results):
+        return results[:k]
+
+    embeddings = np.vstack([np.asarray(doc.embedding, dtype=np.float32) for doc in results])
+    relevance = [doc.metadata.get(score_key, doc.metadata.get("relevance_score", 0.0)) for doc in results]
+    selected = mmr_select(embeddings, relevance, k, lambda_mult)
+
+    logger.debug(f"MMR selected {len(selected)} of {len(results)} candidates")
+    return [results[i] for i in selected]
@@ -0,0 +1,160 @@
+"""
+Process-wide embedding model shared by ingestion and search.
+
+Documents and queries must be embedded by the same model, or search
+silently degrades; ``embedder`` is the single place the model is loaded.
+Query embeddings are kept in an LRU cache keyed by normalised text, since
+retrieval repeats the same topics and expansions.
+"""
+
+import sys
+import logging
+import threading
+import unicodedata
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .utils.lazy import LazyProxy
+except ImportError:
+    from config import config
+    from utils.lazy import LazyProxy
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_query(text: str) -> str:
+    """Normalise a query for cache lookups (Unicode form, case and whitespace)."""
+    return " ".join(unicodedata.normalize("NFC", text).lower().split())
+
+
+class Embedder:
+    """Sentence-transformers model with a query embedding cache."""
+
+    def __init__(self, model_name: Optional[str] = None, cache_size: Optional[int] = None, model: Any = None):
+        """
+        Args:
+            model_name: Sentence-transformers model (defaults to ``config.embedding_model``)
+            cache_size: Query embeddings kept (defaults to ``config.embedding_cache_size``, 0 disables)
+            model: Already loaded model with an ``encode`` method, instead of loading ``model_name``
+        """
+        self.model_name = model_name or config.embedding_model
+        self.cache_size = cache_size if cache_size is not None else config.embedding_cache_size
+        self._model = model
+        self._model_lock = threading.Lock()
+        self._load_error: Optional[Exception] = None
+
+        self._cache: "OrderedDict[str, np.ndarray]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def model(self) -> Any:
+        """
+        The embedding model, loaded on first use (sentence_transformers pulls in torch).
+
+        A failed load is remembered and re-raised, so searches fail fast
+        instead of each retrying the download.
+        """
+        if self._model is None:
+            with self._model_lock:
+                if self._load_error is not None:
+                    raise self._load_error
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+
+                    logger.info(f"Loading embedding model: {self.model_name}")
+                    try:
+                        self._model = SentenceTransformer(self.model_name)
+                    except Exception as e:
+                        self._load_error = e
+                        raise
+        return self._model
+
+    def embed_documents(self, texts: List[str], batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        """
+        Embed document chunks for storage.
+
+        Returns:
+            Array of shape (len(texts), dimensions)
+        """
+        return np.asarray(self.model.encode(texts, batch_size=batch_size, show_progress_bar=show_progress_bar))
+
+    def embed_queries(self, queries: List[str]) -> np.ndarray:
+        """
+        Embed search queries, reusing cached embeddings.
+
+        Queries missing from the cache are encoded together in one batch.
+
+        Returns:
+            Array of shape (len(queries), dimensions), in query order
+        """
+        keys = [normalize_query(q) for q in queries]
+        found: Dict[str, np.ndarray] = {}
+        with self._cache_lock:
+            for key in keys:
+                vector = self._cache.get(key)
+                if vector is not None:
+                    self._cache.move_to_end(key)
+                    found[key] = vector
+
+        misses = sum(1 for key in keys if key not in found)
+        with self._cache_lock:
+            self.hits += len(keys) - misses
+            self.misses += misses
+
+        # Encode each distinct missing query once
+        missing = list(dict.fromkeys(key for key in keys if key not in found))
+        if missing:
+            originals = {normalize_query(q): q for q in queries}
+            vectors = np.asarray(self.model.encode([originals[key] for key in missing], show_progress_bar=False))
+            for key, vector in zip(missing, vectors):
+                vector.setflags(write=False)
+                found[key] = vector
+            self._remember(zip(missing, vectors))
+
+        return np.stack([found[key] for key in keys])
+
+    def embed_query(self, query: str) -> np.ndarray:
+        """Embed one search query (see ``embed_queries``)."""
+        return self.embed_queries([query])[0]
+
+    def _remember(self, items: Any) -> None:
+        if self.cache_size <= 0:
+            return
+        with self._cache_lock:
+            for key, vector in items:
+                self._cache[key] = vector
+                self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def clear_cache(self) -> None:
+        with self._cache_lock:
+            self._cache.clear()
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get query embedding cache hit/miss counters."""
+        with self._cache_lock:
+            lookups = self.hits + self.misses
+            return {
+                "model": self.model_name,
+                "entries": len(self._cache),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+# Global embedder shared by ingestion and retrieval, model loaded on first use
+embedder: Embedder = LazyProxy(Embedder, "embedder")
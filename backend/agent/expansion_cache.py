@@ -0,0 +1,297 @@
+"""
+Persistent semantic cache for query expansions.
+
+RSS-derived topics repeat heavily, often reworded, so expansions are looked
+up in two steps before asking the LLM:
+
+1. exact match on the normalised query text
+2. nearest neighbour over the embeddings of previously expanded queries,
+   accepted when the cosine similarity reaches ``expansion_cache_similarity``
+   and both queries name the same model numbers, years and sizes (their
+   tokens with digits): embeddings barely tell "Find X8" from "Find X9"
+
+Entries live in a SQLite database under ``config.cache_dir`` (with TTL and
+LRU eviction like the response cache); their embeddings are also kept in
+memory as one matrix for the neighbour search.
+"""
+
+import re
+import sys
+import json
+import time
+import sqlite3
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .embeddings import Embedder, embedder as default_embedder, normalize_query
+    from .utils.lazy import LazyProxy
+except ImportError:
+    from config import config
+    from embeddings import Embedder, embedder as default_embedder, normalize_query
+    from utils.lazy import LazyProxy
+
+logger = logging.getLogger(__name__)
+
+# Model numbers, years, sizes: any word with a digit in it
+_IDENTIFIER_RE = re.compile(r"\w*\d\w*")
+
+
+def identifiers(query: str) -> frozenset:
+    """Tokens of a normalised query that contain digits."""
+    return frozenset(_IDENTIFIER_RE.findall(query))
+
+
+class ExpansionCache:
+    """Disk-backed exact and nearest-neighbour cache of query expansions."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        similarity: Optional[float] = None,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+        embedder: Optional[Embedder] = None,
+    ):
+        self.cache_dir = Path(cache_dir or config.cache_dir)
+        self.similarity = similarity if similarity is not None else config.expansion_cache_similarity
+        self.ttl = ttl if ttl is not None else config.expansion_cache_ttl
+        self.max_entries = max_entries if max_entries is not None else config.expansion_cache_max_entries
+        self.embedder = embedder or default_embedder
+        self.db_path = self.cache_dir / "query_expansions.sqlite3"
+
+        self.exact_hits = 0
+        self.semantic_hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS expansions (
+                key TEXT PRIMARY KEY,
+                queries TEXT NOT NULL,
+                model TEXT,
+                embedding BLOB,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_expansions_last_access ON expansions (last_access)"
+        )
+        self._conn.commit()
+
+        # Neighbour index: row i of the matrix is the unit embedding of _index_keys[i]
+        self._index_keys: List[str] = []
+        self._index: Optional[np.ndarray] = None
+        self._index_loaded = False
+
+    def get(self, query: str) -> Optional[List[str]]:
+        """
+        Look up the expansions of a query or of a near-duplicate one.
+
+        Args:
+            query: Original search query
+
+        Returns:
+            Cached expanded queries (without the original), or None on miss
+        """
+        key = normalize_query(query)
+        now = time.time()
+        with self._lock:
+            queries = self._lookup(key, now)
+            if queries is not None:
+                self.exact_hits += 1
+                return queries
+
+        vector = self._embed(query)
+        if vector is None:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        with self._lock:
+            self._load_index()
+            match = self._nearest(vector, identifiers(key))
+            if match is not None:
+                neighbour, score = match
+                queries = self._lookup(neighbour, now)
+                if queries is not None:
+                    logger.debug(f"Expansion cache: '{key}' matched '{neighbour}' ({score:.3f})")
+                    self.semantic_hits += 1
+                    return queries
+            self.misses += 1
+        return None
+
+    def set(self, query: str, queries: List[str]) -> None:
+        """
+        Store the expansions of a query and enforce the TTL and size limits.
+
+        Args:
+            query: Original search query
+            queries: Expanded queries, without the original
+        """
+        key = normalize_query(query)
+        vector = self._embed(query)
+        now = time.time()
+        blob = vector.astype(np.float32).tobytes() if vector is not None else None
+        model = self.embedder.model_name if vector is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO expansions (key, queries, model, embedding, created_at, last_access) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, json.dumps(queries, ensure_ascii=False), model, blob, now, now),
+            )
+            self.writes += 1
+            evicted = self._evict(now)
+            self._conn.commit()
+
+            if evicted:
+                # Rebuilt on the next neighbour lookup
+                self._index_loaded = False
+            elif self._index_loaded and vector is not None:
+                self._add_to_index(key, vector)
+
+    def clear(self) -> None:
+        """Remove every cached expansion."""
+        with self._lock:
+            self._conn.execute("DELETE FROM expansions")
+            self._conn.commit()
+            self._index_keys, self._index, self._index_loaded = [], None, False
+
+    def _embed(self, query: str) -> Optional[np.ndarray]:
+        """Unit embedding of a query, or None when no embedding model is available."""
+        try:
+            vector = np.asarray(self.embedder.embed_query(query), dtype=np.float32)
+        except Exception as e:
+            logger.debug(f"Expansion cache: semantic lookup unavailable ({e})")
+            return None
+        norm = float(np.linalg.norm(vector))
+        return vector / norm if norm else None
+
+    def _lookup(self, key: str, now: float) -> Optional[List[str]]:
+        """Exact lookup by normalised key, refreshing its LRU position (lock held)."""
+        row = self._conn.execute(
+            "SELECT queries, created_at FROM expansions WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+
+        value, created_at = row
+        if self.ttl and now - created_at > self.ttl:
+            return None
+
+        try:
+            queries = json.loads(value)
+        except json.JSONDecodeError:
+            logger.warning(f"Discarding corrupt expansion cache entry '{key}'")
+            self._conn.execute("DELETE FROM expansions WHERE key = ?", (key,))
+            self._conn.commit()
+            self._index_loaded = False
+            return None
+
+        self._conn.execute("UPDATE expansions SET last_access = ? WHERE key = ?", (now, key))
+        self._conn.commit()
+        return queries
+
+    def _nearest(self, vector: np.ndarray, query_identifiers: frozenset) -> Optional[Tuple[str, float]]:
+        """Most similar cached query at or above the threshold with the same identifiers (lock held)."""
+        if self._index is None or len(self._index_keys) == 0 or self._index.shape[1] != vector.shape[0]:
+            return None
+        scores = self._index @ vector
+        candidates = np.flatnonzero(scores >= self.similarity)
+        for i in candidates[np.argsort(-scores[candidates], kind="stable")].tolist():
+            if identifiers(self._index_keys[i]) == query_identifiers:
+                return self._index_keys[i], float(scores[i])
+        return None
+
+    def _load_index(self) -> None:
+        """Read the stored embeddings of the current model into memory (lock held)."""
+        if self._index_loaded:
+            return
+        rows = self._conn.execute(
+            "SELECT key, embedding FROM expansions WHERE model = ? AND embedding IS NOT NULL",
+            (self.embedder.model_name,),
+        ).fetchall()
+        self._index_keys = [key for key, _ in rows]
+        vectors = [np.frombuffer(blob, dtype=np.float32) for _, blob in rows]
+        self._index = np.vstack(vectors) if vectors else None
+        self._index_loaded = True
+
+    def _add_to_index(self, key: str, vector: np.ndarray) -> None:
+        """Insert or replace one embedding in the loaded index (lock held)."""
+        if key in self._index_keys:
+            self._index[self._index_keys.index(key)] = vector
+        elif self._index is None:
+            self._index_keys, self._index = [key], vector[np.newaxis, :]
+        else:
+            self._index_keys.append(key)
+            self._index = np.vstack([self._index, vector])
+
+    def _evict(self, now: float) -> int:
+        """Drop expired entries, then least recently used ones above the size cap (lock held)."""
+        evicted = 0
+        if self.ttl:
+            cursor = self._conn.execute(
+                "DELETE FROM expansions WHERE created_at < ?", (now - self.ttl,)
+            )
+            evicted += max(cursor.rowcount, 0)
+
+        if self.max_entries:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM expansions").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM expansions WHERE key IN "
+                    "(SELECT key FROM expansions ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                evicted += overflow
+
+        self.evictions += evicted
+        return evicted
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM expansions").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Get exact/semantic hit and miss counters and current size."""
+        hits = self.exact_hits + self.semantic_hits
+        lookups = hits + self.misses
+        return {
+            "exact_hits": self.exact_hits,
+            "semantic_hits": self.semantic_hits,
+            "misses": self.misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "path": str(self.db_path),
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+# Global expansion cache, opened on first use
+expansion_cache: ExpansionCache = LazyProxy(ExpansionCache, "expansion_cache")
@@ -15,8 +15,6 @@ current_dir = Path(__file__).parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
-from sentence_transformers import SentenceTransformer
-
 # Import with fallback for direct execution
 try:
     from .config import config
@@ -29,6 +27,7 @@ try:
         get_new_or_modified_posts
     )
     from .vector_store import vector_store
+    from .embeddings import embedder
 except ImportError:
     from config import config
     from models import BlogPost, DocumentChunk
@@ -40,6 +39,7 @@ except ImportError:
         get_new_or_modified_posts
     )
     from vector_store import vector_store
+    from embeddings import embedder
 
 logger = logging.getLogger(__name__)
 
@@ -57,10 +57,9 @@ def ingest_knowledge_base(force: bool = False, verbose: bool = False) -> Dict[st
     """
     logger.info("Starting knowledge base ingestion...")
 
-    # Initialize embedding model
+    # Load the shared embedding model, also used to embed search queries
     try:
-        logger.info(f"Loading embedding model: {config.embedding_model}")
-        embed_model = SentenceTransformer(config.embedding_model)
+        embedder.model
     except Exception as e:
         raise Exception(f"Failed to load embedding model: {e}")
 
@@ -134,13 +133,11 @@ def ingest_knowledge_base(force: bool = False, verbose: bool = False) -> Dict[st
                 logger.warning(f"No chunks generated for: {post.title}")
                 continue
 
-            # Generate embeddings for chunks within this post to ensure matching
-            embeddings = embed_model.encode(chunks, show_progress_bar=False)
-
-            # Only process chunks that have corresponding embeddings
-            for i, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+            # Embeddings are generated per storage batch below
+            for i, chunk in enumerate(chunks):
                 # Enhanced metadata for retrieval (ChromaDB requires simple types)
                 metadata = {
+                    "source_type": "blog_post",
                     "source_file": str(post.file_path),
                     "title": post.title,
                     "date": post.date.isoformat() if post.date else None,
@@ -180,7 +177,7 @@ def ingest_knowledge_base(force: bool = False, verbose: bool = False) -> Dict[st
                 logger.info(f"Processing batch {i//batch_size + 1} of {(len(processed_texts) + batch_size - 1)//batch_size}: chunks {i}-{end_idx-1}")
 
                 # Generate embeddings for this batch
-                batch_embeddings = embed_model.encode(batch_texts, show_progress_bar=False)
+                batch_embeddings = embedder.embed_documents(batch_texts)
 
                 # Add batch to vector store
                 vector_store.add_documents(
@@ -247,19 +244,28 @@ def reset_knowledge_base() -> None:
         raise Exception(f"Failed to reset knowledge base: {e}")
 
 
-def search_knowledge_base(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
+def search_knowledge_base(
+    query: str,
+    top_k: int = 5,
+    max_age_days: Optional[float] = None,
+    source_types: Optional[List[str]] = None
+) -> List[Dict[str, Any]]:
     """
     Search the knowledge base for relevant content.
 
     Args:
         query: Search query
         top_k: Number of results to return
+        max_age_days: Only search chunks published within this many days
+        source_types: Only search chunks of these source types
 
     Returns:
         List of search results with metadata
     """
     try:
-        results = vector_store.similarity_search(query, top_k=top_k)
+        results = vector_store.similarity_search(
+            query, top_k=top_k, max_age_days=max_age_days, source_types=source_types
+        )
 
         # Convert to dictionary format for easier consumption
         search_results = []
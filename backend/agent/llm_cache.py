@@ -0,0 +1,219 @@
+"""
+Persistent response cache for LLM chat completions.
+
+Responses are stored in a small SQLite database under ``config.cache_dir`` and
+addressed by a hash of the request payload (model, messages, temperature and
+max_tokens), so identical requests across runs skip the network entirely.
+"""
+
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+
+def make_request_key(
+    model: str,
+    messages: List[Dict[str, str]],
+    temperature: float,
+    max_tokens: int,
+    response_format: Optional[Dict[str, Any]] = None,
+) -> str:
+    """
+    Build a stable content hash for a chat completion request.
+
+    Args:
+        model: Model name
+        messages: Formatted chat messages
+        temperature: Sampling temperature
+        max_tokens: Maximum tokens to generate
+        response_format: Structured output format, if any
+
+    Returns:
+        Hex digest identifying the request payload
+    """
+    request = {
+        "model": model,
+        "messages": messages,
+        "temperature": round(float(temperature), 4),
+        "max_tokens": max_tokens,
+    }
+    if response_format is not None:
+        # Only added when set so keys of plain text requests stay unchanged
+        request["response_format"] = response_format
+    payload = json.dumps(
+        request,
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """Disk-backed LRU cache with TTL for chat completion responses."""
+
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: Optional[int] = None,
+        max_entries: Optional[int] = None,
+    ):
+        self.cache_dir = Path(cache_dir or config.cache_dir)
+        self.ttl = ttl if ttl is not None else config.llm_cache_ttl
+        self.max_entries = max_entries if max_entries is not None else config.llm_cache_max_entries
+        self.db_path = self.cache_dir / "llm_responses.sqlite3"
+
+        self.hits = 0
+        self.misses = 0
+        self.writes = 0
+        self.evictions = 0
+
+        self._lock = threading.Lock()
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                value TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_responses_last_access ON responses (last_access)"
+        )
+        self._conn.commit()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached response.
+
+        Args:
+            key: Request key from ``make_request_key``
+
+        Returns:
+            Cached response payload, or None on miss or expiry
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+
+            if row is None:
+                self.misses += 1
+                return None
+
+            value, created_at = row
+            if self.ttl and now - created_at > self.ttl:
+                self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._conn.commit()
+                self.misses += 1
+                self.evictions += 1
+                return None
+
+            self._conn.execute(
+                "UPDATE responses SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+            self.hits += 1
+
+        try:
+            return json.loads(value)
+        except json.JSONDecodeError:
+            logger.warning(f"Discarding corrupt cache entry {key[:12]}")
+            self.delete(key)
+            return None
+
+    def set(self, key: str, value: Dict[str, Any]) -> None:
+        """
+        Store a response and enforce the TTL and size limits.
+
+        Args:
+            key: Request key from ``make_request_key``
+            value: JSON-serializable response payload
+        """
+        now = time.time()
+        serialized = json.dumps(value, ensure_ascii=False)
+
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, created_at, last_access) VALUES (?, ?, ?, ?)",
+                (key, serialized, now, now),
+            )
+            self.writes += 1
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key: str) -> None:
+        """Remove a single entry from the cache."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self) -> None:
+        """Remove every cached response."""
+        with self._lock:
+            self._conn.execute("DELETE FROM responses")
+            self._conn.commit()
+
+    def _evict(self, now: float) -> None:
+        """Drop expired entries, then least recently used ones above the size cap."""
+        if self.ttl:
+            cursor = self._conn.execute(
+                "DELETE FROM responses WHERE created_at < ?", (now - self.ttl,)
+            )
+            self.evictions += max(cursor.rowcount, 0)
+
+        if self.max_entries:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE key IN "
+                    "(SELECT key FROM responses ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,),
+                )
+                self.evictions += overflow
+
+    def __len__(self) -> int:
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Get hit/miss counters and current size."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "writes": self.writes,
+            "evictions": self.evictions,
+            "entries": len(self),
+            "path": str(self.db_path),
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
@@ -5,14 +5,16 @@ Provides a clean interface for chat completions, streaming, and token counting.
 """
 
 import sys
+import time
 import asyncio
 import logging
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import TYPE_CHECKING, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Any, Tuple, Type, Union
 from dotenv import load_dotenv
 
-from openai import AsyncOpenAI
-from openai import APIError, APITimeoutError
+if TYPE_CHECKING:
+    # The openai package takes seconds to import, so it is only loaded once a client is built
+    from openai import APIError
 
 # Load environment variables from .env file before importing config
 # This ensures OPENAI_API_KEY and other env vars are available
@@ -29,23 +31,150 @@ if str(current_dir) not in sys.path:
 try:
     from .config import config
     from .models import LLMMesssage, LLMResponse
+    from .llm_cache import ResponseCache, make_request_key
+    from .llm_scheduler import RequestScheduler, Priority, scheduler as default_scheduler
+    from .llm_metrics import record_usage, latency_tracker
+    from .llm_resilience import (
+        PERMANENT, RATE_LIMIT, TRANSIENT, CircuitBreaker, classify_error, get_breaker, breaker_stats, retry_delay
+    )
+    from .tokenizer import count_tokens
+    from .structured_output import (
+        JSON_OBJECT, ModelT, StructuredOutputInvalid, parse_structured, repair_messages,
+        response_format_for, with_schema_instructions,
+    )
+    from .utils.lazy import LazyProxy
 except ImportError:
     from config import config
     from models import LLMMesssage, LLMResponse
+    from llm_cache import ResponseCache, make_request_key
+    from llm_scheduler import RequestScheduler, Priority, scheduler as default_scheduler
+    from llm_metrics import record_usage, latency_tracker
+    from llm_resilience import (
+        PERMANENT, RATE_LIMIT, TRANSIENT, CircuitBreaker, classify_error, get_breaker, breaker_stats, retry_delay
+    )
+    from tokenizer import count_tokens
+    from structured_output import (
+        JSON_OBJECT, ModelT, StructuredOutputInvalid, parse_structured, repair_messages,
+        response_format_for, with_schema_instructions,
+    )
+    from utils.lazy import LazyProxy
 
 logger = logging.getLogger(__name__)
 
 
+def _usage_dict(usage: Any) -> Optional[Dict[str, int]]:
+    """Convert an OpenAI usage object into a plain dict."""
+    if usage is None:
+        return None
+    return {
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+    }
+
+
+def _retry_after_seconds(error: "APIError") -> Optional[float]:
+    """Extract the server-requested retry delay from a rate-limit response, if any."""
+    response = getattr(error, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        if headers.get("retry-after-ms"):
+            return float(headers["retry-after-ms"]) / 1000.0
+        if headers.get("retry-after"):
+            return float(headers["retry-after"])
+    except (TypeError, ValueError):
+        pass
+    return None
+
+
 class LLMClientError(Exception):
     """Base exception for LLM-related errors."""
     pass
 
 
-class ModelNotFoundError(LLMClientError):
+class TransientLLMError(LLMClientError):
+    """Raised when a request kept failing in a way that may clear up later (timeouts, 5xx, 429)."""
+    pass
+
+
+class PermanentLLMError(LLMClientError):
+    """Raised without retrying when a request cannot succeed as sent (bad request, auth, quota)."""
+    pass
+
+
+class ModelNotFoundError(PermanentLLMError):
     """Raised when the specified model is not available."""
     pass
 
 
+class CircuitOpenError(TransientLLMError):
+    """Raised without calling the API while the upstream's circuit breaker is open."""
+    pass
+
+
+class StructuredOutputError(LLMClientError):
+    """Raised when a structured response is still invalid after the repair attempt."""
+
+    def __init__(self, message: str, raw: Optional[str] = None):
+        super().__init__(message)
+        self.raw = raw  # The model's original (invalid) answer, for callers with a text fallback
+
+
+class ChatStream:
+    """Async iterator over the content deltas of a streaming chat completion."""
+
+    def __init__(
+        self,
+        client: "OpenAIClient",
+        messages: List[Union[LLMMesssage, Dict[str, str]]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        priority: Optional[Priority],
+        route: Optional[str] = None,
+    ):
+        self.client = client
+        self.messages = messages
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.priority = priority
+        self.route = route
+        # Full response, available once the stream has been consumed
+        self.response: Optional[LLMResponse] = None
+
+    def __aiter__(self) -> AsyncIterator[str]:
+        return self.client._stream_deltas(self)
+
+
+async def stream_to_callback(chat_stream: ChatStream, on_delta: Callable[[str], Awaitable[None]]) -> str:
+    """
+    Consume a chat stream, forwarding each delta to a coroutine.
+
+    Args:
+        chat_stream: Stream returned by ``OpenAIClient.stream_chat``
+        on_delta: Coroutine called with each content delta
+
+    Returns:
+        The full generated text
+    """
+    async for delta in chat_stream:
+        try:
+            await on_delta(delta)
+        except Exception as e:
+            # A slow or disconnected listener must not abort generation
+            logger.debug(f"Stream listener failed: {e}")
+    return chat_stream.response.content if chat_stream.response else ""
+
+
+class _Flight:
+    """An upstream request shared by every caller that issued the same payload."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: "asyncio.Task[LLMResponse]"):
+        self.task = task
+        self.waiters = 0
+
+
 class OpenAIClient:
     """Client for interacting with OpenAI Chat Completions API."""
 
@@ -56,6 +185,8 @@ class OpenAIClient:
         base_url: Optional[str] = None,
         organization: Optional[str] = None,
         timeout: Optional[int] = None,
+        cache: Optional[ResponseCache] = None,
+        scheduler: Optional[RequestScheduler] = None,
     ):
         self.model = model or config.openai_model
         self.api_key = api_key or config.openai_api_key
@@ -70,13 +201,34 @@ class OpenAIClient:
                 "Set OPENAI_API_KEY (or AGENT_OPENAI_API_KEY) in your environment or .env file."
             )
 
+        from openai import AsyncOpenAI
+
         self.client = AsyncOpenAI(
             api_key=self.api_key,
             base_url=self.base_url,
             organization=self.organization,
             timeout=self.timeout,
+            # Retries are handled here so 429s reach the shared scheduler instead of
+            # being retried silently inside the SDK
+            max_retries=0,
         )
 
+        if cache is None and config.llm_cache_enabled:
+            cache = ResponseCache()
+        self.cache = cache
+        # All clients share the process-wide scheduler unless one is injected
+        self.scheduler = scheduler or default_scheduler
+
+        # Identical requests currently awaiting an upstream response, by request key
+        self._inflight: Dict[str, _Flight] = {}
+        self.coalesced = 0
+        # Duplicate requests sent by hedging, and how many of them finished first
+        self.hedged = 0
+        self.hedge_wins = 0
+        # Structured responses that needed a repair request, and those still invalid after it
+        self.structured_repairs = 0
+        self.structured_failures = 0
+
     async def __aenter__(self):
         return self
 
@@ -94,6 +246,11 @@ class OpenAIClient:
         temperature: Optional[float] = None,
         max_tokens: Optional[int] = None,
         stream: bool = False,
+        use_cache: Optional[bool] = None,
+        priority: Optional[Priority] = None,
+        route: Optional[str] = None,
+        hedge: Optional[bool] = None,
+        response_format: Optional[Dict[str, Any]] = None,
     ) -> str:
         """
         Send a chat completion request to OpenAI.
@@ -103,16 +260,571 @@ class OpenAIClient:
             temperature: Sampling temperature (0.0 to 1.0)
             max_tokens: Maximum tokens to generate
             stream: Whether to stream the response
+            use_cache: Serve/store the response in the response cache. By default only
+                deterministic requests (temperature <= llm_cache_max_temperature) are cached;
+                pass True to opt in at higher temperatures or False to bypass the cache.
+                Cache-eligible requests also share one upstream call with identical
+                requests already in flight.
+            priority: Scheduler lane (defaults to the lane set with ``request_priority``)
+            route: Agent role in ``config.llm_routes`` whose model, max_tokens and
+                timeout apply (explicit max_tokens still wins)
+            hedge: Send a duplicate request if the first is slower than the route's
+                recent ``llm_hedge_percentile`` latency, keeping whichever finishes
+                first. Defaults to the route's ``hedge`` setting; ignored when streaming.
+            response_format: Chat completions ``response_format`` (see ``chat_structured``
+                for validated pydantic output); not supported when streaming
 
         Returns:
             Generated text content
         """
+        response = await self.chat_with_usage(
+            messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=stream,
+            use_cache=use_cache,
+            priority=priority,
+            route=route,
+            hedge=hedge,
+            response_format=response_format,
+        )
+        return response.content
+
+    async def chat_with_usage(
+        self,
+        messages: List[Union[LLMMesssage, Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        stream: bool = False,
+        use_cache: Optional[bool] = None,
+        priority: Optional[Priority] = None,
+        route: Optional[str] = None,
+        hedge: Optional[bool] = None,
+        response_format: Optional[Dict[str, Any]] = None,
+    ) -> LLMResponse:
+        """
+        Send a chat completion request and report token usage and latency.
+
+        Takes the same arguments as ``chat``. The response is also recorded
+        against the active ``track_usage()`` scope, if any.
+
+        Returns:
+            LLMResponse with content, usage (prompt/completion/total tokens),
+            finish_reason, model and latency in seconds
+        """
+        if stream:
+            if response_format is not None:
+                raise LLMClientError("response_format is not supported for streaming requests")
+            chat_stream = self.stream_chat(
+                messages, temperature=temperature, max_tokens=max_tokens, priority=priority, route=route
+            )
+            async for _ in chat_stream:
+                pass
+            return chat_stream.response
+
         if temperature is None:
             temperature = config.temperature
+        model, max_tokens, timeout = self._resolve_route(route, max_tokens)
+
+        formatted_messages = self._format_messages(messages)
+
+        cache_key = None
+        if self._should_cache(temperature, stream, use_cache):
+            cache_key = make_request_key(model, formatted_messages, temperature, max_tokens, response_format)
+            # SQLite reads and writes block, so they run off the event loop
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                logger.debug(f"Response cache hit for {cache_key[:12]}")
+                response = LLMResponse(
+                    content=cached["content"],
+                    usage=cached.get("usage"),
+                    finish_reason=cached.get("finish_reason"),
+                    model=model,
+                    latency=0.0,
+                    cached=True,
+                )
+                record_usage(response)
+                return response
+
+        request = {
+            "model": model,
+            "messages": formatted_messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens,
+            "timeout": timeout,
+        }
+        if response_format is not None:
+            request["response_format"] = response_format
+        hedge = self._should_hedge(route, hedge)
+
+        if self._should_coalesce(temperature, use_cache):
+            request_key = cache_key or make_request_key(
+                model, formatted_messages, temperature, max_tokens, response_format
+            )
+            response = await self._coalesce(
+                request_key,
+                lambda: self._complete(request, priority, cache_key, route, hedge),
+            )
+        else:
+            response = await self._complete(request, priority, cache_key, route, hedge)
+
+        record_usage(response)
+        return response
+
+    async def chat_structured(
+        self,
+        messages: List[Union[LLMMesssage, Dict[str, str]]],
+        schema: Type[ModelT],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        use_cache: Optional[bool] = None,
+        priority: Optional[Priority] = None,
+        route: Optional[str] = None,
+    ) -> ModelT:
+        """
+        Get a response validated against a pydantic model.
+
+        The schema is enforced through ``response_format`` (``config.llm_structured_output``
+        selects strict ``json_schema`` or prompt-described ``json_object``). If the
+        answer still fails validation, one repair request on the cheap
+        ``structured_repair`` route converts it instead of regenerating it.
+
+        Args:
+            messages: List of messages with role/content
+            schema: Pydantic model the answer must match
+            temperature, max_tokens, use_cache, priority, route: As for ``chat``
+
+        Returns:
+            Validated instance of ``schema``
+
+        Raises:
+            StructuredOutputError: If the answer is invalid even after the repair attempt
+        """
+        if temperature is None:
+            temperature = config.temperature
+        mode = config.llm_structured_output
+        response_format = response_format_for(schema, mode)
+        formatted_messages = self._format_messages(messages)
+        if mode == JSON_OBJECT:
+            formatted_messages = with_schema_instructions(formatted_messages, schema)
+
+        response = await self.chat_with_usage(
+            formatted_messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            use_cache=use_cache,
+            priority=priority,
+            route=route,
+            response_format=response_format,
+        )
+        try:
+            return parse_structured(response.content, schema)
+        except StructuredOutputInvalid as e:
+            error = e
+
+        self.structured_repairs += 1
+        logger.warning(f"{schema.__name__} response failed validation, attempting repair: {error}")
+        repair = await self.chat_with_usage(
+            repair_messages(schema, response.content, error),
+            temperature=0.0,
+            use_cache=False,
+            priority=priority,
+            route="structured_repair",
+            response_format=response_format,
+        )
+
+        # The cached answer is the invalid one; replace it with the repair or drop it
+        cache_key = None
+        if self._should_cache(temperature, False, use_cache):
+            model, resolved_max_tokens, _ = self._resolve_route(route, max_tokens)
+            cache_key = make_request_key(model, formatted_messages, temperature, resolved_max_tokens, response_format)
+
+        try:
+            result = parse_structured(repair.content, schema)
+        except StructuredOutputInvalid as e:
+            self.structured_failures += 1
+            if cache_key:
+                await asyncio.to_thread(self.cache.delete, cache_key)
+            raise StructuredOutputError(
+                f"{schema.__name__} response invalid after repair: {e}", raw=response.content
+            ) from e
+
+        if cache_key:
+            await asyncio.to_thread(self.cache.set, cache_key, {
+                "content": result.model_dump_json(),
+                "usage": response.usage,
+                "finish_reason": response.finish_reason,
+            })
+        return result
+
+    async def _complete(
+        self,
+        request: Dict[str, Any],
+        priority: Optional[Priority],
+        cache_key: Optional[str],
+        route: Optional[str],
+        hedge: bool,
+    ) -> LLMResponse:
+        """
+        Run a non-streaming completion with retries and store it in the cache.
+
+        Fails fast with ``CircuitOpenError`` while the upstream's circuit is open
+        and raises ``PermanentLLMError`` without retrying errors a retry cannot fix.
+        """
+        estimated_tokens = self._estimate_prompt_tokens(request["messages"]) + request["max_tokens"]
+        latency_key = route or "default"
+        breaker = get_breaker(self.base_url, request["model"])
+
+        for attempt in range(config.max_retries):
+            self._check_circuit(breaker)
+            timeout = self._attempt_timeout(latency_key, request["timeout"], attempt)
+            attempt_request = {**request, "timeout": timeout}
+            try:
+                delay = latency_tracker.percentile(latency_key, config.llm_hedge_percentile) if hedge else None
+                if delay is None:
+                    response = await self._send(attempt_request, estimated_tokens, priority)
+                else:
+                    response = await self._send_hedged(
+                        attempt_request, estimated_tokens, priority, max(delay, config.llm_hedge_min_delay)
+                    )
+            except Exception as e:
+                kind = self._record_failure(breaker, e)
+                if self._is_timeout(e):
+                    # Count the timeout as a sample so adaptive timeouts follow a slowing upstream
+                    latency_tracker.record(latency_key, timeout)
+                await self._backoff_or_raise(e, kind, attempt, request["model"])
+                continue
+            except BaseException:
+                breaker.release()
+                raise
+
+            breaker.record_success()
+            latency_tracker.record(latency_key, response.latency)
+
+            if cache_key and response.content:
+                await asyncio.to_thread(self.cache.set, cache_key, {
+                    "content": response.content,
+                    "usage": response.usage,
+                    "finish_reason": response.finish_reason,
+                })
+            return response
+
+        # Should be unreachable
+        raise LLMClientError("OpenAI chat request failed for unknown reasons")
+
+    async def _send(
+        self,
+        request: Dict[str, Any],
+        estimated_tokens: int,
+        priority: Optional[Priority],
+        admitted: Optional[asyncio.Event] = None,
+    ) -> LLMResponse:
+        """Send one completion request through the scheduler."""
+        async with self.scheduler.slot(estimated_tokens, priority) as ticket:
+            if admitted is not None:
+                admitted.set()
+            started = time.perf_counter()
+            completion = await self.client.chat.completions.create(**request, stream=False)
+            choice = completion.choices[0]
+            response = LLMResponse(
+                content=choice.message.content or "",
+                usage=_usage_dict(completion.usage),
+                finish_reason=choice.finish_reason,
+                model=completion.model or request["model"],
+                latency=time.perf_counter() - started,
+            )
+            ticket.actual_tokens = response.total_tokens or None
+        return response
+
+    async def _send_hedged(
+        self,
+        request: Dict[str, Any],
+        estimated_tokens: int,
+        priority: Optional[Priority],
+        delay: float,
+    ) -> LLMResponse:
+        """
+        Send a request and, if it is still running after ``delay`` seconds, a duplicate.
+
+        The delay counts from when the first request leaves the scheduler, so
+        queueing does not trigger a hedge. Whichever copy succeeds first wins
+        and the other is cancelled; both hold their own scheduler slot.
+        """
+        admitted = asyncio.Event()
+        primary = asyncio.create_task(self._send(request, estimated_tokens, priority, admitted))
+        tasks = [primary]
+        try:
+            admission = asyncio.create_task(admitted.wait())
+            try:
+                await asyncio.wait({primary, admission}, return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                admission.cancel()
+
+            if not primary.done():
+                await asyncio.wait({primary}, timeout=delay)
+            if primary.done():
+                return primary.result()
+
+            logger.debug(f"Hedging {request['model']} request after {delay:.1f}s")
+            self.hedged += 1
+            hedge = asyncio.create_task(self._send(request, estimated_tokens, priority))
+            tasks.append(hedge)
+
+            pending = set(tasks)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is hedge:
+                            self.hedge_wins += 1
+                        return task.result()
+
+            # Both copies failed; surface the original error
+            return primary.result()
+        finally:
+            for task in tasks:
+                if not task.done():
+                    task.cancel()
+
+    async def _coalesce(self, key: str, request: Callable[[], Awaitable[LLMResponse]]) -> LLMResponse:
+        """
+        Share one upstream call between concurrent identical requests.
+
+        The first caller starts the request as a separate task and later
+        callers with the same key await that task instead of sending their
+        own. Callers are shielded from each other: cancelling any of them
+        leaves the shared call running for the rest, and the call is only
+        cancelled once every caller has given up.
+        """
+        flight = self._inflight.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.create_task(request()))
+            self._inflight[key] = flight
+            flight.task.add_done_callback(lambda _task: self._land(key, flight))
+            is_leader = True
+        else:
+            self.coalesced += 1
+            logger.debug(f"Joining in-flight request {key[:12]}")
+            is_leader = False
+
+        flight.waiters += 1
+        try:
+            response = await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if flight.waiters == 0 and not flight.task.done():
+                # Nobody is waiting any more; new callers must start a fresh request
+                self._land(key, flight)
+                flight.task.cancel()
+
+        if is_leader:
+            return response
+        # Followers did not cost an upstream call, so report them like cache hits
+        return response.model_copy(update={"latency": 0.0, "cached": True})
+
+    def _land(self, key: str, flight: "_Flight") -> None:
+        """Forget a finished (or abandoned) in-flight request."""
+        if self._inflight.get(key) is flight:
+            del self._inflight[key]
+
+    def stream_chat(
+        self,
+        messages: List[Union[LLMMesssage, Dict[str, str]]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        priority: Optional[Priority] = None,
+        route: Optional[str] = None,
+    ) -> "ChatStream":
+        """
+        Stream a chat completion as content deltas.
+
+        Usage:
+            stream = llm_client.stream_chat(messages, temperature=0.7)
+            async for delta in stream:
+                await websocket.send_text(delta)
+            full_text = stream.response.content
+
+        Args:
+            messages: List of messages with role/content
+            temperature: Sampling temperature (0.0 to 1.0)
+            max_tokens: Maximum tokens to generate
+            priority: Scheduler lane (defaults to the lane set with ``request_priority``)
+            route: Agent role in ``config.llm_routes`` (see ``chat``)
+
+        Returns:
+            ChatStream yielding text deltas; its ``response`` holds the full
+            LLMResponse (content, usage, latency) once iteration finishes
+        """
+        return ChatStream(self, messages, temperature, max_tokens, priority, route)
+
+    async def _stream_deltas(self, chat_stream: "ChatStream") -> AsyncIterator[str]:
+        """Run a streaming completion with retries, yielding deltas and filling ``chat_stream.response``."""
+        temperature = chat_stream.temperature if chat_stream.temperature is not None else config.temperature
+        model, max_tokens, timeout = self._resolve_route(chat_stream.route, chat_stream.max_tokens)
+        formatted_messages = self._format_messages(chat_stream.messages)
+        prompt_tokens = self._estimate_prompt_tokens(formatted_messages)
+        breaker = get_breaker(self.base_url, model)
+
+        for attempt in range(config.max_retries):
+            self._check_circuit(breaker)
+            emitted = False
+            try:
+                async with self.scheduler.slot(prompt_tokens + max_tokens, chat_stream.priority) as ticket:
+                    started = time.perf_counter()
+                    parts: List[str] = []
+                    usage = None
+                    finish_reason = None
+
+                    async for chunk in await self.client.chat.completions.create(
+                        model=model,
+                        messages=formatted_messages,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        stream=True,
+                        stream_options={"include_usage": True},
+                        timeout=timeout,
+                    ):
+                        # The final chunk carries usage and no choices
+                        if getattr(chunk, "usage", None):
+                            usage = _usage_dict(chunk.usage)
+                        if not chunk.choices:
+                            continue
+                        choice = chunk.choices[0]
+                        if choice.finish_reason:
+                            finish_reason = choice.finish_reason
+                        delta = choice.delta
+                        if delta and getattr(delta, "content", None):
+                            parts.append(delta.content)
+                            emitted = True
+                            yield delta.content
+
+                    content = "".join(parts)
+                    if usage is None:
+                        # Server did not report usage for the stream; fall back to local counts
+                        completion_tokens = self.count_tokens(content)
+                        usage = {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens,
+                        }
+
+                    chat_stream.response = LLMResponse(
+                        content=content,
+                        usage=usage,
+                        finish_reason=finish_reason,
+                        model=model,
+                        latency=time.perf_counter() - started,
+                    )
+                    ticket.actual_tokens = chat_stream.response.total_tokens
+
+                breaker.record_success()
+                record_usage(chat_stream.response)
+                return
+
+            except Exception as e:
+                kind = self._record_failure(breaker, e)
+                if emitted:
+                    # Deltas already reached the consumer, so the stream cannot be replayed
+                    raise LLMClientError(f"OpenAI stream interrupted: {e}") from e
+                await self._backoff_or_raise(e, kind, attempt, model)
+            except BaseException:
+                # Cancelled, or the consumer stopped iterating
+                breaker.release()
+                raise
+
+        raise LLMClientError("OpenAI streaming request failed for unknown reasons")
+
+    async def _backoff_or_raise(self, error: Exception, kind: str, attempt: int, model: str) -> None:
+        """Wait before retrying a failed attempt, or raise if the error is permanent or retries are exhausted."""
+        last_attempt = attempt >= config.max_retries - 1
+
+        if kind == PERMANENT:
+            if getattr(error, "status_code", None) == 404:
+                raise ModelNotFoundError(f"Model '{model}' not found") from error
+            raise PermanentLLMError(f"OpenAI request failed: {error}") from error
+
+        if kind == RATE_LIMIT:
+            # Hold back every queued request, not just this one, until the limit resets
+            delay = _retry_after_seconds(error) or retry_delay(attempt)
+            self.scheduler.defer(delay)
+            if last_attempt:
+                raise TransientLLMError(f"OpenAI rate limit persisted after retries: {error}") from error
+            logger.warning(f"OpenAI rate limit hit, retrying after {delay:.1f}s... ({error})")
+            return
+
+        if last_attempt:
+            raise TransientLLMError(
+                f"OpenAI request failed after {config.max_retries} attempts: {error}"
+            ) from error
+        delay = retry_delay(attempt)
+        logger.warning(f"OpenAI request failed ({error.__class__.__name__}), retrying in {delay:.1f}s... ({error})")
+        await asyncio.sleep(delay)
+
+    def _record_failure(self, breaker: CircuitBreaker, error: Exception) -> str:
+        """Classify a failed attempt and report it to the circuit breaker."""
+        kind = classify_error(error)
+        if kind == TRANSIENT:
+            breaker.record_failure()
+        else:
+            # Rate limits and bad requests say nothing about whether the upstream is up
+            breaker.release()
+        return kind
+
+    def _check_circuit(self, breaker: CircuitBreaker) -> None:
+        """Fail fast while the upstream's circuit is open."""
+        if not breaker.allow_request():
+            raise CircuitOpenError(
+                f"Circuit open for {breaker.name} after repeated failures, retry in {breaker.retry_in():.0f}s"
+            )
+
+    def _attempt_timeout(self, latency_key: str, ceiling: float, attempt: int) -> float:
+        """
+        Get the timeout for one attempt.
+
+        Once the route has enough latency samples this is a multiple of its
+        recent ``llm_timeout_percentile`` latency (at least ``llm_min_timeout``),
+        growing with each retry and never above the route's configured timeout.
+        """
+        if not config.llm_adaptive_timeouts:
+            return ceiling
+        observed = latency_tracker.percentile(latency_key, config.llm_timeout_percentile)
+        if observed is None:
+            return ceiling
+        timeout = max(observed * config.llm_timeout_multiplier, config.llm_min_timeout)
+        return min(timeout * config.retry_backoff ** attempt, ceiling)
+
+    @staticmethod
+    def _is_timeout(error: Exception) -> bool:
+        from openai import APITimeoutError
+
+        return isinstance(error, (APITimeoutError, asyncio.TimeoutError))
+
+    def _should_hedge(self, route: Optional[str], hedge: Optional[bool]) -> bool:
+        """Decide whether a request may be hedged (explicit flag, else the route's setting)."""
+        if hedge is not None:
+            return hedge
+        settings = config.llm_routes.get(route) if route else None
+        return bool(settings and settings.hedge)
+
+    def _resolve_route(self, route: Optional[str], max_tokens: Optional[int]) -> Tuple[str, int, float]:
+        """
+        Get the model, max_tokens and timeout for a request.
+
+        Unset route fields fall back to this client's model and timeout and to
+        ``config.max_tokens``; an explicit ``max_tokens`` overrides the route.
+        """
+        settings = config.llm_routes.get(route) if route else None
+        if route and settings is None:
+            logger.warning(f"Unknown LLM route '{route}', using default model settings")
+
+        model = (settings and settings.model) or self.model
         if max_tokens is None:
-            max_tokens = config.max_tokens
+            max_tokens = (settings and settings.max_tokens) or config.max_tokens
+        timeout = (settings and settings.timeout) or self.timeout
+        return model, max_tokens, timeout
 
-        # Convert messages to expected format
+    def _format_messages(self, messages: List[Union[LLMMesssage, Dict[str, str]]]) -> List[Dict[str, str]]:
+        """Convert messages to the role/content dicts the API expects."""
         formatted_messages: List[Dict[str, str]] = []
         for msg in messages:
             if isinstance(msg, LLMMesssage):
@@ -124,66 +836,53 @@ class OpenAIClient:
                 )
             else:
                 formatted_messages.append(msg)
-
-        for attempt in range(config.max_retries):
-            try:
-                if stream:
-                    content = ""
-                    async for chunk in self.client.chat.completions.create(
-                        model=self.model,
-                        messages=formatted_messages,
-                        temperature=temperature,
-                        max_tokens=max_tokens,
-                        stream=True,
-                    ):
-                        delta = chunk.choices[0].delta
-                        if delta and getattr(delta, "content", None):
-                            content += delta.content
-                    return content
-
-                completion = await self.client.chat.completions.create(
-                    model=self.model,
-                    messages=formatted_messages,
-                    temperature=temperature,
-                    max_tokens=max_tokens,
-                    stream=False,
-                )
-                message = completion.choices[0].message
-                return message.content or ""
-
-            except (APITimeoutError,) as e:
-                if attempt < config.max_retries - 1:
-                    delay = config.retry_delay * (config.retry_backoff ** attempt)
-                    logger.warning(f"OpenAI request timed out, retrying in {delay}s... ({e})")
-                    await asyncio.sleep(delay)
-                else:
-                    raise LLMClientError("OpenAI request timed out after all retries") from e
-            except APIError as e:
-                # Model not found or other API error
-                if getattr(e, "status_code", None) == 404:
-                    raise ModelNotFoundError(f"Model '{self.model}' not found") from e
-                if attempt < config.max_retries - 1:
-                    delay = config.retry_delay * (config.retry_backoff ** attempt)
-                    logger.warning(f"OpenAI API error, retrying in {delay}s... ({e})")
-                    await asyncio.sleep(delay)
-                else:
-                    raise LLMClientError(f"OpenAI request failed after retries: {e}") from e
-            except Exception as e:
-                if attempt < config.max_retries - 1:
-                    delay = config.retry_delay * (config.retry_backoff ** attempt)
-                    logger.warning(f"Unexpected OpenAI error, retrying in {delay}s... ({e})")
-                    await asyncio.sleep(delay)
-                else:
-                    raise LLMClientError(f"Unexpected OpenAI error: {e}") from e
-
-        # Should be unreachable
-        raise LLMClientError("OpenAI chat request failed for unknown reasons")
+        return formatted_messages
+
+    def _should_cache(self, temperature: float, stream: bool, use_cache: Optional[bool]) -> bool:
+        """Decide whether a request may be served from and stored in the response cache."""
+        if self.cache is None or stream or use_cache is False:
+            return False
+        if use_cache:
+            return True
+        return temperature <= config.llm_cache_max_temperature
+
+    def _should_coalesce(self, temperature: float, use_cache: Optional[bool]) -> bool:
+        """Decide whether identical concurrent requests may share one upstream call."""
+        # Same rule as caching: only requests whose caller accepts a reused answer
+        if not config.llm_coalesce_requests or use_cache is False:
+            return False
+        return bool(use_cache) or temperature <= config.llm_cache_max_temperature
+
+    def _estimate_prompt_tokens(self, messages: List[Dict[str, str]]) -> int:
+        """Estimate prompt tokens for scheduler budgeting."""
+        # A few tokens of framing per message on top of the content
+        return sum(self.count_tokens(m.get("content") or "") + 4 for m in messages)
+
+    def cache_stats(self) -> Dict[str, Any]:
+        """Get response cache hit/miss counters and the number of coalesced requests."""
+        if self.cache is None:
+            return {"enabled": False, "coalesced": self.coalesced}
+        return {"enabled": True, "coalesced": self.coalesced, **self.cache.stats()}
+
+    def hedge_stats(self) -> Dict[str, Any]:
+        """Get hedging counters and the latency percentiles they are based on."""
+        return {
+            "hedged": self.hedged,
+            "hedge_wins": self.hedge_wins,
+            "latency": latency_tracker.stats(),
+        }
+
+    def circuit_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get the state of the circuit breaker of every upstream used in this process."""
+        return breaker_stats()
 
     async def generate(
         self,
         prompt: str,
         system_prompt: Optional[str] = None,
         temperature: Optional[float] = None,
+        use_cache: Optional[bool] = None,
+        route: Optional[str] = None,
     ) -> str:
         """
         Generate text using a simple prompt (completion-style).
@@ -192,6 +891,8 @@ class OpenAIClient:
             prompt: The user prompt
             system_prompt: Optional system prompt
             temperature: Sampling temperature
+            use_cache: Response cache behaviour (see ``chat``)
+            route: Agent role in ``config.llm_routes`` (see ``chat``)
 
         Returns:
             Generated text
@@ -201,16 +902,15 @@ class OpenAIClient:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
 
-        return await self.chat(messages, temperature=temperature)
+        return await self.chat(messages, temperature=temperature, use_cache=use_cache, route=route)
 
     def count_tokens(self, text: str) -> int:
         """
-        Estimate token count for text.
+        Count tokens in text for this client's model.
 
-        This is a rough approximation - in production, use tiktoken or similar.
+        Uses tiktoken when available and falls back to a heuristic estimate offline.
         """
-        # Rough approximation: 1 token ≈ 4 characters for English
-        return len(text) // 4
+        return count_tokens(text, self.model)
 
     async def get_model_info(self) -> Dict[str, Any]:
         """Get information about available models."""
@@ -221,5 +921,6 @@ class OpenAIClient:
             raise LLMClientError(f"Failed to get model info: {e}") from e
 
 
-# Global LLM client instance used throughout the agent system
-llm_client = OpenAIClient()
+# Global LLM client instance used throughout the agent system, built on first use
+# so importing the agents does not require an API key
+llm_client: OpenAIClient = LazyProxy(OpenAIClient, "llm_client")
@@ -0,0 +1,218 @@
+"""
+Per-job accounting of LLM usage.
+
+The orchestrator opens a ``track_usage()`` scope for each job and tags each
+workflow phase with ``usage_phase()``; every LLM call made inside the scope is
+recorded against the active phase so token spend can be attributed. Context
+windows packed inside the scope record the prompt tokens they saved, and
+compressed chunks their size before and after.
+
+``latency_tracker`` keeps a rolling window of upstream latencies per route,
+which the client uses to decide when to hedge a slow request.
+"""
+
+import sys
+import logging
+import threading
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Deque, Dict, Optional, Any
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .models import LLMResponse
+except ImportError:
+    from config import config
+    from models import LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_current_tracker: ContextVar[Optional["UsageTracker"]] = ContextVar("llm_usage_tracker", default=None)
+_current_phase: ContextVar[str] = ContextVar("llm_usage_phase", default="other")
+
+
+class UsageTracker:
+    """Aggregates token usage and latency of LLM calls by workflow phase."""
+
+    def __init__(self):
+        self.phases: Dict[str, Dict[str, Any]] = {}
+        self.context_packing = {"windows": 0, "tokens": 0, "heuristic_tokens": 0}
+        self.compression = {"passes": 0, "tokens": 0, "compressed_tokens": 0}
+
+    def record(self, response: LLMResponse, phase: Optional[str] = None) -> None:
+        """
+        Add one LLM response to the totals.
+
+        Args:
+            response: Response returned by the LLM client
+            phase: Phase to attribute it to (defaults to the current phase)
+        """
+        phase = phase or _current_phase.get()
+        totals = self.phases.setdefault(phase, {
+            "calls": 0,
+            "cached_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "latency": 0.0,
+        })
+
+        totals["calls"] += 1
+        if response.cached:
+            # Cache hits cost nothing upstream, so keep them out of the token totals
+            totals["cached_calls"] += 1
+            return
+
+        totals["prompt_tokens"] += response.prompt_tokens
+        totals["completion_tokens"] += response.completion_tokens
+        totals["total_tokens"] += response.total_tokens
+        totals["latency"] += response.latency or 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Get per-phase and overall totals."""
+        overall = {
+            "calls": 0,
+            "cached_calls": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "total_tokens": 0,
+            "latency": 0.0,
+        }
+        phases = {}
+        for phase, totals in self.phases.items():
+            phases[phase] = {**totals, "latency": round(totals["latency"], 3)}
+            for key in overall:
+                overall[key] += totals[key]
+        overall["latency"] = round(overall["latency"], 3)
+
+        packing = {
+            **self.context_packing,
+            "tokens_saved": self.context_packing["heuristic_tokens"] - self.context_packing["tokens"],
+        }
+        compression = {
+            **self.compression,
+            "ratio": round(self.compression["compressed_tokens"] / self.compression["tokens"], 3)
+            if self.compression["tokens"] else 1.0,
+        }
+        return {**overall, "phases": phases, "context_packing": packing, "compression": compression}
+
+
+@contextmanager
+def track_usage():
+    """
+    Collect usage of every LLM call made within the block.
+
+    Usage:
+        with track_usage() as usage:
+            await orchestrator.generate_blog_post(topic, spec_data)
+        print(usage.summary())
+    """
+    tracker = UsageTracker()
+    token = _current_tracker.set(tracker)
+    try:
+        yield tracker
+    finally:
+        _current_tracker.reset(token)
+
+
+@contextmanager
+def usage_phase(phase: str):
+    """Attribute LLM calls made within the block to a workflow phase."""
+    token = _current_phase.set(phase)
+    try:
+        yield
+    finally:
+        _current_phase.reset(token)
+
+
+def current_phase() -> str:
+    """Get the workflow phase of the current context."""
+    return _current_phase.get()
+
+
+def record_usage(response: LLMResponse) -> None:
+    """Record a response against the active tracker, if any."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.record(response)
+
+
+def record_context_packing(tokens: int, heuristic_tokens: int) -> None:
+    """Record a packed context window and the tokens the character heuristic would have used."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.context_packing["windows"] += 1
+        tracker.context_packing["tokens"] += tokens
+        tracker.context_packing["heuristic_tokens"] += heuristic_tokens
+
+
+def record_compression(tokens: int, compressed_tokens: int) -> None:
+    """Record the size of retrieved chunks before and after sentence compression."""
+    tracker = _current_tracker.get()
+    if tracker is not None:
+        tracker.compression["passes"] += 1
+        tracker.compression["tokens"] += tokens
+        tracker.compression["compressed_tokens"] += compressed_tokens
+
+
+class LatencyTracker:
+    """Rolling window of recent upstream latencies, kept per route."""
+
+    def __init__(self, window: Optional[int] = None, min_samples: Optional[int] = None):
+        self.window = window if window is not None else config.llm_latency_window
+        self.min_samples = min_samples if min_samples is not None else config.llm_hedge_min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def record(self, route: str, latency: Optional[float]) -> None:
+        """Add one latency sample (seconds) for a route."""
+        if latency is None:
+            return
+        with self._lock:
+            samples = self._samples.get(route)
+            if samples is None:
+                samples = self._samples[route] = deque(maxlen=self.window)
+            samples.append(latency)
+
+    def percentile(self, route: str, percentile: float) -> Optional[float]:
+        """
+        Get a latency percentile for a route.
+
+        Args:
+            route: Route name
+            percentile: Percentile in the range 0-100
+
+        Returns:
+            Latency in seconds, or None until ``min_samples`` have been recorded
+        """
+        with self._lock:
+            samples = sorted(self._samples.get(route, ()))
+        if not samples or len(samples) < self.min_samples:
+            return None
+        # Nearest-rank percentile
+        rank = max(0, min(len(samples) - 1, int(round(percentile / 100 * len(samples))) - 1))
+        return samples[rank]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get sample count and p50/p95 latency per route."""
+        with self._lock:
+            routes = {route: sorted(samples) for route, samples in self._samples.items()}
+        return {
+            route: {
+                "samples": len(samples),
+                "p50": round(samples[len(samples) // 2], 3),
+                "p95": round(samples[min(len(samples) - 1, int(len(samples) * 0.95))], 3),
+            }
+            for route, samples in routes.items() if samples
+        }
+
+
+# Global latency tracker shared by every LLM client in the process
+latency_tracker = LatencyTracker()
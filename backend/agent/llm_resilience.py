@@ -0,0 +1,202 @@
+"""
+Failure handling for LLM requests.
+
+Classifies errors as rate limits, transient failures worth retrying, or
+permanent failures that will not succeed on retry; computes jittered retry
+delays; and keeps a circuit breaker per upstream (base URL and model) so that
+during an outage requests fail fast instead of piling up retries.
+"""
+
+import sys
+import time
+import random
+import asyncio
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Any, Tuple
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+RATE_LIMIT = "rate_limit"
+TRANSIENT = "transient"
+PERMANENT = "permanent"
+
+# HTTP statuses that may succeed when retried
+TRANSIENT_STATUS_CODES = {408, 409, 500, 502, 503, 504}
+
+
+def classify_error(error: BaseException) -> str:
+    """
+    Decide how a failed request should be handled.
+
+    Returns:
+        RATE_LIMIT for 429s (retry after the scheduler pause), TRANSIENT for
+        timeouts, connection errors and server errors, PERMANENT for anything
+        a retry cannot fix (bad request, auth, unknown model, exhausted quota,
+        bugs in our own code)
+    """
+    from openai import APIConnectionError, APIStatusError, APITimeoutError, RateLimitError
+
+    if isinstance(error, RateLimitError):
+        # An exhausted quota is reported as a 429 but will not clear by waiting
+        if getattr(error, "code", None) == "insufficient_quota":
+            return PERMANENT
+        return RATE_LIMIT
+    if isinstance(error, (APITimeoutError, APIConnectionError, asyncio.TimeoutError, ConnectionError)):
+        return TRANSIENT
+    if isinstance(error, APIStatusError):
+        status = getattr(error, "status_code", None)
+        if status in TRANSIENT_STATUS_CODES or (status is not None and status >= 500):
+            return TRANSIENT
+        return PERMANENT
+    return PERMANENT
+
+
+def retry_delay(attempt: int) -> float:
+    """
+    Backoff before retry ``attempt`` (0-based), with jitter.
+
+    Uses "equal jitter": half of the exponential delay is fixed and the other
+    half random, so concurrent jobs that failed together do not retry in lockstep.
+    """
+    delay = config.retry_delay * (config.retry_backoff ** attempt)
+    return delay / 2 + random.uniform(0, delay / 2)
+
+
+class CircuitBreaker:
+    """
+    Closed / open / half-open circuit breaker for one upstream.
+
+    After ``failure_threshold`` consecutive transient failures the circuit
+    opens and requests are rejected immediately. Once ``reset_timeout``
+    seconds have passed it lets ``half_open_requests`` probe requests through;
+    a successful probe closes the circuit and a failed one reopens it.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        failure_threshold: Optional[int] = None,
+        reset_timeout: Optional[float] = None,
+        half_open_requests: Optional[int] = None,
+    ):
+        self.name = name
+        self.failure_threshold = (
+            failure_threshold if failure_threshold is not None else config.llm_breaker_failure_threshold
+        )
+        self.reset_timeout = reset_timeout if reset_timeout is not None else config.llm_breaker_reset_timeout
+        self.half_open_requests = (
+            half_open_requests if half_open_requests is not None else config.llm_breaker_half_open_requests
+        )
+
+        self._state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probes = 0
+        self._lock = threading.Lock()
+
+        self.times_opened = 0
+        self.rejected = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == self.OPEN and now - self._opened_at >= self.reset_timeout:
+            self._state = self.HALF_OPEN
+            self._probes = 0
+        return self._state
+
+    def allow_request(self) -> bool:
+        """Whether a request may be sent now (reserves a probe slot when half-open)."""
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == self.CLOSED:
+                return True
+            if state == self.HALF_OPEN and self._probes < self.half_open_requests:
+                self._probes += 1
+                return True
+            self.rejected += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"Circuit for {self.name} closed")
+            self._state = self.CLOSED
+            self._failures = 0
+            self._probes = 0
+
+    def record_failure(self) -> None:
+        """Count a transient failure, opening the circuit at the threshold."""
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self.times_opened += 1
+                    logger.warning(
+                        f"Circuit for {self.name} opened after {self._failures} consecutive failures, "
+                        f"failing fast for {self.reset_timeout:.0f}s"
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._probes = 0
+
+    def release(self) -> None:
+        """End a request that says nothing about upstream health (cancelled, rate limited, bad request)."""
+        with self._lock:
+            if self._state == self.HALF_OPEN and self._probes > 0:
+                self._probes -= 1
+
+    def retry_in(self) -> float:
+        """Seconds until the circuit will admit a probe."""
+        with self._lock:
+            if self._current_state(time.monotonic()) != self.OPEN:
+                return 0.0
+            return max(0.0, self._opened_at + self.reset_timeout - time.monotonic())
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self._failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+_breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
+
+
+def get_breaker(base_url: str, model: str) -> CircuitBreaker:
+    """Get the process-wide circuit breaker for an upstream base URL and model."""
+    key = (base_url, model)
+    with _breakers_lock:
+        breaker = _breakers.get(key)
+        if breaker is None:
+            breaker = _breakers[key] = CircuitBreaker(f"{model} at {base_url}")
+        return breaker
+
+
+def breaker_stats() -> Dict[str, Dict[str, Any]]:
+    """Get the state of every circuit breaker in the process."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return {breaker.name: breaker.stats() for breaker in breakers}
@@ -0,0 +1,289 @@
+"""
+Admission scheduler for LLM requests.
+
+Every chat completion in the process passes through a shared scheduler that
+enforces requests-per-minute and tokens-per-minute budgets with token buckets,
+caps concurrency, honours ``Retry-After`` from rate-limited responses, and
+admits queued requests by priority lane.
+"""
+
+import sys
+import time
+import heapq
+import asyncio
+import logging
+import itertools
+from contextlib import asynccontextmanager, contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from pathlib import Path
+from typing import Dict, List, Optional, Any
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+
+class Priority(IntEnum):
+    """Priority lanes for LLM requests (lower value is admitted first)."""
+
+    INTERACTIVE = 0  # API jobs a user is waiting on
+    NORMAL = 1       # CLI and ad-hoc runs
+    BATCH = 2        # Nightly RSS pipeline runs
+
+
+_current_priority: ContextVar[Priority] = ContextVar("llm_request_priority", default=Priority.NORMAL)
+
+
+@contextmanager
+def request_priority(priority: Priority):
+    """
+    Run LLM requests issued within the block (and tasks spawned from it) in a priority lane.
+
+    Usage:
+        with request_priority(Priority.BATCH):
+            await orchestrator.generate_blog_post(topic, spec_data)
+    """
+    token = _current_priority.set(priority)
+    try:
+        yield
+    finally:
+        _current_priority.reset(token)
+
+
+def current_priority() -> Priority:
+    """Get the priority lane of the current context."""
+    return _current_priority.get()
+
+
+class TokenBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        self.rate = per_minute / 60.0
+        self.capacity = capacity if capacity is not None else per_minute
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+
+    @property
+    def unlimited(self) -> bool:
+        return self.rate <= 0
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.updated_at = now
+        self.tokens = min(self.capacity, self.tokens + elapsed * self.rate)
+
+    def wait_time(self, amount: float, now: Optional[float] = None) -> float:
+        """Seconds until ``amount`` tokens are available (0 if available now)."""
+        if self.unlimited:
+            return 0.0
+        self._refill(now if now is not None else time.monotonic())
+        amount = min(amount, self.capacity)
+        if self.tokens >= amount:
+            return 0.0
+        return (amount - self.tokens) / self.rate
+
+    def consume(self, amount: float) -> None:
+        if not self.unlimited:
+            self.tokens -= min(amount, self.capacity)
+
+    def refund(self, amount: float) -> None:
+        if not self.unlimited:
+            self.tokens = min(self.capacity, self.tokens + amount)
+
+
+class _Waiter:
+    """A queued admission request."""
+
+    __slots__ = ("sort_key", "tokens", "priority")
+
+    def __init__(self, priority: Priority, is_short: bool, seq: int, tokens: int):
+        self.sort_key = (int(priority), 0 if is_short else 1, seq)
+        self.tokens = tokens
+        self.priority = priority
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return self.sort_key < other.sort_key
+
+
+class Ticket:
+    """An admitted request holding a concurrency slot and reserved token budget."""
+
+    __slots__ = ("reserved_tokens", "actual_tokens", "priority", "admitted_at", "queued_for")
+
+    def __init__(self, reserved_tokens: int, priority: Priority, queued_for: float):
+        self.reserved_tokens = reserved_tokens
+        self.actual_tokens: Optional[int] = None
+        self.priority = priority
+        self.admitted_at = time.monotonic()
+        self.queued_for = queued_for
+
+
+class RequestScheduler:
+    """Priority admission control with RPM/TPM token buckets and a concurrency cap."""
+
+    def __init__(
+        self,
+        requests_per_minute: Optional[int] = None,
+        tokens_per_minute: Optional[int] = None,
+        max_concurrency: Optional[int] = None,
+        short_request_tokens: Optional[int] = None,
+    ):
+        rpm = requests_per_minute if requests_per_minute is not None else config.llm_requests_per_minute
+        tpm = tokens_per_minute if tokens_per_minute is not None else config.llm_tokens_per_minute
+        self.requests = TokenBucket(rpm)
+        self.tokens = TokenBucket(tpm)
+        self.max_concurrency = max_concurrency if max_concurrency is not None else config.llm_max_concurrency
+        self.short_request_tokens = (
+            short_request_tokens if short_request_tokens is not None else config.llm_short_request_tokens
+        )
+
+        self._queue: List[_Waiter] = []
+        self._seq = itertools.count()
+        self._listeners: List[asyncio.Future] = []
+        self._active = 0
+        self._paused_until = 0.0
+
+        self.admitted = 0
+        self.throttled = 0
+        self.total_queue_time = 0.0
+
+    async def acquire(self, estimated_tokens: int, priority: Optional[Priority] = None) -> Ticket:
+        """
+        Wait until the request may be sent upstream.
+
+        Args:
+            estimated_tokens: Prompt tokens plus max_tokens for the request
+            priority: Priority lane (defaults to the current context's lane)
+
+        Returns:
+            Ticket to pass to ``release`` once the request completes
+        """
+        if priority is None:
+            priority = current_priority()
+
+        enqueued_at = time.monotonic()
+        waiter = _Waiter(priority, estimated_tokens <= self.short_request_tokens, next(self._seq), estimated_tokens)
+        heapq.heappush(self._queue, waiter)
+
+        try:
+            while True:
+                delay = None
+                if self._queue[0] is waiter and (self.max_concurrency <= 0 or self._active < self.max_concurrency):
+                    delay = self._admission_delay(estimated_tokens)
+                    if delay <= 0:
+                        heapq.heappop(self._queue)
+                        self.requests.consume(1)
+                        self.tokens.consume(estimated_tokens)
+                        self._active += 1
+                        self.admitted += 1
+
+                        queued_for = time.monotonic() - enqueued_at
+                        self.total_queue_time += queued_for
+                        if queued_for > 1.0:
+                            logger.info(f"LLM request admitted after {queued_for:.1f}s in {priority.name} lane")
+                        # The next waiter may also be admissible now
+                        self._notify()
+                        return Ticket(estimated_tokens, priority, queued_for)
+
+                await self._wait_for_change(delay)
+        except BaseException:
+            if waiter in self._queue:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                self._notify()
+            raise
+
+    def release(self, ticket: Ticket, actual_tokens: Optional[int] = None) -> None:
+        """
+        Free the ticket's concurrency slot.
+
+        Args:
+            ticket: Ticket returned by ``acquire``
+            actual_tokens: Tokens actually used; unused reservation is refunded
+        """
+        self._active = max(0, self._active - 1)
+        if actual_tokens is not None and actual_tokens < ticket.reserved_tokens:
+            self.tokens.refund(ticket.reserved_tokens - actual_tokens)
+        self._notify()
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int, priority: Optional[Priority] = None):
+        """Acquire a ticket for the duration of the block."""
+        ticket = await self.acquire(estimated_tokens, priority)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket, ticket.actual_tokens)
+
+    def defer(self, seconds: float) -> None:
+        """
+        Pause all admissions, e.g. after a 429 with ``Retry-After``.
+
+        Args:
+            seconds: How long to hold back new requests
+        """
+        self.throttled += 1
+        resume_at = time.monotonic() + max(0.0, seconds)
+        if resume_at > self._paused_until:
+            self._paused_until = resume_at
+            logger.warning(f"LLM rate limited, pausing admissions for {seconds:.1f}s")
+        self._notify()
+
+    def _admission_delay(self, estimated_tokens: int) -> float:
+        now = time.monotonic()
+        return max(
+            self._paused_until - now,
+            self.requests.wait_time(1, now),
+            self.tokens.wait_time(estimated_tokens, now),
+        )
+
+    async def _wait_for_change(self, timeout: Optional[float]) -> None:
+        """Sleep until the queue changes or ``timeout`` elapses."""
+        listener = asyncio.get_running_loop().create_future()
+        self._listeners.append(listener)
+        try:
+            await asyncio.wait_for(listener, timeout)
+        except asyncio.TimeoutError:
+            pass
+        finally:
+            if listener in self._listeners:
+                self._listeners.remove(listener)
+
+    def _notify(self) -> None:
+        listeners, self._listeners = self._listeners, []
+        for listener in listeners:
+            if not listener.done():
+                listener.get_loop().call_soon_threadsafe(_resolve, listener)
+
+    def stats(self) -> Dict[str, Any]:
+        """Get queue depth per lane and admission counters."""
+        queued = {p.name.lower(): 0 for p in Priority}
+        for waiter in self._queue:
+            queued[waiter.priority.name.lower()] += 1
+        return {
+            "active": self._active,
+            "queued": queued,
+            "admitted": self.admitted,
+            "throttled": self.throttled,
+            "paused_for": round(max(0.0, self._paused_until - time.monotonic()), 2),
+            "avg_queue_time": round(self.total_queue_time / self.admitted, 3) if self.admitted else 0.0,
+        }
+
+
+def _resolve(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+# Global scheduler shared by every LLM client in the process
+scheduler = RequestScheduler()
@@ -43,6 +43,8 @@ class Document(BaseModel):
 
     page_content: str
     metadata: Dict[str, Any] = Field(default_factory=dict)
+    # Stored chunk embedding, only set when requested from the vector store (not serialized)
+    embedding: Optional[Any] = Field(default=None, exclude=True, repr=False)
 
     class Config:
         arbitrary_types_allowed = True
@@ -62,6 +64,9 @@ class GenerationSpec(BaseModel):
     special_requirements: Optional[str] = None
     min_words: int = Field(default=1000)
     max_words: int = Field(default=1500)
+    # Retrieval scope: chunks published within this many days / of these source types (None = all)
+    context_max_age_days: Optional[int] = None
+    context_source_types: Optional[List[str]] = None
 
 
 class ResearchBrief(BaseModel):
@@ -75,6 +80,33 @@ class ResearchBrief(BaseModel):
     context_documents: List[Document] = Field(default_factory=list)
 
 
+class ResearchAnalysis(BaseModel):
+    """Structured LLM output for a research brief."""
+
+    key_themes: List[str] = Field(default_factory=list, description="Main themes and concepts found in the context")
+    relevant_facts: List[str] = Field(default_factory=list, description="Key facts, statistics or findings")
+    related_topics: List[str] = Field(default_factory=list, description="Topics covered in related posts")
+    gaps_identified: List[str] = Field(default_factory=list, description="Areas not well covered yet")
+    recommended_focus: List[str] = Field(default_factory=list, description="Suggested focus areas for the new post")
+
+    def to_brief(self, context_documents: Optional[List[Document]] = None) -> ResearchBrief:
+        return ResearchBrief(**self.model_dump(), context_documents=context_documents or [])
+
+
+class RetrieverSynthesis(BaseModel):
+    """Structured LLM output of the retriever's context synthesis."""
+
+    summary: str = Field(description="Concise synthesis of the retrieved context and its relation to the topic")
+    excerpts: List[str] = Field(default_factory=list, description="Most relevant quotes or paraphrases")
+
+
+class EvaluationVerdict(BaseModel):
+    """Structured LLM output of the evaluator."""
+
+    approved: bool = Field(description="Whether the draft meets the publishing criteria")
+    feedback: str = Field(description="Short reason if approved, otherwise specific actionable feedback")
+
+
 class ContentOutline(BaseModel):
     """Structured outline for the blog post."""
 
@@ -109,6 +141,22 @@ class LLMResponse(BaseModel):
     content: str
     usage: Optional[Dict[str, int]] = None
     finish_reason: Optional[str] = None
+    model: Optional[str] = None
+    latency: Optional[float] = None  # seconds spent on the upstream request
+    cached: bool = False
+
+    @property
+    def prompt_tokens(self) -> int:
+        return (self.usage or {}).get("prompt_tokens", 0)
+
+    @property
+    def completion_tokens(self) -> int:
+        return (self.usage or {}).get("completion_tokens", 0)
+
+    @property
+    def total_tokens(self) -> int:
+        usage = self.usage or {}
+        return usage.get("total_tokens", self.prompt_tokens + self.completion_tokens)
 
 
 class ValidationResult(BaseModel):
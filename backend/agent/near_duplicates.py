@@ -0,0 +1,298 @@
+"""
+Near-duplicate detection for ingested chunks with MinHash and LSH banding.
+
+The same wire story reaches the knowledge base through several feeds. Each
+chunk gets a MinHash signature over its word shingles; the signature is
+split into bands, and chunks sharing any band bucket are compared by the
+fraction of equal signature values (an estimate of their Jaccard
+similarity). Chunks at or above ``near_duplicate_threshold`` are skipped
+before embedding and linked to the stored chunk they duplicate.
+
+Signatures, band buckets and duplicate links live in a small SQLite
+database next to the vector store. The index belongs to one collection:
+when the collection is recreated (its id changes) the index starts over.
+Chunks can also be deleted from the collection without going through the
+index (e.g. by ``clean_vector_store.py``), so a stored match is confirmed
+to still exist before a chunk is skipped; stale entries are dropped.
+"""
+
+import re
+import sys
+import time
+import zlib
+import sqlite3
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Any, Set, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+# Largest Mersenne prime below 2**64 used by the universal hash family
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+
+
+def shingle_hashes(text: str, size: int) -> np.ndarray:
+    """32-bit hashes of the distinct ``size``-word shingles of a text."""
+    words = re.findall(r"\w+", text.lower())
+    if len(words) <= size:
+        shingles = {" ".join(words)}
+    else:
+        shingles = {" ".join(words[i:i + size]) for i in range(len(words) - size + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+class MinHasher:
+    """MinHash signatures from a fixed family of random hash functions."""
+
+    def __init__(self, num_perm: int, shingle_size: int, seed: int = 1):
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+        self._b = rng.integers(0, int(_MERSENNE_PRIME), size=num_perm, dtype=np.uint64)
+
+    def signature(self, text: str) -> np.ndarray:
+        """Signature of shape (num_perm,), as uint32."""
+        hashes = shingle_hashes(text, self.shingle_size)
+        # uint64 arithmetic wraps on overflow, which is fine for hashing
+        permuted = (np.outer(self._a, hashes) + self._b[:, np.newaxis]) % _MERSENNE_PRIME & _MAX_HASH
+        return permuted.min(axis=1).astype(np.uint32)
+
+
+def estimate_similarity(first: np.ndarray, second: np.ndarray) -> float:
+    """Estimated Jaccard similarity of two signatures."""
+    return float(np.mean(first == second))
+
+
+class NearDuplicateIndex:
+    """Persistent LSH index of chunk signatures for one vector store collection."""
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Optional[Path] = None,
+        threshold: Optional[float] = None,
+        num_perm: Optional[int] = None,
+        bands: Optional[int] = None,
+        shingle_size: Optional[int] = None,
+        exists: Optional[Callable[[List[str]], Set[str]]] = None,
+    ):
+        """
+        Args:
+            namespace: Identity of the collection the index describes (its id)
+            path: SQLite file (defaults to ``near_duplicates.sqlite3`` in ``config.vector_db_dir``)
+            threshold: Estimated Jaccard similarity at which a chunk counts as a duplicate
+            num_perm: Signature length
+            bands: LSH bands (``num_perm`` must be divisible by it)
+            shingle_size: Words per shingle
+            exists: Returns which of the given chunk ids are still in the collection
+                (e.g. ``VectorStore.existing_ids``); without it every indexed chunk counts as stored
+        """
+        self.exists = exists
+        self.threshold = threshold if threshold is not None else config.near_duplicate_threshold
+        num_perm = num_perm or config.near_duplicate_num_perm
+        self.bands = bands or config.near_duplicate_bands
+        if num_perm % self.bands:
+            raise ValueError(f"Signature length {num_perm} is not divisible into {self.bands} bands")
+        self.rows = num_perm // self.bands
+        self.hasher = MinHasher(num_perm, shingle_size or config.near_duplicate_shingle_size)
+        self.path = Path(path or Path(config.vector_db_dir) / "near_duplicates.sqlite3")
+
+        # Chunks checked in this batch but not stored yet (see commit / rollback)
+        self._pending: Dict[str, np.ndarray] = {}
+        self._pending_buckets: Dict[int, List[str]] = {}
+        self._pending_links: List[Tuple[str, str, float]] = []
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS signatures (chunk_id TEXT PRIMARY KEY, signature BLOB NOT NULL);
+            CREATE TABLE IF NOT EXISTS bands (bucket INTEGER NOT NULL, chunk_id TEXT NOT NULL);
+            CREATE INDEX IF NOT EXISTS idx_bands_bucket ON bands (bucket);
+            CREATE TABLE IF NOT EXISTS duplicates (
+                chunk_id TEXT PRIMARY KEY,
+                canonical_id TEXT NOT NULL,
+                similarity REAL NOT NULL,
+                created_at REAL NOT NULL
+            );
+            """
+        )
+        self._open_namespace(f"{namespace}:{num_perm}:{self.bands}:{self.hasher.shingle_size}")
+
+    def _open_namespace(self, namespace: str) -> None:
+        """Start over when the collection or the signature parameters changed."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'namespace'").fetchone()
+        if row is None or row[0] != namespace:
+            if row is not None:
+                logger.info("Vector store collection changed, clearing near-duplicate index")
+            self._conn.execute("DELETE FROM signatures")
+            self._conn.execute("DELETE FROM bands")
+            self._conn.execute("DELETE FROM duplicates")
+            self._conn.execute("INSERT OR REPLACE INTO meta (key, value) VALUES ('namespace', ?)", (namespace,))
+        self._conn.commit()
+
+    def _buckets(self, signature: np.ndarray) -> List[int]:
+        """One signed 64-bit bucket per band (the band number is part of the hash)."""
+        buckets = []
+        for band in range(self.bands):
+            chunk = signature[band * self.rows:(band + 1) * self.rows].tobytes()
+            digest = hashlib.blake2b(bytes([band]) + chunk, digest_size=8).digest()
+            buckets.append(int.from_bytes(digest, "big", signed=True))
+        return buckets
+
+    def check(self, chunk_ids: List[str], texts: List[str]) -> List[Optional[Tuple[str, float]]]:
+        """
+        Find the canonical chunk of each text, staging the new ones.
+
+        Texts are compared with the stored chunks and with the new chunks
+        earlier in the same call. Chunks whose id is already indexed match
+        themselves, so re-ingesting an article is skipped as well.
+
+        Args:
+            chunk_ids: Ids the chunks would be stored under
+            texts: Chunk texts
+
+        Returns:
+            Per chunk, ``(canonical_id, similarity)`` for a duplicate or None for a new chunk
+        """
+        signatures = [self.hasher.signature(text) for text in texts]
+        matches: List[Optional[Tuple[str, float]]] = []
+
+        with self._lock:
+            for chunk_id, signature in zip(chunk_ids, signatures):
+                buckets = self._buckets(signature)
+                match = self._best_match(signature, buckets)
+                matches.append(match)
+                if match is None:
+                    self._pending[chunk_id] = signature
+                    for bucket in buckets:
+                        self._pending_buckets.setdefault(bucket, []).append(chunk_id)
+                elif match[0] != chunk_id:
+                    self._pending_links.append((chunk_id, match[0], match[1]))
+        return matches
+
+    def _best_match(self, signature: np.ndarray, buckets: List[int]) -> Optional[Tuple[str, float]]:
+        """Most similar stored or staged chunk at or above the threshold (lock held)."""
+        candidates: Dict[str, np.ndarray] = {}
+        for bucket in buckets:
+            for chunk_id in self._pending_buckets.get(bucket, ()):
+                candidates[chunk_id] = self._pending[chunk_id]
+
+        placeholders = ",".join("?" * len(buckets))
+        rows = self._conn.execute(
+            f"SELECT DISTINCT s.chunk_id, s.signature FROM bands b JOIN signatures s ON s.chunk_id = b.chunk_id "
+            f"WHERE b.bucket IN ({placeholders})",
+            buckets,
+        ).fetchall()
+        for chunk_id, blob in rows:
+            candidates.setdefault(chunk_id, np.frombuffer(blob, dtype=np.uint32))
+
+        similar = {}
+        for chunk_id, candidate in candidates.items():
+            similarity = estimate_similarity(signature, candidate)
+            if similarity >= self.threshold:
+                similar[chunk_id] = similarity
+
+        stored = [chunk_id for chunk_id in similar if chunk_id not in self._pending]
+        if stored and self.exists is not None:
+            try:
+                live = self.exists(stored)
+            except Exception as e:
+                logger.warning(f"Could not confirm near-duplicate matches are stored: {e}")
+                live = set(stored)
+            stale = [chunk_id for chunk_id in stored if chunk_id not in live]
+            if stale:
+                logger.info(f"Dropping {len(stale)} chunks deleted from the collection from the near-duplicate index")
+                self._remove(stale)
+                self._conn.commit()
+                for chunk_id in stale:
+                    del similar[chunk_id]
+
+        if not similar:
+            return None
+        best = max(similar, key=similar.get)
+        return best, similar[best]
+
+    def commit(self) -> None:
+        """Persist the chunks staged by ``check`` once they are stored."""
+        now = time.time()
+        with self._lock:
+            for chunk_id, signature in self._pending.items():
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO signatures (chunk_id, signature) VALUES (?, ?)",
+                    (chunk_id, signature.tobytes()),
+                )
+                self._conn.execute("DELETE FROM bands WHERE chunk_id = ?", (chunk_id,))
+            self._conn.executemany(
+                "INSERT INTO bands (bucket, chunk_id) VALUES (?, ?)",
+                [(bucket, chunk_id) for bucket, ids in self._pending_buckets.items() for chunk_id in ids],
+            )
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO duplicates (chunk_id, canonical_id, similarity, created_at) VALUES (?, ?, ?, ?)",
+                [(chunk_id, canonical, similarity, now) for chunk_id, canonical, similarity in self._pending_links],
+            )
+            self._conn.commit()
+            self._clear_pending()
+
+    def rollback(self) -> None:
+        """Forget the chunks staged by ``check`` (they were not stored)."""
+        with self._lock:
+            self._clear_pending()
+
+    def _clear_pending(self) -> None:
+        self._pending, self._pending_buckets, self._pending_links = {}, {}, []
+
+    def remove(self, chunk_ids: Iterable[str]) -> None:
+        """Forget chunks deleted from the collection, with the duplicate links to them."""
+        with self._lock:
+            self._remove(list(chunk_ids))
+            self._conn.commit()
+
+    def _remove(self, chunk_ids: List[str]) -> None:
+        for start in range(0, len(chunk_ids), 500):
+            batch = chunk_ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            self._conn.execute(f"DELETE FROM signatures WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(f"DELETE FROM bands WHERE chunk_id IN ({placeholders})", batch)
+            self._conn.execute(
+                f"DELETE FROM duplicates WHERE chunk_id IN ({placeholders}) OR canonical_id IN ({placeholders})",
+                batch + batch,
+            )
+
+    def canonical_id(self, chunk_id: str) -> Optional[str]:
+        """Stored chunk a skipped duplicate was linked to."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT canonical_id FROM duplicates WHERE chunk_id = ?", (chunk_id,)
+            ).fetchone()
+        return row[0] if row else None
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the number of indexed chunks and recorded duplicate links."""
+        with self._lock:
+            (indexed,) = self._conn.execute("SELECT COUNT(*) FROM signatures").fetchone()
+            (linked,) = self._conn.execute("SELECT COUNT(*) FROM duplicates").fetchone()
+        return {"indexed_chunks": indexed, "linked_duplicates": linked, "path": str(self.path)}
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
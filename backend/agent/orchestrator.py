@@ -4,8 +4,9 @@ import asyncio
 import sys
 import logging
 from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Callable, Awaitable
 
 # Handle both module and direct execution contexts
 current_dir = Path(__file__).parent
@@ -15,6 +16,8 @@ if str(current_dir) not in sys.path:
 from models import GenerationSpec
 from agents import RetrieverAgent, ComposerAgent, RefinerAgent, EvaluatorAgent, IngestorAgent
 from config import config
+from llm_metrics import track_usage, usage_phase
+from retrieval_session import RetrievalSession, retrieval_session
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +31,9 @@ class WorkflowResult:
     iterations: int = 0
     approval_status: str = "pending"
     error: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None  # LLM token/latency totals, overall and per phase
+    # Expansions, searches and results of the job; pass it back to generate_blog_post to retry
+    retrieval_session: Optional[RetrievalSession] = None
 
 
 class BlogGenerationOrchestrator:
@@ -44,19 +50,56 @@ class BlogGenerationOrchestrator:
         self.evaluator = EvaluatorAgent()
         self.ingestor = IngestorAgent()
 
-    async def generate_blog_post(self, topic: str, spec_data: Dict[str, Any]) -> WorkflowResult:
+    async def generate_blog_post(
+        self,
+        topic: str,
+        spec_data: Dict[str, Any],
+        on_delta: Optional[Callable[[str, int, str], Awaitable[None]]] = None,
+        session: Optional[RetrievalSession] = None
+    ) -> WorkflowResult:
         """
         Execute the complete agentic workflow to generate a blog post.
 
+        Every agent of the job retrieves through one ``RetrievalSession``, so
+        query expansion and vector search are paid for once per job.
+
         Args:
             topic: The blog post topic
             spec_data: Generation specifications
+            on_delta: Optional coroutine called as ``on_delta(phase, iteration, delta)`` with
+                each streamed chunk of the composed and refined drafts
+            session: Retrieval session to reuse, e.g. ``retrieval_session`` of a failed attempt
+                (it may have run under another event loop)
 
         Returns:
             Workflow result with final content and metadata
         """
         logger.info(f"Starting agentic workflow for topic: {topic}")
 
+        with track_usage() as usage, retrieval_session(session) as job_session:
+            result = await self._run_workflow(topic, spec_data, on_delta)
+
+        result.usage = usage.summary()
+        result.retrieval_session = job_session
+        logger.info(
+            f"LLM usage: {result.usage['calls']} calls, {result.usage['prompt_tokens']} prompt + "
+            f"{result.usage['completion_tokens']} completion tokens"
+        )
+        retrieval = job_session.stats()
+        logger.info(
+            f"Retrieval: {retrieval['expansions']} expansions, {retrieval['searches']} vector searches "
+            f"({retrieval['expansion_hits']} expansions, {retrieval['search_hits']} query searches and "
+            f"{retrieval['result_hits']} results reused)"
+        )
+        return result
+
+    async def _run_workflow(
+        self,
+        topic: str,
+        spec_data: Dict[str, Any],
+        on_delta: Optional[Callable[[str, int, str], Awaitable[None]]] = None
+    ) -> WorkflowResult:
+        """Run the workflow phases; see ``generate_blog_post``."""
         try:
             # Calculate word counts based on length
             word_counts = {'short': (600, 1000), 'medium': (1000, 1500), 'long': (1500, 2500)}
@@ -71,9 +114,10 @@ class BlogGenerationOrchestrator:
 
             # Phase 1: Retrieval
             logger.info("Phase 1: Retrieving context from knowledge base")
-            retriever_output = await self.retriever.search_and_synthesize(
-                topic, spec, top_k=self.config.get('top_k_retrieval', 5)
-            )
+            with usage_phase("retrieval"):
+                retriever_output = await self.retriever.search_and_synthesize(
+                    topic, spec, top_k=self.config.get('top_k_retrieval', 5)
+                )
 
             if not retriever_output.get('summary'):
                 return WorkflowResult(
@@ -83,7 +127,11 @@ class BlogGenerationOrchestrator:
 
             # Phase 2: Composition
             logger.info("Phase 2: Composing initial draft")
-            draft = await self.composer.compose_draft(topic, retriever_output, spec)
+            with usage_phase("composition"):
+                draft = await self.composer.compose_draft(
+                    topic, retriever_output, spec,
+                    on_delta=partial(on_delta, "composition", 1) if on_delta else None
+                )
 
             if 'error' in draft:
                 return WorkflowResult(
@@ -93,14 +141,15 @@ class BlogGenerationOrchestrator:
 
             # Phase 3: Iterative Refinement
             logger.info("Phase 3: Iterative refinement and evaluation")
-            final_draft, final_evaluation = await self._iterative_refinement_loop(draft, spec)
+            final_draft, final_evaluation = await self._iterative_refinement_loop(draft, spec, on_delta)
 
             if not final_draft:
                 # Fallback: Return the last draft if no approval achieved after max iterations
                 logger.warning(f"No draft approved after {self.max_iterations} iterations, falling back to last iteration")
                 final_draft = draft  # Use initial draft if no iterations succeeded
                 # Evaluate the fallback draft
-                final_evaluation = await self.evaluator.evaluate_draft(final_draft, spec)
+                with usage_phase("evaluation"):
+                    final_evaluation = await self.evaluator.evaluate_draft(final_draft, spec)
             
             # Add SEO score to final draft
             if final_evaluation:
@@ -135,13 +184,19 @@ class BlogGenerationOrchestrator:
                 error=str(e)
             )
 
-    async def _iterative_refinement_loop(self, initial_draft: Dict[str, Any], spec: GenerationSpec) -> tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
+    async def _iterative_refinement_loop(
+        self,
+        initial_draft: Dict[str, Any],
+        spec: GenerationSpec,
+        on_delta: Optional[Callable[[str, int, str], Awaitable[None]]] = None
+    ) -> tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]:
         """
         Iteratively refine the draft until it passes evaluation or hits max iterations.
 
         Args:
             initial_draft: The initial draft from composer
             spec: Generation specifications
+            on_delta: Optional stream listener (see ``generate_blog_post``)
 
         Returns:
             Tuple of (Final approved draft, Final evaluation) or (None, None) if failed
@@ -155,14 +210,20 @@ class BlogGenerationOrchestrator:
 
             # Refine the draft (skip for first iteration if feedback is None)
             if feedback and iteration > 0:
-                current_draft = await self.refiner.refine_draft(current_draft, spec, feedback)
+                with usage_phase("refinement"):
+                    next_iteration = current_draft.get('iteration', 1) + 1
+                    current_draft = await self.refiner.refine_draft(
+                        current_draft, spec, feedback,
+                        on_delta=partial(on_delta, "refinement", next_iteration) if on_delta else None
+                    )
 
                 if 'error' in current_draft:
                     logger.warning(f"Refinement failed: {current_draft['error']}")
                     # Continue with previous draft
 
             # Evaluate the current draft
-            evaluation = await self.evaluator.evaluate_draft(current_draft, spec)
+            with usage_phase("evaluation"):
+                evaluation = await self.evaluator.evaluate_draft(current_draft, spec)
             last_evaluation = evaluation
             
             # Display SEO score for each iteration
@@ -0,0 +1,136 @@
+"""
+Rerank features stored with each chunk at ingest time.
+
+Reranking used to parse ISO dates, lowercase and split every candidate on
+every query. Instead, ``VectorStore`` writes three metadata fields when a
+chunk is stored:
+
+- ``date_ts``: publication time as epoch seconds (absent without a date)
+- ``chunk_words``: word count of the chunk
+- ``term_hashes``: CRC32 hashes of its distinct tokens, as hex of
+  little-endian uint32 (hex strings of all candidates decode in one call)
+
+``candidate_features`` gathers them for a list of retrieved documents into
+arrays, so the reranker scores all candidates with array operations.
+Chunks stored before these fields existed are computed on the fly.
+
+``date_ts`` and ``source_type`` (``blog_post`` unless the ingest path says
+otherwise, e.g. ``rss_feed``) are also what recency windows and source
+filters are pushed down on (see ``vector_store.metadata_filter``).
+"""
+
+import sys
+import zlib
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .models import Document
+    from .sparse_index import tokenize
+except ImportError:
+    from models import Document
+    from sparse_index import tokenize
+
+logger = logging.getLogger(__name__)
+
+FEATURE_KEYS = ("date_ts", "chunk_words", "term_hashes")
+DEFAULT_SOURCE_TYPE = "blog_post"
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Epoch seconds of an ISO date string or datetime, None if it cannot be parsed."""
+    if value is None or value == "":
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    try:
+        date = value if isinstance(value, datetime) else datetime.fromisoformat(str(value))
+        # Naive dates are local time, as datetime.now() is
+        return date.timestamp()
+    except (ValueError, TypeError, OverflowError, OSError):
+        return None
+
+
+def hash_terms(terms: Iterable[str]) -> np.ndarray:
+    """Sorted, distinct CRC32 hashes of terms."""
+    return np.unique(np.fromiter((zlib.crc32(t.encode("utf-8")) for t in terms), dtype=np.uint32))
+
+
+def encode_term_hashes(hashes: np.ndarray) -> str:
+    return hashes.astype("<u4").tobytes().hex()
+
+
+def decode_term_hashes(encoded: str) -> np.ndarray:
+    return np.frombuffer(bytes.fromhex(encoded), dtype="<u4")
+
+
+def chunk_features(text: str, date: Any = None) -> Dict[str, Any]:
+    """Rerank features of one chunk, as metadata fields."""
+    tokens = tokenize(text)
+    features: Dict[str, Any] = {
+        "chunk_words": len(text.split()),
+        "term_hashes": encode_term_hashes(hash_terms(tokens)),
+    }
+    timestamp = parse_timestamp(date)
+    if timestamp is not None:
+        features["date_ts"] = timestamp
+    return features
+
+
+def has_rank_features(metadata: Dict[str, Any]) -> bool:
+    """Whether stored metadata already has every field ``with_rank_features`` would add."""
+    if not metadata.get("source_type") or "chunk_words" not in metadata or "term_hashes" not in metadata:
+        return False
+    # Chunks without a parseable date never get a date_ts
+    return "date_ts" in metadata or parse_timestamp(metadata.get("date")) is None
+
+
+def with_rank_features(texts: Sequence[str], metadata: Sequence[Optional[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """Copies of the metadata with missing rerank features and source type filled in."""
+    enriched = []
+    for text, meta in zip(texts, metadata):
+        meta = dict(meta or {})
+        if not meta.get("source_type"):
+            meta["source_type"] = DEFAULT_SOURCE_TYPE
+        if any(key not in meta for key in FEATURE_KEYS):
+            features = chunk_features(text, meta.get("date"))
+            for key, value in features.items():
+                meta.setdefault(key, value)
+        enriched.append(meta)
+    return enriched
+
+
+def candidate_features(docs: Sequence[Document]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Gather the rerank features of retrieved documents into arrays.
+
+    Returns:
+        ``(timestamps, word_counts, term_hashes, owners)``: per-document
+        epoch seconds (NaN without a date) and word counts, plus all term
+        hashes concatenated with the index of the document each belongs to
+    """
+    metas = [
+        doc.metadata if "term_hashes" in doc.metadata and "chunk_words" in doc.metadata
+        # Stored before features were precomputed
+        else {**doc.metadata, **chunk_features(doc.page_content, doc.metadata.get("date"))}
+        for doc in docs
+    ]
+    n = len(metas)
+    timestamps = np.fromiter(
+        (np.nan if m.get("date_ts") is None else m["date_ts"] for m in metas), dtype=np.float64, count=n
+    )
+    word_counts = np.fromiter((m["chunk_words"] for m in metas), dtype=np.float64, count=n)
+
+    encoded = [m["term_hashes"] for m in metas]
+    hashes = decode_term_hashes("".join(encoded))
+    owners = np.repeat(np.arange(n), np.fromiter(map(len, encoded), dtype=np.int64, count=n) // 8)
+    return timestamps, word_counts, hashes, owners
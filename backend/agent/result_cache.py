@@ -0,0 +1,149 @@
+"""
+In-memory cache of vector store search results.
+
+The same topic is often searched again within minutes (API retries, RSS
+reruns, repeated CLI searches). ``VectorStore`` keeps a collection version
+that every write bumps, and results are cached under (query embedding
+hash, filters, top_k, version): a write makes every older entry
+unreachable, so a reader never gets results from before it. Stale entries
+are never looked up again and age out of the LRU order.
+
+Memory is bounded by an estimate of the bytes held (chunk texts, metadata
+and any stored embeddings). Writes made by another process do not bump
+this process's version, so entries also expire after a TTL.
+"""
+
+import sys
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+    from .models import Document
+except ImportError:
+    from config import config
+    from models import Document
+
+logger = logging.getLogger(__name__)
+
+# Rough per-entry bookkeeping (key, list, dicts) added to the measured sizes
+_ENTRY_OVERHEAD = 512
+_DOCUMENT_OVERHEAD = 256
+
+
+def result_key(
+    query_embedding: np.ndarray,
+    filters: Optional[Dict[str, Any]],
+    top_k: int,
+    version: int,
+    include_embeddings: bool = False,
+) -> Tuple[str, str, int, int, bool]:
+    """Cache key of one query's results at collection ``version``."""
+    embedding_hash = hashlib.sha1(np.ascontiguousarray(query_embedding, dtype=np.float32).tobytes()).hexdigest()
+    filters_key = json.dumps(filters, sort_keys=True, default=str) if filters else ""
+    return embedding_hash, filters_key, top_k, version, include_embeddings
+
+
+def _copy(doc: Document) -> Document:
+    # Callers annotate metadata in place (ranks, scores), so entries never share it;
+    # Chroma metadata values are scalars, so a shallow copy is enough
+    return Document(page_content=doc.page_content, metadata=dict(doc.metadata), embedding=doc.embedding)
+
+
+def _size(docs: List[Document]) -> int:
+    size = _ENTRY_OVERHEAD
+    for doc in docs:
+        size += _DOCUMENT_OVERHEAD + len(doc.page_content.encode("utf-8"))
+        size += sum(len(str(key)) + len(str(value)) for key, value in doc.metadata.items())
+        if doc.embedding is not None:
+            size += np.asarray(doc.embedding).nbytes
+    return size
+
+
+class ResultCache:
+    """LRU cache of search results bounded by approximate memory and age."""
+
+    def __init__(self, max_bytes: Optional[int] = None, ttl: Optional[float] = None):
+        """
+        Args:
+            max_bytes: Approximate memory limit (defaults to ``config.retrieval_cache_max_bytes``, 0 disables)
+            ttl: Seconds an entry is served (defaults to ``config.retrieval_cache_ttl``)
+        """
+        self.max_bytes = max_bytes if max_bytes is not None else config.retrieval_cache_max_bytes
+        self.ttl = ttl if ttl is not None else config.retrieval_cache_ttl
+
+        self._entries: "OrderedDict[Tuple, Tuple[float, int, List[Document]]]" = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[List[Document]]:
+        """Copies of the cached results for ``key``, or None."""
+        if self.max_bytes <= 0:
+            return None
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[0] > self.ttl:
+                self._drop(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            docs = entry[2]
+        return [_copy(doc) for doc in docs]
+
+    def put(self, key: Tuple, docs: List[Document]) -> None:
+        """Store copies of ``docs``; results larger than the whole cache are not kept."""
+        if self.max_bytes <= 0:
+            return
+        size = _size(docs)
+        if size > self.max_bytes:
+            return
+        stored = [_copy(doc) for doc in docs]
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.time(), size, stored)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._drop(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _drop(self, key: Tuple) -> None:
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, Any]:
+        """Get entry count, memory estimate and hit/miss counters."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -7,10 +7,13 @@ Handles query expansion, multi-query retrieval, re-ranking, and context assembly
 import asyncio
 import logging
 import sys
+import time
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import Any, Awaitable, Callable, Dict, List, Optional
 from collections import defaultdict
 
+import numpy as np
+
 # Handle both module and direct execution contexts
 current_dir = Path(__file__).parent
 if str(current_dir) not in sys.path:
@@ -18,14 +21,32 @@ if str(current_dir) not in sys.path:
 
 try:
     from .config import config
-    from .models import Document, ResearchBrief, LLMMesssage
+    from .models import Document, ResearchBrief, ResearchAnalysis, LLMMesssage
     from .llm_client import llm_client
-    from .vector_store import vector_store
+    from .vector_store import async_vector_store, metadata_filter
+    from .expansion_cache import expansion_cache
+    from .diversity import diversify_results
+    from .cross_encoder import cross_encoder_reranker
+    from .context_packing import pack_context
+    from .compression import compress_documents
+    from .retrieval_session import RetrievalSession, current_retrieval_session, filters_key
+    from .embeddings import normalize_query
+    from .rank_features import candidate_features, hash_terms
+    from .sparse_index import tokenize
 except ImportError:
     from config import config
-    from models import Document, ResearchBrief, LLMMesssage
+    from models import Document, ResearchBrief, ResearchAnalysis, LLMMesssage
     from llm_client import llm_client
-    from vector_store import vector_store
+    from vector_store import async_vector_store, metadata_filter
+    from expansion_cache import expansion_cache
+    from diversity import diversify_results
+    from cross_encoder import cross_encoder_reranker
+    from context_packing import pack_context
+    from compression import compress_documents
+    from retrieval_session import RetrievalSession, current_retrieval_session, filters_key
+    from embeddings import normalize_query
+    from rank_features import candidate_features, hash_terms
+    from sparse_index import tokenize
 
 logger = logging.getLogger(__name__)
 
@@ -34,6 +55,9 @@ async def expand_query(query: str, llm_client_instance=None) -> List[str]:
     """
     Generate multiple related search queries for better retrieval.
 
+    Expansions of the same or a near-duplicate query are reused from the
+    expansion cache instead of asking the LLM again.
+
     Args:
         query: Original query
         llm_client_instance: LLM client instance (optional)
@@ -44,6 +68,16 @@ async def expand_query(query: str, llm_client_instance=None) -> List[str]:
     if llm_client_instance is None:
         llm_client_instance = llm_client
 
+    if config.expansion_cache_enabled:
+        try:
+            # SQLite lookup and query embedding are blocking
+            cached = await asyncio.to_thread(expansion_cache.get, query)
+        except Exception as e:
+            logger.warning(f"Expansion cache lookup failed: {e}")
+            cached = None
+        if cached is not None:
+            return [query] + cached[:3]
+
     expansion_prompt = f"""
 Generate 3-4 different search queries that would help find relevant information about: "{query}"
 
@@ -63,9 +97,19 @@ ML hyperparameter tuning methods
 """
 
     try:
-        response = await llm_client_instance.generate(expansion_prompt, temperature=0.3)
+        # Expansions are reused verbatim for identical topics; the expansion cache keeps them
+        # when enabled, otherwise the response cache does
+        response = await llm_client_instance.generate(
+            expansion_prompt, temperature=0.3, use_cache=not config.expansion_cache_enabled, route="expansion"
+        )
         expanded_queries = [q.strip() for q in response.split('\n') if q.strip()]
 
+        if expanded_queries and config.expansion_cache_enabled:
+            try:
+                await asyncio.to_thread(expansion_cache.set, query, expanded_queries[:3])
+            except Exception as e:
+                logger.warning(f"Could not cache query expansion: {e}")
+
         # Include original query and limit to 4 total
         queries = [query] + expanded_queries[:3]
         return queries
@@ -80,13 +124,17 @@ async def retrieve_relevant_context(
     top_k: int = None,
     expand_queries: bool = True,
     filters: Optional[Dict[str, Any]] = None,
-    search_all_ingested: bool = True
+    search_all_ingested: bool = True,
+    max_age_days: Optional[float] = None,
+    source_types: Optional[List[str]] = None
 ) -> List[Document]:
     """
     Retrieve relevant context from the entire ingested knowledge base.
 
     Searches across all ingested content including blog posts and RSS articles
-    to provide comprehensive context for blog post generation.
+    to provide comprehensive context for blog post generation. Inside a
+    job's ``retrieval_session()``, expansions, searches and results are
+    taken from the session when another agent already asked for them.
 
     Args:
         query: Search query
@@ -94,69 +142,124 @@ async def retrieve_relevant_context(
         expand_queries: Whether to expand query with multiple formulations
         filters: Optional metadata filters
         search_all_ingested: Always search entire database (kept for backward compatibility)
+        max_age_days: Only search chunks published within this many days
+        source_types: Only search chunks of these source types (e.g. ``["rss_feed"]``)
 
     Returns:
         List of relevant documents from all ingested sources
     """
     if top_k is None:
         top_k = config.top_k_retrieval
+    # Pushed down into the vector query rather than applied to its results
+    filters = metadata_filter(filters, max_age_days, source_types)
 
+    session = current_retrieval_session()
     try:
-        # Query expansion for better retrieval
-        if expand_queries:
-            queries = await expand_query(query)
-            logger.info(f"Expanded query into {len(queries)} variations")
-        else:
-            queries = [query]
+        if session is None:
+            return await _retrieve(query, top_k, expand_queries, filters)
+        # A failed attempt is not remembered, so a retry within the job searches again
+        key = (normalize_query(query), top_k, expand_queries, filters_key(filters))
+        return await session.results(key, lambda: _retrieve(query, top_k, expand_queries, filters, session))
 
-        # Perform multi-query retrieval
-        all_results = []
-        for q in queries:
-            try:
-                results = vector_store.similarity_search(q, top_k=top_k, filters=filters)
-                all_results.extend(results)
-                logger.debug(f"Query '{q[:50]}...' returned {len(results)} results")
-            except Exception as e:
-                logger.warning(f"Query failed: {q[:50]}...: {e}")
-                continue
+    except Exception as e:
+        logger.error(f"Context retrieval failed: {e}")
+        return []
 
-        if not all_results:
-            logger.warning("No results found for any queries")
-            return []
 
-        # Remove duplicates based on content
-        unique_results = _deduplicate_results(all_results)
+async def _retrieve(
+    query: str,
+    top_k: int,
+    expand_queries: bool,
+    filters: Optional[Dict[str, Any]],
+    session: Optional[RetrievalSession] = None
+) -> List[Document]:
+    """Run the retrieval steps of ``retrieve_relevant_context``, through ``session`` when given."""
+    # Query expansion for better retrieval
+    if expand_queries:
+        queries = await (session.expand(query, expand_query) if session else expand_query(query))
+        logger.info(f"Expanded query into {len(queries)} variations")
+    else:
+        queries = [query]
+
+    # Perform multi-query retrieval in one embedding pass and one collection lookup,
+    # fetching extra candidates (with their embeddings) for the MMR selection
+    fetch_k = top_k * config.mmr_fetch_multiplier if config.mmr_enabled else top_k
+    search = session.search if session else async_vector_store.similarity_search_batch
+    try:
+        result_lists = await search(
+            queries, top_k=fetch_k, filters=filters, include_embeddings=config.mmr_enabled
+        )
+    except Exception as e:
+        logger.warning(f"Batched search failed, searching each query separately: {e}")
+        result_lists = await _search_each(search, queries, fetch_k, filters, config.mmr_enabled)
+
+    # Merge the per-query results, keeping each chunk once
+    unique_results = _merge_results(result_lists)
 
-        # Re-rank results by relevance
-        reranked_results = _rerank_results(unique_results, query)
+    if not unique_results:
+        logger.warning("No results found for any queries")
+        return []
+
+    # Re-rank results by relevance
+    reranked_results = _rerank_results(unique_results, query)
 
-        # Return top results
+    # Optionally re-score the best candidates with the cross-encoder (within its latency budget)
+    score_key = "final_score"
+    if config.cross_encoder_enabled:
+        reranked_results, applied = await cross_encoder_reranker.rerank(query, reranked_results)
+        if applied:
+            score_key = "cross_encoder_score"
+
+    # Return top results, skipping near-duplicates of chunks already selected
+    if config.mmr_enabled:
+        final_results = diversify_results(reranked_results, top_k, score_key=score_key)
+    else:
         final_results = reranked_results[:top_k]
 
-        logger.info(f"Retrieved {len(final_results)} unique, reranked results")
+    logger.info(f"Retrieved {len(final_results)} unique, reranked results")
 
-        return final_results
+    return final_results
 
-    except Exception as e:
-        logger.error(f"Context retrieval failed: {e}")
-        return []
 
+async def _search_each(
+    search: Callable[..., Awaitable[List[List[Document]]]],
+    queries: List[str],
+    top_k: int,
+    filters: Optional[Dict[str, Any]],
+    include_embeddings: bool
+) -> List[List[Document]]:
+    """Search each query on its own, so a failing query only loses its own results."""
+    async def search_one(q: str) -> List[Document]:
+        try:
+            return (await search([q], top_k=top_k, filters=filters, include_embeddings=include_embeddings))[0]
+        except Exception as e:
+            logger.warning(f"Query failed: {q[:50]}...: {e}")
+            return []
+
+    return list(await asyncio.gather(*(search_one(q) for q in queries)))
 
-def _deduplicate_results(results: List[Document]) -> List[Document]:
-    """Remove duplicate results based on content similarity."""
-    seen_content = set()
-    unique_results = []
 
-    for doc in results:
-        # Simple deduplication based on first 200 characters
-        content_hash = hash(doc.page_content[:200])
+def _merge_results(result_lists: List[List[Document]]) -> List[Document]:
+    """
+    Merge the results of several queries, keeping each chunk once.
+
+    A chunk found by more than one query keeps its best relevance score.
+    Near-duplicate chunks (overlaps, syndicated copies) are left to the MMR
+    selection in ``diversify_results``.
+    """
+    merged: Dict[Any, Document] = {}
+    total = 0
 
-        if content_hash not in seen_content:
-            unique_results.append(doc)
-            seen_content.add(content_hash)
+    for results in result_lists:
+        total += len(results)
+        for doc in results:
+            key = doc.metadata.get("chunk_id") or hash(doc.page_content)
+            existing = merged.get(key)
+            if existing is None or doc.metadata.get("relevance_score", 0) > existing.metadata.get("relevance_score", 0):
+                merged[key] = doc
 
-    logger.debug(f"Deduplicated {len(results)} -> {len(unique_results)} results")
-    return unique_results
+    logger.debug(f"Merged {total} -> {len(merged)} results from {len(result_lists)} queries")
+    return list(merged.values())
 
 
 def _rerank_results(results: List[Document], original_query: str) -> List[Document]:
@@ -166,61 +269,103 @@ def _rerank_results(results: List[Document], original_query: str) -> List[Docume
     Considers multiple factors:
     - Semantic similarity score
     - Recency (newer posts get slight boost)
-    - Query term frequency in content
+    - Query terms present in the chunk
     - Content quality indicators
+
+    Uses the rerank features stored with each chunk (see ``rank_features``)
+    and scores all candidates at once.
     """
-    for doc in results:
-        base_score = doc.metadata.get("relevance_score", 0)
+    if not results:
+        return results
 
-        # Recency boost (newer posts slightly preferred)
-        recency_boost = 0
-        if doc.metadata.get("date"):
-            try:
-                from datetime import datetime
-                post_date = datetime.fromisoformat(doc.metadata["date"])
-                days_old = (datetime.now(post_date.tzinfo) - post_date).days
-
-                # Boost recent posts (within 1 year: +0.1, within 1 month: +0.05)
-                if days_old < 30:
-                    recency_boost = 0.05
-                elif days_old < 365:
-                    recency_boost = 0.02
-            except:
-                pass
-
-        # Keyword frequency boost
-        query_terms = original_query.lower().split()
-        content_lower = doc.page_content.lower()
-        keyword_matches = sum(1 for term in query_terms if term in content_lower)
-        keyword_boost = min(keyword_matches * 0.02, 0.1)  # Max 0.1 boost
-
-        # Length quality (prefer substantial content)
-        content_length = len(doc.page_content.split())
-        length_boost = max(0, min(0.05, (content_length - 50) / 1000))  # Boost for 50-1000 words
-
-        # Calculate final score
-        final_score = (
-            base_score +
-            recency_boost +
-            keyword_boost +
-            length_boost
-        )
+    timestamps, word_counts, term_hashes, owners = candidate_features(results)
+    base_scores = np.array([doc.metadata.get("relevance_score", 0) for doc in results], dtype=np.float64)
+
+    # Recency boost (within 1 month: +0.05, within 1 year: +0.02, no date: 0)
+    days_old = (time.time() - timestamps) / 86400
+    with np.errstate(invalid="ignore"):
+        recency_boost = np.where(days_old < 30, 0.05, np.where(days_old < 365, 0.02, 0.0))
+
+    # Keyword boost: distinct query terms found in the chunk, 0.02 each, max 0.1
+    query_hashes = hash_terms(tokenize(original_query))
+    matched = np.isin(term_hashes, query_hashes)
+    keyword_matches = np.bincount(owners, weights=matched, minlength=len(results))
+    keyword_boost = np.minimum(keyword_matches * 0.02, 0.1)
+
+    # Length quality (prefer substantial content): grows from 50 words, max 0.05
+    length_boost = np.clip((word_counts - 50) / 1000, 0, 0.05)
+
+    final_scores = base_scores + recency_boost + keyword_boost + length_boost
+    for doc, score in zip(results, final_scores.tolist()):
+        doc.metadata["final_score"] = score
+
+    # Sort by final score descending (stable, like list.sort)
+    order = np.argsort(-final_scores, kind="stable")
+    return [results[i] for i in order]
 
-        doc.metadata["final_score"] = final_score
 
-    # Sort by final score descending
-    results.sort(key=lambda x: x.metadata["final_score"], reverse=True)
+def _route_model(route: Optional[str]) -> str:
+    """Model an LLM route sends its prompts to."""
+    settings = config.llm_routes.get(route) if route else None
+    return (settings and settings.model) or config.openai_model
 
-    return results
 
+async def compress_context(
+    query: str,
+    results: List[Document],
+    route: Optional[str] = None
+) -> List[Document]:
+    """
+    Keep only the sentences of the retrieved chunks that are relevant to the query.
+
+    Sentences are scored against the query and, when the job's retrieval
+    session expanded it, its expansions (see ``compression.compress_documents``).
+    A failure leaves the chunks whole.
 
-async def assemble_context_window(results: List[Document], max_tokens: int = 4000) -> str:
+    Args:
+        query: Query the results were retrieved for
+        results: Reranked documents
+        route: LLM route the chunks are sent to (its model's tokenizer counts the tokens)
+
+    Returns:
+        Compressed copies of the documents, in the same order
+    """
+    if not results:
+        return results
+
+    session = current_retrieval_session()
+    queries = (session and session.expanded_queries(query)) or [query]
+    try:
+        # Sentence embedding and token counting are CPU-bound
+        compressed = await asyncio.to_thread(compress_documents, queries, results, model=_route_model(route))
+    except Exception as e:
+        logger.warning(f"Context compression failed, using whole chunks: {e}")
+        return results
+
+    logger.info(
+        f"Compressed {len(results)} chunks: {compressed.kept}/{compressed.sentences} sentences kept, "
+        f"{compressed.tokens} -> {compressed.compressed_tokens} tokens (ratio {compressed.ratio:.2f})"
+    )
+    return compressed.documents
+
+
+async def assemble_context_window(
+    results: List[Document],
+    max_tokens: int = 4000,
+    route: Optional[str] = None
+) -> str:
     """
     Assemble retrieved documents into a coherent context window.
 
+    Chunks are packed by score within a real token budget (see
+    ``context_packing.pack_context``); the prompt tokens saved compared with
+    the previous character heuristic are logged and recorded with the job's
+    usage.
+
     Args:
         results: List of retrieved documents
         max_tokens: Maximum context length in tokens
+        route: LLM route the context is sent to (its model's tokenizer counts the tokens)
 
     Returns:
         Assembled context string
@@ -228,67 +373,16 @@ async def assemble_context_window(results: List[Document], max_tokens: int = 400
     if not results:
         return "No relevant context found."
 
-    # Estimate token usage (rough approximation)
-    ESTIMATED_CHARS_PER_TOKEN = 4
-    max_chars = max_tokens * ESTIMATED_CHARS_PER_TOKEN
-
-    context_parts = []
-    included_sources = set()
-    total_chars = 0
-
-    for doc in results:
-        # Add source header if not already included
-        source = doc.metadata.get("title", doc.metadata.get("source_file", "Unknown"))
-
-        if source not in included_sources:
-            header = f"\n## From: {source}\n"
-            if total_chars + len(header) > max_chars:
-                break
-
-            # Add date if available
-            if doc.metadata.get("date"):
-                try:
-                    from datetime import datetime
-                    post_date = datetime.fromisoformat(doc.metadata["date"]).strftime("%B %Y")
-                    header = f"\n## From: {source} ({post_date})\n"
-                except:
-                    pass
-
-            context_parts.append(header)
-            total_chars += len(header)
-            included_sources.add(source)
-
-        # Add content chunk
-        content = doc.page_content.strip()
-        if total_chars + len(content) > max_chars:
-            # Truncate content to fit
-            remaining_chars = max_chars - total_chars - 50  # Leave room for truncation marker
-            if remaining_chars > 100:  # Only include if meaningful
-                truncated_content = content[:remaining_chars] + "...\n"
-                context_parts.append(truncated_content)
-            break
-
-        context_parts.append(content)
-        total_chars += len(content)
-
-        # Add separator
-        if total_chars < max_chars:
-            separator = "\n\n---\n\n"
-            if total_chars + len(separator) < max_chars:
-                context_parts.append(separator)
-                total_chars += len(separator)
-
-    # Join parts
-    context = "".join(context_parts).strip()
-
-    # Add summary statistics
-    stats = f"\n\n--- Context assembled from {len(included_sources)} sources, {total_chars} characters ---"
-    if total_chars + len(stats) < max_chars * 1.1:  # 10% overhead allowed
-        context += stats
-
-    logger.info(f"Assembled context: {len(included_sources)} sources, {total_chars} characters")
-
-    return context
+    # Token counting is CPU-bound, keep it off the event loop
+    packed = await asyncio.to_thread(pack_context, results, max_tokens, _route_model(route))
+
+    logger.info(
+        f"Assembled context: {len(packed.documents)}/{len(results)} chunks from {packed.sources} sources, "
+        f"{packed.tokens}/{max_tokens} tokens ({packed.tokens_saved:+d} saved vs the character heuristic's "
+        f"{packed.heuristic_tokens})"
+    )
+
+    return packed.text
 
 
 async def gather_context_for_topic(
@@ -301,7 +395,8 @@ async def gather_context_for_topic(
 
     Args:
         topic: Blog post topic
-        spec: Generation specification
+        spec: Generation specification (``context_max_age_days`` and
+            ``context_source_types`` narrow the search)
         max_context_tokens: Maximum context length
 
     Returns:
@@ -319,7 +414,9 @@ async def gather_context_for_topic(
     context_docs = await retrieve_relevant_context(
         search_query,
         top_k=10,  # Get more for research
-        expand_queries=True
+        expand_queries=True,
+        max_age_days=(spec or {}).get("context_max_age_days"),
+        source_types=(spec or {}).get("context_source_types")
     )
 
     if not context_docs:
@@ -330,7 +427,7 @@ async def gather_context_for_topic(
         )
 
     # Assemble context for research
-    context_window = await assemble_context_window(context_docs, max_context_tokens)
+    context_window = await assemble_context_window(context_docs, max_context_tokens, route="researcher")
 
     # Use LLM to synthesize research brief
     research_prompt = f"""
@@ -351,42 +448,17 @@ Be specific and actionable.
 """
 
     try:
-        response = await llm_client.generate(research_prompt, temperature=0.2)
-
-        # Parse response into ResearchBrief
-        brief = ResearchBrief(context_documents=context_docs)
-
-        # Simple parsing (could be improved with better NLP)
-        lines = response.split('\n')
-        current_section = None
-
-        for line in lines:
-            line = line.strip()
-            if not line:
-                continue
-
-            if line.startswith('KEY_THEMES:'):
-                current_section = 'themes'
-            elif line.startswith('RELEVANT_FACTS:'):
-                current_section = 'facts'
-            elif line.startswith('RELATED_TOPICS:'):
-                current_section = 'topics'
-            elif line.startswith('GAPS_IDENTIFIED:'):
-                current_section = 'gaps'
-            elif line.startswith('RECOMMENDED_FOCUS:'):
-                current_section = 'focus'
-            elif current_section and line.startswith('-'):
-                content = line[1:].strip()
-                if current_section == 'themes':
-                    brief.key_themes.append(content)
-                elif current_section == 'facts':
-                    brief.relevant_facts.append(content)
-                elif current_section == 'topics':
-                    brief.related_topics.append(content)
-                elif current_section == 'gaps':
-                    brief.gaps_identified.append(content)
-                elif current_section == 'focus':
-                    brief.recommended_focus.append(content)
+        if config.llm_structured_output != "off":
+            analysis = await llm_client.chat_structured(
+                [{"role": "user", "content": research_prompt}],
+                ResearchAnalysis,
+                temperature=0.2,
+                route="researcher",
+            )
+            brief = analysis.to_brief(context_docs)
+        else:
+            response = await llm_client.generate(research_prompt, temperature=0.2, route="researcher")
+            brief = _parse_research_response(response, context_docs)
 
         logger.info(f"Generated research brief with {len(brief.key_themes)} themes, {len(brief.relevant_facts)} facts")
 
@@ -402,3 +474,42 @@ Be specific and actionable.
             context_documents=context_docs,
             recommended_focus=["Comprehensive coverage of the topic"]
         )
+
+
+def _parse_research_response(response: str, context_docs: List[Document]) -> ResearchBrief:
+    """Parse a free-text KEY_THEMES/RELEVANT_FACTS/... research response."""
+    brief = ResearchBrief(context_documents=context_docs)
+
+    # Simple parsing (could be improved with better NLP)
+    lines = response.split('\n')
+    current_section = None
+
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+
+        if line.startswith('KEY_THEMES:'):
+            current_section = 'themes'
+        elif line.startswith('RELEVANT_FACTS:'):
+            current_section = 'facts'
+        elif line.startswith('RELATED_TOPICS:'):
+            current_section = 'topics'
+        elif line.startswith('GAPS_IDENTIFIED:'):
+            current_section = 'gaps'
+        elif line.startswith('RECOMMENDED_FOCUS:'):
+            current_section = 'focus'
+        elif current_section and line.startswith('-'):
+            content = line[1:].strip()
+            if current_section == 'themes':
+                brief.key_themes.append(content)
+            elif current_section == 'facts':
+                brief.relevant_facts.append(content)
+            elif current_section == 'topics':
+                brief.related_topics.append(content)
+            elif current_section == 'gaps':
+                brief.gaps_identified.append(content)
+            elif current_section == 'focus':
+                brief.recommended_focus.append(content)
+
+    return brief
@@ -0,0 +1,254 @@
+"""
+Per-job memo of retrieval work shared by every agent.
+
+``BlogGenerationOrchestrator`` opens a ``retrieval_session()`` scope for
+each job. Inside it, ``retrieve_relevant_context`` (used by
+``RetrieverAgent`` and, through ``gather_context_for_topic``, by
+``ResearcherAgent``) takes query expansions, candidate searches (with their
+stored embeddings) and final scored results from the session, so a job
+pays for each expansion and vector search once however many agents,
+iterations or retries ask again.
+
+Candidates are kept per query for the largest ``top_k`` searched so far;
+a smaller request is served from the head of that list. Concurrent
+requests for the same work share one call. The session is a snapshot:
+writes to the collection during the job are not seen by it.
+
+Completed work is kept as plain values, so a session can be handed to a
+retry running under a new event loop (e.g. another ``asyncio.run``). Only
+in-flight calls are tied to their loop; those of a previous loop are
+dropped and run again.
+"""
+
+import sys
+import json
+import asyncio
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple, Union
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .models import Document
+    from .embeddings import normalize_query
+    from .vector_store import async_vector_store
+except ImportError:
+    from models import Document
+    from embeddings import normalize_query
+    from vector_store import async_vector_store
+
+logger = logging.getLogger(__name__)
+
+_current_session: ContextVar[Optional["RetrievalSession"]] = ContextVar("retrieval_session", default=None)
+
+
+def filters_key(filters: Optional[Dict[str, Any]]) -> str:
+    """Canonical form of metadata filters, for use in keys."""
+    return json.dumps(filters, sort_keys=True, default=str) if filters else ""
+
+
+def _copies(docs: List[Document]) -> List[Document]:
+    # Callers annotate metadata in place (scores, ranks), so every caller gets its own
+    return [doc.model_copy(update={"metadata": dict(doc.metadata)}) for doc in docs]
+
+
+class RetrievalSession:
+    """Expansions, candidate searches and scored results of one job."""
+
+    def __init__(self):
+        self._expansions: Dict[str, List[str]] = {}
+        # Per query: the top_k searched and its candidates
+        self._searches: Dict[Tuple[str, str, bool], Tuple[int, List[Document]]] = {}
+        self._results: Dict[Tuple, List[Document]] = {}
+        # Calls still running, per table; their futures belong to ``_loop``
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._pending: Dict[str, Dict[Any, Any]] = {}
+        self.counters = {
+            "expansions": 0,
+            "expansion_hits": 0,
+            "searches": 0,
+            "searched_queries": 0,
+            "search_hits": 0,
+            "results": 0,
+            "result_hits": 0,
+        }
+
+    def _in_flight(self, table: str) -> Dict[Any, Any]:
+        """Running calls of ``table`` on the current event loop."""
+        loop = asyncio.get_running_loop()
+        if loop is not self._loop:
+            # Futures of another loop can't be awaited here; their work is redone
+            self._loop = loop
+            self._pending = {}
+        return self._pending.setdefault(table, {})
+
+    async def _memo(
+        self,
+        table: Dict[Any, Any],
+        key: Any,
+        factory: Callable[[], Awaitable[Any]],
+        counter: str,
+        hit_counter: str,
+    ) -> Any:
+        """Run ``factory`` once per key; a failed run is forgotten so the next caller retries."""
+        if key in table:
+            self.counters[hit_counter] += 1
+            return table[key]
+
+        pending = self._in_flight(counter)
+        future = pending.get(key)
+        if future is None:
+            future = asyncio.ensure_future(factory())
+            pending[key] = future
+            self.counters[counter] += 1
+
+            def settle(done: "asyncio.Future") -> None:
+                if pending.get(key) is done:
+                    del pending[key]
+                if done.cancelled():
+                    return
+                # Also marks the exception as retrieved when nobody awaits it anymore
+                if done.exception() is None:
+                    table[key] = done.result()
+
+            future.add_done_callback(settle)
+        else:
+            self.counters[hit_counter] += 1
+        return await asyncio.shield(future)
+
+    async def expand(self, query: str, expand: Callable[[str], Awaitable[List[str]]]) -> List[str]:
+        """Expanded queries for ``query``, computed by ``expand`` on first use."""
+        queries = await self._memo(
+            self._expansions, normalize_query(query), lambda: expand(query), "expansions", "expansion_hits"
+        )
+        return list(queries)
+
+    def expanded_queries(self, query: str) -> Optional[List[str]]:
+        """Expanded queries already computed for ``query``, or None."""
+        queries = self._expansions.get(normalize_query(query))
+        return list(queries) if queries is not None else None
+
+    async def search(
+        self,
+        queries: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+    ) -> List[List[Document]]:
+        """
+        Candidates per query, as ``AsyncVectorStore.similarity_search_batch`` returns them.
+
+        Queries not yet searched with at least ``top_k`` results go to the
+        vector store together in one batch.
+        """
+        filters_id = filters_key(filters)
+        keys = [(normalize_query(q), filters_id, include_embeddings) for q in queries]
+        pending = self._in_flight("searches")
+
+        owned: Dict[Tuple[str, str, bool], Tuple[str, "asyncio.Future[List[Document]]"]] = {}
+        # Per query: its candidates, or the future of a running search
+        sources: List[Union[List[Document], "asyncio.Future[List[Document]]"]] = []
+        for key, query in zip(keys, queries):
+            if key in owned:
+                sources.append(owned[key][1])
+                continue
+            done = self._searches.get(key)
+            running = pending.get(key)
+            if done is not None and done[0] >= top_k:
+                self.counters["search_hits"] += 1
+                sources.append(done[1])
+            elif running is not None and running[0] >= top_k:
+                self.counters["search_hits"] += 1
+                sources.append(running[1])
+            else:
+                future = asyncio.get_running_loop().create_future()
+                pending[key] = (top_k, future)
+                owned[key] = (query, future)
+                sources.append(future)
+
+        if owned:
+            self.counters["searches"] += 1
+            self.counters["searched_queries"] += len(owned)
+            try:
+                result_lists = await async_vector_store.similarity_search_batch(
+                    [query for query, _ in owned.values()],
+                    top_k=top_k, filters=filters, include_embeddings=include_embeddings,
+                )
+            except asyncio.CancelledError:
+                # Only this task was cancelled: the other waiters search again themselves
+                for key, (_, future) in owned.items():
+                    if pending.get(key, (0, None))[1] is future:
+                        del pending[key]
+                    future.cancel()
+                raise
+            except Exception as e:
+                for key, (_, future) in owned.items():
+                    if pending.get(key, (0, None))[1] is future:
+                        del pending[key]
+                    future.set_exception(e)
+                    # Marks the exception as retrieved when nobody else awaits it
+                    future.exception()
+                raise
+            for (key, (_, future)), docs in zip(owned.items(), result_lists):
+                if pending.get(key, (0, None))[1] is future:
+                    del pending[key]
+                # A larger concurrent search may have finished first
+                if self._searches.get(key, (0, None))[0] < top_k:
+                    self._searches[key] = (top_k, docs)
+                future.set_result(docs)
+
+        result_lists = []
+        for query, source in zip(queries, sources):
+            if isinstance(source, list):
+                result_lists.append(_copies(source[:top_k]))
+                continue
+            try:
+                docs = await asyncio.shield(source)
+            except asyncio.CancelledError:
+                if not source.cancelled():
+                    raise
+                # The task running the search was cancelled, not this one
+                result_lists.extend(await self.search([query], top_k, filters, include_embeddings))
+                continue
+            result_lists.append(_copies(docs[:top_k]))
+        return result_lists
+
+    async def results(self, key: Tuple, retrieve: Callable[[], Awaitable[List[Document]]]) -> List[Document]:
+        """Final results for a retrieval request, computed by ``retrieve`` on first use."""
+        return _copies(await self._memo(self._results, key, retrieve, "results", "result_hits"))
+
+    def stats(self) -> Dict[str, int]:
+        """Get how much retrieval work was done and how much was reused."""
+        return dict(self.counters)
+
+
+@contextmanager
+def retrieval_session(session: Optional[RetrievalSession] = None):
+    """
+    Share retrieval work between every call made within the block.
+
+    Usage:
+        with retrieval_session() as session:
+            await orchestrator.generate_blog_post(topic, spec_data)
+        print(session.stats())
+
+    Args:
+        session: Session to continue (e.g. the one of a failed attempt being retried)
+    """
+    session = session or RetrievalSession()
+    token = _current_session.set(session)
+    try:
+        yield session
+    finally:
+        _current_session.reset(token)
+
+
+def current_retrieval_session() -> Optional[RetrievalSession]:
+    """The session of the running job, if any."""
+    return _current_session.get()
@@ -0,0 +1,448 @@
+"""
+Persistent BM25 inverted index kept alongside a vector store collection.
+
+Dense search misses exact lexical matches (model numbers, product names,
+rare Vietnamese terms), so ``VectorStore.hybrid_search`` also queries this
+index and fuses both rankings with reciprocal rank fusion.
+
+The index is a SQLite file next to the Chroma data. Every write appends one
+postings block per term; a block holds the doc numbers (delta-encoded) and
+term frequencies as little-endian integers, zlib-compressed. Blocks of a
+term are merged once it has ``MAX_BLOCKS_PER_TERM`` of them. Deleted
+chunks are dropped from the document table right away and from the
+postings on compaction, which runs once they make up
+``COMPACT_DEAD_FRACTION`` of the postings. Like the near-duplicate index,
+it belongs to one collection: when the collection is recreated (its id
+changes) the index starts over.
+"""
+
+import re
+import sys
+import json
+import math
+import zlib
+import sqlite3
+import logging
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Handle both module and direct execution contexts
+current_dir = Path(__file__).parent
+if str(current_dir) not in sys.path:
+    sys.path.insert(0, str(current_dir))
+
+try:
+    from .config import config
+except ImportError:
+    from config import config
+
+logger = logging.getLogger(__name__)
+
+MAX_BLOCKS_PER_TERM = 16
+COMPACT_DEAD_FRACTION = 0.2
+
+_TOKEN_RE = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercased word tokens (Vietnamese syllables count as words)."""
+    return _TOKEN_RE.findall(text.lower())
+
+
+def encode_postings(doc_nums: np.ndarray, freqs: np.ndarray) -> bytes:
+    """Compress sorted doc numbers and their term frequencies into one block."""
+    deltas = np.diff(doc_nums, prepend=0).astype("<u4")
+    return zlib.compress(deltas.tobytes() + np.minimum(freqs, 0xFFFF).astype("<u2").tobytes())
+
+
+def decode_postings(blob: bytes, count: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Inverse of ``encode_postings``."""
+    raw = zlib.decompress(blob)
+    doc_nums = np.cumsum(np.frombuffer(raw, dtype="<u4", count=count), dtype=np.int64)
+    freqs = np.frombuffer(raw, dtype="<u2", count=count, offset=4 * count).astype(np.float32)
+    return doc_nums, freqs
+
+
+def _compare(value: Any, operator: str, operand: Any) -> bool:
+    if operator == "$eq":
+        return value == operand
+    if operator == "$ne":
+        return value != operand
+    if operator == "$in":
+        return value in operand
+    if operator == "$nin":
+        return value not in operand
+    if value is None:
+        return False
+    try:
+        if operator == "$gt":
+            return value > operand
+        if operator == "$gte":
+            return value >= operand
+        if operator == "$lt":
+            return value < operand
+        if operator == "$lte":
+            return value <= operand
+    except TypeError:
+        return False
+    raise ValueError(f"Unsupported filter operator: {operator}")
+
+
+def matches_filter(metadata: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+    """Evaluate a Chroma ``where`` filter against chunk metadata."""
+    if not where:
+        return True
+    for key, condition in where.items():
+        if key == "$and":
+            if not all(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif key == "$or":
+            if not any(matches_filter(metadata, clause) for clause in condition):
+                return False
+        elif isinstance(condition, dict):
+            if not all(_compare(metadata.get(key), op, operand) for op, operand in condition.items()):
+                return False
+        elif metadata.get(key) != condition:
+            return False
+    return True
+
+
+class SparseIndex:
+    """Incremental on-disk BM25 index of the chunks in one collection."""
+
+    def __init__(
+        self,
+        namespace: str,
+        path: Path,
+        k1: Optional[float] = None,
+        b: Optional[float] = None,
+    ):
+        """
+        Args:
+            namespace: Identity of the collection the index describes (its id)
+            path: SQLite file
+            k1: BM25 term frequency saturation (defaults to ``config.bm25_k1``)
+            b: BM25 length normalisation (defaults to ``config.bm25_b``)
+        """
+        self.k1 = k1 if k1 is not None else config.bm25_k1
+        self.b = b if b is not None else config.bm25_b
+        self.path = Path(path)
+
+        # Document lengths by doc number (0 = deleted), reloaded when another process wrote
+        self._lengths = np.zeros(0, dtype=np.float32)
+        self._loaded_generation: Optional[int] = None
+
+        self._lock = threading.Lock()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT NOT NULL);
+            CREATE TABLE IF NOT EXISTS docs (
+                doc_num INTEGER PRIMARY KEY AUTOINCREMENT,
+                chunk_id TEXT NOT NULL UNIQUE,
+                length INTEGER NOT NULL,
+                terms INTEGER NOT NULL,
+                metadata TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS postings (
+                term TEXT NOT NULL,
+                count INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS idx_postings_term ON postings (term);
+            """
+        )
+        self._open_namespace(namespace)
+
+    def _open_namespace(self, namespace: str) -> None:
+        """Start over when the collection changed."""
+        row = self._conn.execute("SELECT value FROM meta WHERE key = 'namespace'").fetchone()
+        if row is None or row[0] != namespace:
+            if row is not None:
+                logger.info("Vector store collection changed, clearing sparse index")
+            self._clear(namespace)
+        self._conn.commit()
+
+    def _clear(self, namespace: str) -> None:
+        # The generation keeps growing so other processes notice the reset
+        generation = self._meta_int("generation") + 1
+        self._conn.execute("DELETE FROM docs")
+        self._conn.execute("DELETE FROM postings")
+        self._conn.execute("DELETE FROM meta")
+        self._conn.executemany(
+            "INSERT INTO meta (key, value) VALUES (?, ?)",
+            [("namespace", namespace), ("generation", str(generation)), ("dead_postings", "0"), ("total_postings", "0")],
+        )
+
+    def reset(self, namespace: str) -> None:
+        """Drop every chunk, e.g. after the collection was recreated."""
+        with self._lock:
+            self._clear(namespace)
+            self._conn.commit()
+
+    def _meta_int(self, key: str) -> int:
+        row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return int(row[0]) if row else 0
+
+    def _add_meta_int(self, key: str, delta: int) -> None:
+        self._conn.execute(
+            "UPDATE meta SET value = CAST(CAST(value AS INTEGER) + ? AS TEXT) WHERE key = ?", (delta, key)
+        )
+
+    def add(self, ids: Sequence[str], texts: Sequence[str], metadata: Sequence[Optional[Dict[str, Any]]]) -> int:
+        """
+        Index new chunks.
+
+        Ids that are already indexed are skipped, matching Chroma's ``add``.
+
+        Returns:
+            Number of chunks indexed
+        """
+        with self._lock:
+            existing = self._existing_ids(ids)
+            term_postings: Dict[str, List[Tuple[int, int]]] = defaultdict(list)
+            added = 0
+            postings = 0
+            for chunk_id, text, meta in zip(ids, texts, metadata):
+                if chunk_id in existing:
+                    continue
+                existing.add(chunk_id)
+                tokens = tokenize(text)
+                frequencies = Counter(tokens)
+                cursor = self._conn.execute(
+                    "INSERT INTO docs (chunk_id, length, terms, metadata) VALUES (?, ?, ?, ?)",
+                    (chunk_id, len(tokens), len(frequencies), json.dumps(meta or {}, ensure_ascii=False, default=str)),
+                )
+                doc_num = cursor.lastrowid
+                for term, freq in frequencies.items():
+                    term_postings[term].append((doc_num, freq))
+                    postings += 1
+                added += 1
+
+            # Doc numbers only grow, so each term's new postings are already sorted
+            self._conn.executemany(
+                "INSERT INTO postings (term, count, data) VALUES (?, ?, ?)",
+                [
+                    (term, len(entries), encode_postings(
+                        np.fromiter((d for d, _ in entries), dtype=np.int64, count=len(entries)),
+                        np.fromiter((f for _, f in entries), dtype=np.int64, count=len(entries)),
+                    ))
+                    for term, entries in term_postings.items()
+                ],
+            )
+            self._merge_fragmented(term_postings.keys())
+            self._add_meta_int("total_postings", postings)
+            self._add_meta_int("generation", 1)
+            self._conn.commit()
+            return added
+
+    def _existing_ids(self, ids: Sequence[str]) -> set:
+        found = set()
+        ids = list(ids)
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(row[0] for row in self._conn.execute(
+                f"SELECT chunk_id FROM docs WHERE chunk_id IN ({placeholders})", batch
+            ))
+        return found
+
+    def _merge_fragmented(self, terms: Iterable[str]) -> None:
+        """Merge the blocks of terms that have accumulated too many (lock held)."""
+        for term in terms:
+            (blocks,) = self._conn.execute("SELECT COUNT(*) FROM postings WHERE term = ?", (term,)).fetchone()
+            if blocks >= MAX_BLOCKS_PER_TERM:
+                self._rewrite_term(term, live=None)
+
+    def _rewrite_term(self, term: str, live: Optional[set]) -> int:
+        """Replace a term's blocks by one, keeping only doc numbers in ``live`` if given (lock held)."""
+        doc_nums, freqs = self._read_term(term)
+        if live is not None and len(doc_nums):
+            keep = np.fromiter((d in live for d in doc_nums.tolist()), dtype=bool, count=len(doc_nums))
+            doc_nums, freqs = doc_nums[keep], freqs[keep]
+        self._conn.execute("DELETE FROM postings WHERE term = ?", (term,))
+        if len(doc_nums):
+            self._conn.execute(
+                "INSERT INTO postings (term, count, data) VALUES (?, ?, ?)",
+                (term, len(doc_nums), encode_postings(doc_nums, freqs)),
+            )
+        return len(doc_nums)
+
+    def _read_term(self, term: str) -> Tuple[np.ndarray, np.ndarray]:
+        rows = self._conn.execute("SELECT count, data FROM postings WHERE term = ? ORDER BY rowid", (term,)).fetchall()
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.float32)
+        decoded = [decode_postings(data, count) for count, data in rows]
+        return np.concatenate([d for d, _ in decoded]), np.concatenate([f for _, f in decoded])
+
+    def delete(self, ids: Sequence[str]) -> int:
+        """
+        Remove chunks from the index.
+
+        Returns:
+            Number of chunks removed
+        """
+        ids = list(ids)
+        with self._lock:
+            removed = 0
+            dead = 0
+            for start in range(0, len(ids), 500):
+                batch = ids[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT terms FROM docs WHERE chunk_id IN ({placeholders})", batch
+                ).fetchall()
+                self._conn.execute(f"DELETE FROM docs WHERE chunk_id IN ({placeholders})", batch)
+                removed += len(rows)
+                dead += sum(terms for (terms,) in rows)
+            if removed:
+                self._add_meta_int("dead_postings", dead)
+                self._add_meta_int("generation", 1)
+                total = self._meta_int("total_postings")
+                if total and self._meta_int("dead_postings") / total >= COMPACT_DEAD_FRACTION:
+                    self._compact()
+            self._conn.commit()
+            return removed
+
+    def compact(self) -> None:
+        """Drop deleted chunks from the postings and merge every term into one block."""
+        with self._lock:
+            self._compact()
+            self._conn.commit()
+
+    def _compact(self) -> None:
+        live = {row[0] for row in self._conn.execute("SELECT doc_num FROM docs")}
+        terms = [row[0] for row in self._conn.execute("SELECT DISTINCT term FROM postings")]
+        total = sum(self._rewrite_term(term, live) for term in terms)
+        self._conn.execute("UPDATE meta SET value = ? WHERE key = 'total_postings'", (str(total),))
+        self._conn.execute("UPDATE meta SET value = '0' WHERE key = 'dead_postings'")
+        self._add_meta_int("generation", 1)
+        logger.info(f"Compacted sparse index: {len(terms)} terms, {total} postings")
+
+    def _refresh_lengths(self) -> None:
+        """Reload document lengths if the index changed since they were loaded (lock held)."""
+        generation = self._meta_int("generation")
+        if generation == self._loaded_generation:
+            return
+        rows = self._conn.execute("SELECT doc_num, length FROM docs").fetchall()
+        size = max((doc_num for doc_num, _ in rows), default=0) + 1
+        lengths = np.zeros(size, dtype=np.float32)
+        if rows:
+            doc_nums, values = zip(*rows)
+            # Empty chunks keep a non-zero length so 0 still means deleted
+            lengths[list(doc_nums)] = np.maximum(values, 1e-3)
+        self._lengths = lengths
+        self._loaded_generation = generation
+
+    def search(
+        self,
+        query: str,
+        top_k: int,
+        filters: Optional[Dict[str, Any]] = None,
+    ) -> List[Tuple[str, float]]:
+        """
+        Rank chunks by BM25 score for the query.
+
+        Args:
+            query: Query text (each distinct token is one term)
+            top_k: Number of results to return
+            filters: Optional Chroma-style metadata filter
+
+        Returns:
+            ``(chunk_id, score)`` pairs, best first
+        """
+        terms = set(tokenize(query))
+        if not terms or top_k <= 0:
+            return []
+
+        with self._lock:
+            self._refresh_lengths()
+            lengths = self._lengths
+            live = lengths > 0
+            n_docs = int(np.count_nonzero(live))
+            if n_docs == 0:
+                return []
+            avg_length = float(lengths[live].mean())
+
+            doc_parts, score_parts = [], []
+            for term in terms:
+                doc_nums, freqs = self._read_term(term)
+                if not len(doc_nums):
+                    continue
+                # Postings of deleted chunks linger until compaction
+                in_range = doc_nums < len(lengths)
+                doc_nums, freqs = doc_nums[in_range], freqs[in_range]
+                doc_lengths = lengths[doc_nums]
+                alive = doc_lengths > 0
+                doc_nums, freqs, doc_lengths = doc_nums[alive], freqs[alive], doc_lengths[alive]
+                df = len(doc_nums)
+                if df == 0:
+                    continue
+                idf = math.log(1.0 + (n_docs - df + 0.5) / (df + 0.5))
+                norm = self.k1 * (1.0 - self.b + self.b * doc_lengths / avg_length)
+                doc_parts.append(doc_nums)
+                score_parts.append(idf * freqs * (self.k1 + 1.0) / (freqs + norm))
+
+            if not doc_parts:
+                return []
+            candidates, inverse = np.unique(np.concatenate(doc_parts), return_inverse=True)
+            scores = np.bincount(inverse, weights=np.concatenate(score_parts))
+            order = np.argsort(-scores, kind="stable")
+
+            # Fetch chunk ids (and metadata when filtering) for the best candidates only
+            results: List[Tuple[str, float]] = []
+            batch_size = max(top_k * 4, 64)
+            for start in range(0, len(order), batch_size):
+                batch = order[start:start + batch_size]
+                doc_nums = [int(candidates[i]) for i in batch]
+                placeholders = ",".join("?" * len(doc_nums))
+                rows = {
+                    doc_num: (chunk_id, meta)
+                    for doc_num, chunk_id, meta in self._conn.execute(
+                        f"SELECT doc_num, chunk_id, metadata FROM docs WHERE doc_num IN ({placeholders})", doc_nums
+                    )
+                }
+                for index, doc_num in zip(batch, doc_nums):
+                    if doc_num not in rows:
+                        continue
+                    chunk_id, meta = rows[doc_num]
+                    if filters and not matches_filter(json.loads(meta), filters):
+                        continue
+                    results.append((chunk_id, float(scores[index])))
+                    if len(results) >= top_k:
+                        return results
+            return results
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        with self._lock:
+            (count,) = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """Get chunk, term and postings counts."""
+        with self._lock:
+            (docs,) = self._conn.execute("SELECT COUNT(*) FROM docs").fetchone()
+            (terms, blocks) = self._conn.execute("SELECT COUNT(DISTINCT term), COUNT(*) FROM postings").fetchone()
+            total = self._meta_int("total_postings")
+            dead = self._meta_int("dead_postings")
+        size = self.path.stat().st_size if self.path.exists() else 0
+        return {
+            "indexed_chunks": docs,
+            "terms": terms,
+            "postings_blocks": blocks,
+            "postings": total,
+            "dead_postings": dead,
+            "size_bytes": size,
+            "path": str(self.path),
+        }
+
+    def close(self) -> None:
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
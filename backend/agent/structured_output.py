@@ -0,0 +1,118 @@
+"""
+Schema-constrained (JSON) responses.
+
+Builds the ``response_format`` for a pydantic model, parses and validates
+the model's JSON answer, and prepares the prompt for the single repair
+attempt made when validation fails.
+"""
+
+import json
+import re
+import copy
+from typing import Any, Dict, List, Type, TypeVar
+
+from pydantic import BaseModel
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+JSON_SCHEMA = "json_schema"
+JSON_OBJECT = "json_object"
+
+_CODE_FENCE = re.compile(r"^\s*```(?:json)?\s*(.*?)\s*```\s*$", re.DOTALL)
+
+
+class StructuredOutputInvalid(ValueError):
+    """The response could not be parsed into the requested schema."""
+    pass
+
+
+def strict_json_schema(schema: Type[BaseModel]) -> Dict[str, Any]:
+    """
+    Get the JSON schema of a pydantic model in the form strict mode accepts.
+
+    Strict mode needs every property listed as required and no additional
+    properties on every object; pydantic leaves fields with defaults optional.
+    """
+    json_schema = copy.deepcopy(schema.model_json_schema())
+
+    def tighten(node: Any) -> None:
+        if isinstance(node, dict):
+            if node.get("type") == "object" and "properties" in node:
+                node["required"] = list(node["properties"])
+                node["additionalProperties"] = False
+            # Strict mode rejects defaults
+            node.pop("default", None)
+            for value in node.values():
+                tighten(value)
+        elif isinstance(node, list):
+            for item in node:
+                tighten(item)
+
+    tighten(json_schema)
+    return json_schema
+
+
+def response_format_for(schema: Type[BaseModel], mode: str) -> Dict[str, Any]:
+    """Build the chat completions ``response_format`` for a schema."""
+    if mode == JSON_SCHEMA:
+        return {
+            "type": "json_schema",
+            "json_schema": {
+                "name": schema.__name__,
+                "schema": strict_json_schema(schema),
+                "strict": True,
+            },
+        }
+    return {"type": "json_object"}
+
+
+def schema_instructions(schema: Type[BaseModel]) -> str:
+    """System prompt addendum describing the expected JSON (for json_object mode)."""
+    return (
+        "Respond only with a JSON object that matches this JSON schema, without any other text:\n"
+        f"{json.dumps(strict_json_schema(schema), ensure_ascii=False)}"
+    )
+
+
+def with_schema_instructions(messages: List[Dict[str, str]], schema: Type[BaseModel]) -> List[Dict[str, str]]:
+    """Add the schema instructions to the system message (or a new one)."""
+    instructions = schema_instructions(schema)
+    messages = [dict(m) for m in messages]
+    if messages and messages[0].get("role") == "system":
+        messages[0]["content"] = f"{messages[0]['content']}\n\n{instructions}"
+    else:
+        messages.insert(0, {"role": "system", "content": instructions})
+    return messages
+
+
+def parse_structured(content: str, schema: Type[ModelT]) -> ModelT:
+    """
+    Parse and validate a JSON answer.
+
+    Raises:
+        StructuredOutputInvalid: If the content is not JSON or does not match the schema
+    """
+    text = (content or "").strip()
+    fenced = _CODE_FENCE.match(text)
+    if fenced:
+        text = fenced.group(1)
+    try:
+        return schema.model_validate_json(text)
+    except ValueError as e:
+        # pydantic's ValidationError is a ValueError and covers malformed JSON too
+        raise StructuredOutputInvalid(str(e)) from e
+
+
+def repair_messages(schema: Type[BaseModel], content: str, error: Exception) -> List[Dict[str, str]]:
+    """Prompt asking the model to turn an invalid answer into valid JSON, keeping its content."""
+    return [
+        {"role": "system", "content": schema_instructions(schema)},
+        {
+            "role": "user",
+            "content": (
+                "The following answer failed validation. Return the same information as a JSON "
+                "object that matches the schema. Do not add or drop content.\n\n"
+                f"VALIDATION ERRORS:\n{error}\n\nANSWER:\n{content}"
+            ),
+        },
+    ]
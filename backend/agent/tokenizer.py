@@ -0,0 +1,79 @@
+"""
+Token counting for prompt budgeting.
+
+Uses tiktoken when it is installed and its encoding files are available, and
+falls back to a character-class heuristic otherwise (e.g. on offline hosts
+where tiktoken cannot download its BPE ranks).
+"""
+
+import logging
+from functools import lru_cache
+from typing import Optional, Any
+
+try:
+    import tiktoken
+    TIKTOKEN_AVAILABLE = True
+except ImportError:
+    TIKTOKEN_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_ENCODING = "o200k_base"
+
+
+@lru_cache(maxsize=16)
+def _get_encoding(model: Optional[str]) -> Optional[Any]:
+    """Resolve (and memoize) the tiktoken encoding for a model, or None if unavailable."""
+    if not TIKTOKEN_AVAILABLE:
+        return None
+
+    if model:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            pass  # Unknown model name, use the default encoding
+        except Exception as e:
+            logger.warning(f"Could not load tiktoken encoding for {model}, using heuristic counts: {e}")
+            return None
+
+    try:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+    except Exception as e:
+        logger.warning(f"Could not load tiktoken encoding {DEFAULT_ENCODING}, using heuristic counts: {e}")
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Approximate token count without a tokenizer.
+
+    ASCII text averages about 4 characters per token, while accented text
+    (e.g. Vietnamese) splits much more finely, so non-ASCII characters are
+    weighted more heavily than the plain 4-chars-per-token rule.
+    """
+    if not text:
+        return 0
+    non_ascii = sum(1 for ch in text if ord(ch) > 127)
+    ascii_chars = len(text) - non_ascii
+    return int(ascii_chars / 4 + non_ascii / 1.5) + 1
+
+
+def count_tokens(text: str, model: Optional[str] = None) -> int:
+    """
+    Count tokens in text for the given model.
+
+    Args:
+        text: Text to count
+        model: Model name used to pick the encoding (optional)
+
+    Returns:
+        Token count (exact with tiktoken, estimated otherwise)
+    """
+    if not text:
+        return 0
+
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return estimate_tokens(text)
+
+    return len(encoding.encode(text, disallowed_special=()))
@@ -0,0 +1,66 @@
+"""
+Lazily constructed module-level singletons.
+
+Expensive globals (the OpenAI client, the Chroma vector store) are exposed as
+``LazyProxy`` objects so that importing a module costs nothing and hosts
+without an API key or database can still import it; the real object is built
+on first attribute access.
+"""
+
+import threading
+from typing import Any, Callable, Generic, Optional, TypeVar
+
+T = TypeVar("T")
+
+_UNSET = object()
+
+
+class LazyProxy(Generic[T]):
+    """
+    Thread-safe proxy that builds its target on first use.
+
+    Usage:
+        llm_client = LazyProxy(OpenAIClient, "llm_client")
+        await llm_client.chat(messages)  # OpenAIClient() is constructed here
+
+    If the factory raises, the error propagates to the caller and the next
+    access tries again.
+    """
+
+    __slots__ = ("_factory", "_name", "_lock", "_target")
+
+    def __init__(self, factory: Callable[[], T], name: Optional[str] = None):
+        object.__setattr__(self, "_factory", factory)
+        object.__setattr__(self, "_name", name or getattr(factory, "__name__", "object"))
+        object.__setattr__(self, "_lock", threading.Lock())
+        object.__setattr__(self, "_target", _UNSET)
+
+    def _resolve(self) -> T:
+        """Get the target, constructing it if this is the first use."""
+        target = self._target
+        if target is _UNSET:
+            with self._lock:
+                target = self._target
+                if target is _UNSET:
+                    target = self._factory()
+                    object.__setattr__(self, "_target", target)
+        return target
+
+    @property
+    def is_initialized(self) -> bool:
+        """Whether the target has been constructed."""
+        return self._target is not _UNSET
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._resolve(), name)
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        setattr(self._resolve(), name, value)
+
+    def __delattr__(self, name: str) -> None:
+        delattr(self._resolve(), name)
+
+    def __repr__(self) -> str:
+        if self.is_initialized:
+            return repr(self._target)
+        return f"<LazyProxy {self._name} (not initialized)>"
@@ -5,9 +5,14 @@ Supports document storage, retrieval, and similarity search.
 """
 
 import sys
+import time
+import asyncio
 import logging
+import threading
+import importlib.util
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Sequence, Set, Tuple
 import numpy as np
 
 # Handle both module and direct execution contexts
@@ -15,22 +20,74 @@ current_dir = Path(__file__).parent
 if str(current_dir) not in sys.path:
     sys.path.insert(0, str(current_dir))
 
-try:
-    import chromadb
-    from chromadb.config import Settings
-    CHROMA_AVAILABLE = True
-except ImportError:
-    CHROMA_AVAILABLE = False
+# chromadb is slow to import, so only check for it here and import it when a store is opened
+CHROMA_AVAILABLE = importlib.util.find_spec("chromadb") is not None
 
 try:
     from .config import config
     from .models import Document
+    from .embeddings import Embedder, embedder as default_embedder
+    from .sparse_index import SparseIndex
+    from .rank_features import has_rank_features, with_rank_features
+    from .result_cache import ResultCache, result_key
+    from .utils.lazy import LazyProxy
 except ImportError:
     from config import config
     from models import Document
+    from embeddings import Embedder, embedder as default_embedder
+    from sparse_index import SparseIndex
+    from rank_features import has_rank_features, with_rank_features
+    from result_cache import ResultCache, result_key
+    from utils.lazy import LazyProxy
 
 logger = logging.getLogger(__name__)
 
+# Recency cutoffs are rounded down to this many seconds, so repeated searches share cached results
+RECENCY_GRANULARITY = 3600
+# Metadata fields that chunks stored before they existed must be backfilled with before filtering
+FILTER_FIELDS = ("date_ts", "source_type")
+
+
+def metadata_filter(
+    filters: Optional[Dict[str, Any]] = None,
+    max_age_days: Optional[float] = None,
+    source_types: Optional[Sequence[str]] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Combine metadata filters with a recency window and source types into one Chroma ``where``.
+
+    Args:
+        filters: Other metadata filters
+        max_age_days: Only chunks published within this many days (``date_ts``; undated chunks are excluded)
+        source_types: Only chunks of these source types (e.g. ``["rss_feed"]``)
+
+    Returns:
+        The ``where`` clause, or None when there is nothing to filter on
+    """
+    clauses = [filters] if filters else []
+    if max_age_days:
+        cutoff = time.time() - max_age_days * 86400
+        clauses.append({"date_ts": {"$gte": float(cutoff // RECENCY_GRANULARITY * RECENCY_GRANULARITY)}})
+    if source_types:
+        clauses.append({"source_type": {"$in": list(source_types)}})
+    if not clauses:
+        return None
+    return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+
+def _filter_keys(where: Any) -> Set[str]:
+    """Metadata fields a ``where`` clause refers to."""
+    keys: Set[str] = set()
+    if isinstance(where, dict):
+        for key, value in where.items():
+            if not key.startswith("$"):
+                keys.add(key)
+            keys |= _filter_keys(value)
+    elif isinstance(where, list):
+        for clause in where:
+            keys |= _filter_keys(clause)
+    return keys
+
 
 class VectorStoreError(Exception):
     """Base exception for vector store operations."""
@@ -40,16 +97,21 @@ class VectorStoreError(Exception):
 class VectorStore:
     """Abstracts vector database operations supporting ChromaDB and Qdrant."""
 
-    def __init__(self, collection_name: str = None, persist_directory: str = None):
+    def __init__(self, collection_name: str = None, persist_directory: str = None, embedder: Embedder = None):
         if not CHROMA_AVAILABLE:
             raise VectorStoreError("ChromaDB not available. Install with: pip install chromadb")
 
         self.collection_name = collection_name or config.collection_name
         self.persist_directory = persist_directory or str(config.vector_db_dir)
+        # Queries are embedded with the same model as ingested documents
+        self.embedder = embedder or default_embedder
 
         # Ensure directory exists
         Path(self.persist_directory).mkdir(parents=True, exist_ok=True)
 
+        import chromadb
+        from chromadb.config import Settings
+
         # Initialize ChromaDB client
         self.client = chromadb.PersistentClient(
             path=self.persist_directory,
@@ -67,6 +129,29 @@ class VectorStore:
                 # Create a dummy collection to prevent crashes
                 self.collection = None
 
+        # BM25 index of the same chunks, for hybrid search
+        self.sparse_index: Optional[SparseIndex] = None
+        if config.sparse_index_enabled and self.collection is not None:
+            self.sparse_index = SparseIndex(
+                namespace=str(self.collection.id),
+                path=Path(self.persist_directory) / f"sparse_{self.collection_name}.sqlite3",
+            )
+        self._sparse_synced = False
+        self._sparse_lock = threading.Lock()
+        self._sparse_executor: Optional[ThreadPoolExecutor] = None
+
+        # Bumped after every write; cached results of older versions are never served
+        self.version = 0
+        self._version_lock = threading.Lock()
+        self.result_cache = ResultCache()
+
+        self._filter_fields_synced = False
+        self._backfill_lock = threading.Lock()
+
+    def _bump_version(self) -> None:
+        with self._version_lock:
+            self.version += 1
+
     def add_documents(
         self,
         texts: List[str],
@@ -77,6 +162,9 @@ class VectorStore:
         """
         Add documents with embeddings to the vector store.
 
+        Rerank features (``date_ts``, ``chunk_words``, ``term_hashes``) are
+        added to the metadata unless already present.
+
         Args:
             texts: List of document texts
             embeddings: Numpy array of embeddings (n_samples, n_features)
@@ -95,6 +183,8 @@ class VectorStore:
         if isinstance(embeddings, np.ndarray):
             embeddings = embeddings.tolist()
 
+        metadata = with_rank_features(texts, metadata)
+
         try:
             self.collection.add(
                 documents=texts,
@@ -105,12 +195,19 @@ class VectorStore:
             logger.info(f"Added {len(texts)} documents to vector store")
         except Exception as e:
             raise VectorStoreError(f"Failed to add documents: {e}")
+        finally:
+            # Part of a failed batch may have been written
+            self._bump_version()
+
+        self._update_sparse_index("add", ids, texts, metadata)
 
     def similarity_search(
         self,
         query: str,
         top_k: int = None,
-        filters: Optional[Dict[str, Any]] = None
+        filters: Optional[Dict[str, Any]] = None,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
     ) -> List[Document]:
         """
         Perform similarity search on the vector store.
@@ -119,64 +216,164 @@ class VectorStore:
             query: Search query text
             top_k: Number of results to return
             filters: Optional metadata filters
+            max_age_days: Only search chunks published within this many days
+            source_types: Only search chunks of these source types
 
         Returns:
             List of Document objects with similarity scores
         """
+        return self.similarity_search_batch(
+            [query], top_k=top_k, filters=filters, max_age_days=max_age_days, source_types=source_types
+        )[0]
+
+    def similarity_search_batch(
+        self,
+        queries: List[str],
+        top_k: int = None,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[List[Document]]:
+        """
+        Perform similarity search for several queries at once.
+
+        All queries are embedded in one pass (reusing cached query
+        embeddings) and looked up in a single collection query, instead of
+        one round trip per query. Results cached for the current collection
+        version are reused, and only the other queries go to the collection.
+
+        The recency window and source types are part of the collection
+        query (see ``metadata_filter``), not applied to its results.
+
+        Args:
+            queries: Search query texts
+            top_k: Number of results to return per query
+            filters: Optional metadata filters (applied to every query)
+            include_embeddings: Also return the stored chunk embeddings (``Document.embedding``)
+            max_age_days: Only search chunks published within this many days
+            source_types: Only search chunks of these source types
+
+        Returns:
+            One list of Document objects with similarity scores per query, in query order
+        """
+        if not queries:
+            return []
         if top_k is None:
             top_k = config.top_k_retrieval
+        filters = metadata_filter(filters, max_age_days, source_types)
+        self._ensure_filter_fields(filters)
 
         try:
+            # Read before querying: results cached under this version predate any later write
+            version = self.version
+            query_embeddings = self.embedder.embed_queries(queries)
+            keys = [result_key(e, filters, top_k, version, include_embeddings) for e in query_embeddings]
+            found = [self.result_cache.get(key) for key in keys]
+            missing = [i for i, docs in enumerate(found) if docs is None]
+            if not missing:
+                return found
+
+            include = ["documents", "metadatas", "distances"]
+            if include_embeddings:
+                include.append("embeddings")
             results = self.collection.query(
-                query_texts=[query],
+                query_embeddings=query_embeddings[missing].tolist(),
                 n_results=top_k,
                 where=filters,
-                include=["documents", "metadatas", "distances"]
+                include=include
             )
-
-            documents = []
-            for i, (doc_text, metadata) in enumerate(zip(
-                results["documents"][0],
-                results["metadatas"][0]
-            )):
-                # Calculate relevance score (lower distance = higher relevance)
-                distance = results["distances"][0][i] if "distances" in results else 0.0
-                relevance_score = 1.0 / (1.0 + distance)  # Convert distance to similarity
-
-                document = Document(
-                    page_content=doc_text,
-                    metadata={
-                        **metadata,
-                        "relevance_score": relevance_score,
-                        "distance": distance
-                    }
-                )
-                documents.append(document)
-
-            return documents
+            for position, i in enumerate(missing):
+                found[i] = self._results_to_documents(results, position)
+                self.result_cache.put(keys[i], found[i])
+            return found
 
         except Exception as e:
             raise VectorStoreError(f"Similarity search failed: {e}")
 
+    def _results_to_documents(self, results: Dict[str, Any], index: int) -> List[Document]:
+        """Convert the results of one query in a Chroma query response into Documents."""
+        distances = results.get("distances")
+        ids = results.get("ids")
+        embeddings = results.get("embeddings")
+        documents = []
+        for i, (doc_text, metadata) in enumerate(zip(
+            results["documents"][index],
+            results["metadatas"][index]
+        )):
+            # Calculate relevance score (lower distance = higher relevance)
+            distance = distances[index][i] if distances else 0.0
+            relevance_score = 1.0 / (1.0 + distance)  # Convert distance to similarity
+
+            documents.append(Document(
+                page_content=doc_text,
+                metadata={
+                    **(metadata or {}),
+                    "chunk_id": ids[index][i] if ids else None,
+                    "relevance_score": relevance_score,
+                    "distance": distance
+                },
+                embedding=embeddings[index][i] if embeddings is not None else None
+            ))
+
+        return documents
+
     def hybrid_search(
         self,
         query: str,
         keywords: List[str],
-        top_k: int = None
+        top_k: int = None,
+        filters: Optional[Dict[str, Any]] = None,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
     ) -> List[Document]:
         """
-        Perform hybrid search combining semantic and keyword matching.
+        Perform hybrid search combining semantic and BM25 keyword search.
+
+        The dense query and the BM25 query (the query plus the keywords) run
+        concurrently, each for ``2 * top_k`` candidates, and the two rankings
+        are merged by reciprocal rank fusion. Chunks only the BM25 index found
+        are fetched from the collection and scored against the query
+        embedding, so every result carries a ``relevance_score``.
 
         Args:
             query: Main search query
-            keywords: Additional keywords to boost
+            keywords: Additional keywords to match lexically
             top_k: Number of results to return
+            filters: Optional metadata filters (applied to both searches)
+            max_age_days: Only search chunks published within this many days
+            source_types: Only search chunks of these source types
 
         Returns:
             List of documents sorted by hybrid score
         """
-        # First perform semantic search
-        semantic_results = self.similarity_search(query, top_k=top_k * 2)
+        top_k = top_k or config.top_k_retrieval
+        fetch_k = top_k * 2
+        filters = metadata_filter(filters, max_age_days, source_types)
+        self._ensure_filter_fields(filters)
+
+        if self.sparse_index is None:
+            return self._keyword_boosted_search(query, keywords, top_k, filters)
+
+        sparse_query = " ".join([query, *keywords])
+        sparse_future = self._sparse_pool().submit(self._sparse_search, sparse_query, fetch_k, filters)
+        try:
+            semantic_results = self.similarity_search(query, top_k=fetch_k, filters=filters)
+        finally:
+            # Wait for the BM25 results even when the dense search failed
+            sparse_results = sparse_future.result()
+
+        return self._fuse(semantic_results, sparse_results, query, top_k)
+
+    def _keyword_boosted_search(
+        self,
+        query: str,
+        keywords: List[str],
+        top_k: int,
+        filters: Optional[Dict[str, Any]]
+    ) -> List[Document]:
+        """Re-score semantic results by keyword occurrences (used when the sparse index is disabled)."""
+        semantic_results = self.similarity_search(query, top_k=top_k * 2, filters=filters)
 
         # Boost results that contain keywords
         for doc in semantic_results:
@@ -191,7 +388,172 @@ class VectorStore:
         # Sort by hybrid score and return top_k
         semantic_results.sort(key=lambda x: x.metadata["hybrid_score"], reverse=True)
 
-        return semantic_results[:top_k or config.top_k_retrieval]
+        return semantic_results[:top_k]
+
+    def _sparse_pool(self) -> ThreadPoolExecutor:
+        if self._sparse_executor is None:
+            with self._sparse_lock:
+                if self._sparse_executor is None:
+                    self._sparse_executor = ThreadPoolExecutor(
+                        max_workers=config.vector_store_read_concurrency,
+                        thread_name_prefix="sparse-search",
+                    )
+        return self._sparse_executor
+
+    def _sparse_search(self, query: str, top_k: int, filters: Optional[Dict[str, Any]]) -> List[Tuple[str, float]]:
+        """BM25 search, rebuilding the index first if it does not cover the collection."""
+        try:
+            self.sync_sparse_index()
+            return self.sparse_index.search(query, top_k, filters=filters)
+        except Exception as e:
+            # Dense results alone are still a valid answer
+            logger.warning(f"Sparse search failed, using dense results only: {e}")
+            return []
+
+    def _fuse(
+        self,
+        semantic_results: List[Document],
+        sparse_results: List[Tuple[str, float]],
+        query: str,
+        top_k: int
+    ) -> List[Document]:
+        """Merge dense and BM25 rankings by reciprocal rank fusion."""
+        rrf_k = config.hybrid_rrf_k
+        fused: Dict[str, Document] = {}
+
+        for rank, doc in enumerate(semantic_results, start=1):
+            key = doc.metadata.get("chunk_id") or str(hash(doc.page_content))
+            doc.metadata["dense_rank"] = rank
+            doc.metadata["hybrid_score"] = 1.0 / (rrf_k + rank)
+            fused[key] = doc
+
+        missing = [chunk_id for chunk_id, _ in sparse_results if chunk_id not in fused]
+        for doc in self._get_documents(missing, query):
+            fused[doc.metadata["chunk_id"]] = doc
+
+        for rank, (chunk_id, score) in enumerate(sparse_results, start=1):
+            doc = fused.get(chunk_id)
+            if doc is None:
+                # Deleted from the collection but not yet from the index
+                continue
+            doc.metadata["sparse_rank"] = rank
+            doc.metadata["bm25_score"] = score
+            doc.metadata["hybrid_score"] = doc.metadata.get("hybrid_score", 0.0) + 1.0 / (rrf_k + rank)
+
+        results = sorted(fused.values(), key=lambda d: d.metadata["hybrid_score"], reverse=True)
+        return results[:top_k]
+
+    def _get_documents(self, ids: List[str], query: str) -> List[Document]:
+        """Fetch chunks by id, with the distance of their stored embedding to the query."""
+        if not ids:
+            return []
+        try:
+            results = self.collection.get(ids=ids, include=["documents", "metadatas", "embeddings"])
+        except Exception as e:
+            logger.warning(f"Could not fetch BM25-only results: {e}")
+            return []
+
+        query_embedding = self.embedder.embed_queries([query])[0]
+        embeddings = results.get("embeddings")
+        documents = []
+        for i, (chunk_id, doc_text, metadata) in enumerate(zip(results["ids"], results["documents"], results["metadatas"])):
+            # Squared L2, the collection's default distance
+            distance = 0.0
+            if embeddings is not None:
+                distance = float(np.sum((np.asarray(embeddings[i], dtype=np.float32) - query_embedding) ** 2))
+            documents.append(Document(
+                page_content=doc_text,
+                metadata={
+                    **(metadata or {}),
+                    "chunk_id": chunk_id,
+                    "relevance_score": 1.0 / (1.0 + distance),
+                    "distance": distance
+                }
+            ))
+        return documents
+
+    def sync_sparse_index(self, force: bool = False) -> None:
+        """
+        Rebuild the BM25 index from the collection when it is out of step.
+
+        Collections built before the index existed, or written while it was
+        disabled, are indexed on the first hybrid search.
+
+        Args:
+            force: Rebuild even if the chunk counts match
+        """
+        if self.sparse_index is None or (self._sparse_synced and not force):
+            return
+        with self._sparse_lock:
+            if self._sparse_synced and not force:
+                return
+            total = self.collection.count()
+            if force or self.sparse_index.count() != total:
+                logger.info(f"Rebuilding sparse index for {total} chunks")
+                self.sparse_index.reset(str(self.collection.id))
+                page = 5000
+                for offset in range(0, total, page):
+                    batch = self.collection.get(limit=page, offset=offset, include=["documents", "metadatas"])
+                    self.sparse_index.add(batch["ids"], batch["documents"], batch["metadatas"])
+            self._sparse_synced = True
+
+    def _update_sparse_index(self, operation: str, *args: Any) -> None:
+        """Apply a collection write to the BM25 index; a failure only triggers a rebuild later."""
+        if self.sparse_index is None:
+            return
+        try:
+            getattr(self.sparse_index, operation)(*args)
+        except Exception as e:
+            logger.warning(f"Sparse index {operation} failed, it will be rebuilt: {e}")
+            self._sparse_synced = False
+
+    def _ensure_filter_fields(self, filters: Optional[Dict[str, Any]]) -> None:
+        """Backfill the filter fields before the first search that filters on them."""
+        if filters and not self._filter_fields_synced and _filter_keys(filters) & set(FILTER_FIELDS):
+            try:
+                self.backfill_filter_fields()
+            except Exception as e:
+                logger.warning(f"Could not backfill filter fields, older chunks may be filtered out: {e}")
+
+    def backfill_filter_fields(self) -> int:
+        """
+        Add ``date_ts``, ``source_type`` and the other rank features to chunks stored without them.
+
+        Collections ingested before these fields were written would otherwise
+        be left out of every recency or source-filtered search. Runs once per
+        store, on the first such search.
+
+        Returns:
+            Number of chunks updated
+        """
+        with self._backfill_lock:
+            if self._filter_fields_synced:
+                return 0
+            updated = 0
+            page = 5000
+            try:
+                total = self.collection.count()
+                for offset in range(0, total, page):
+                    batch = self.collection.get(limit=page, offset=offset, include=["documents", "metadatas"])
+                    stale = [
+                        (chunk_id, text, metadata or {})
+                        for chunk_id, text, metadata in zip(batch["ids"], batch["documents"], batch["metadatas"])
+                        if not has_rank_features(metadata or {})
+                    ]
+                    if not stale:
+                        continue
+                    ids, texts, metadata = (list(column) for column in zip(*stale))
+                    self.collection.update(ids=ids, metadatas=with_rank_features(texts, metadata))
+                    updated += len(ids)
+            finally:
+                if updated:
+                    self._bump_version()
+            if updated:
+                logger.info(f"Backfilled filter fields of {updated} chunks")
+                # The BM25 index filters on its own copy of the metadata
+                self.sync_sparse_index(force=True)
+            self._filter_fields_synced = True
+            return updated
 
     def delete_documents(self, ids: List[str]) -> None:
         """
@@ -205,6 +567,27 @@ class VectorStore:
             logger.info(f"Deleted {len(ids)} documents from vector store")
         except Exception as e:
             raise VectorStoreError(f"Failed to delete documents: {e}")
+        finally:
+            self._bump_version()
+
+        self._update_sparse_index("delete", ids)
+
+    def existing_ids(self, ids: List[str]) -> Set[str]:
+        """
+        Get which of the given chunk ids are stored in the collection.
+
+        Args:
+            ids: Chunk ids to look up
+
+        Returns:
+            The ids that exist
+        """
+        if not ids:
+            return set()
+        try:
+            return set(self.collection.get(ids=list(ids), include=[])["ids"])
+        except Exception as e:
+            raise VectorStoreError(f"Failed to look up documents: {e}")
 
     def update_document(
         self,
@@ -222,6 +605,8 @@ class VectorStore:
             embedding: New embedding vector
             metadata: New metadata
         """
+        metadata = with_rank_features([text], [metadata])[0]
+
         try:
             # Delete old document first
             self.collection.delete(ids=[document_id])
@@ -239,6 +624,11 @@ class VectorStore:
             logger.info(f"Updated document {document_id}")
         except Exception as e:
             raise VectorStoreError(f"Failed to update document: {e}")
+        finally:
+            self._bump_version()
+
+        self._update_sparse_index("delete", [document_id])
+        self._update_sparse_index("add", [document_id], [text], [metadata])
 
     def get_collection_stats(self) -> Dict[str, Any]:
         """Get statistics about the collection."""
@@ -268,7 +658,193 @@ class VectorStore:
             logger.info(f"Reset collection: {self.collection_name}")
         except Exception as e:
             raise VectorStoreError(f"Failed to reset collection: {e}")
+        finally:
+            self._bump_version()
+            # Nothing cached before the reset can be served again
+            self.result_cache.clear()
 
+        self._update_sparse_index("reset", str(self.collection.id))
 
-# Global vector store instance
-vector_store = VectorStore()
+
+class _PoolStats:
+    """Queue and timing counters for one AsyncVectorStore pool."""
+
+    __slots__ = ("queued", "active", "completed", "max_queued", "wait_time")
+
+    def __init__(self):
+        self.queued = 0
+        self.active = 0
+        self.completed = 0
+        self.max_queued = 0
+        self.wait_time = 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            "queued": self.queued,
+            "active": self.active,
+            "completed": self.completed,
+            "max_queued": self.max_queued,
+            "avg_wait_time": self.wait_time / self.completed if self.completed else 0.0,
+        }
+
+
+class AsyncVectorStore:
+    """
+    Async facade over a VectorStore for code running on the event loop.
+
+    Chroma queries (including query embedding) and writes are blocking, so
+    each call runs on a dedicated thread pool instead of the event loop:
+    searches share ``vector_store_read_concurrency`` workers and writes get
+    ``vector_store_write_concurrency`` workers of their own, so a large
+    ingest cannot starve retrieval. Calls beyond the limits wait in the
+    pool's queue; ``stats()`` reports queue depth and wait times.
+    """
+
+    READ = "read"
+    WRITE = "write"
+
+    def __init__(
+        self,
+        store: Optional[VectorStore] = None,
+        max_readers: Optional[int] = None,
+        max_writers: Optional[int] = None,
+    ):
+        # The global store is a lazy proxy, so it is opened on a worker thread on first use
+        self.store = store if store is not None else vector_store
+        self._executors = {
+            self.READ: ThreadPoolExecutor(
+                max_workers=max_readers or config.vector_store_read_concurrency,
+                thread_name_prefix="vector-store-read",
+            ),
+            self.WRITE: ThreadPoolExecutor(
+                max_workers=max_writers or config.vector_store_write_concurrency,
+                thread_name_prefix="vector-store-write",
+            ),
+        }
+        self._stats = {self.READ: _PoolStats(), self.WRITE: _PoolStats()}
+        self._lock = threading.Lock()
+
+    async def similarity_search(
+        self,
+        query: str,
+        top_k: int = None,
+        filters: Optional[Dict[str, Any]] = None,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[Document]:
+        """See ``VectorStore.similarity_search``."""
+        return await self._run(
+            self.READ, "similarity_search", query,
+            top_k=top_k, filters=filters, max_age_days=max_age_days, source_types=source_types
+        )
+
+    async def similarity_search_batch(
+        self,
+        queries: List[str],
+        top_k: int = None,
+        filters: Optional[Dict[str, Any]] = None,
+        include_embeddings: bool = False,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[List[Document]]:
+        """See ``VectorStore.similarity_search_batch``."""
+        return await self._run(
+            self.READ, "similarity_search_batch", queries,
+            top_k=top_k, filters=filters, include_embeddings=include_embeddings,
+            max_age_days=max_age_days, source_types=source_types
+        )
+
+    async def hybrid_search(
+        self,
+        query: str,
+        keywords: List[str],
+        top_k: int = None,
+        filters: Optional[Dict[str, Any]] = None,
+        max_age_days: Optional[float] = None,
+        source_types: Optional[Sequence[str]] = None
+    ) -> List[Document]:
+        """See ``VectorStore.hybrid_search``."""
+        return await self._run(
+            self.READ, "hybrid_search", query, keywords,
+            top_k=top_k, filters=filters, max_age_days=max_age_days, source_types=source_types
+        )
+
+    async def get_collection_stats(self) -> Dict[str, Any]:
+        """See ``VectorStore.get_collection_stats``."""
+        return await self._run(self.READ, "get_collection_stats")
+
+    async def add_documents(
+        self,
+        texts: List[str],
+        embeddings: np.ndarray,
+        metadata: List[Dict[str, Any]],
+        ids: Optional[List[str]] = None
+    ) -> None:
+        """See ``VectorStore.add_documents``."""
+        await self._run(self.WRITE, "add_documents", texts, embeddings, metadata, ids)
+
+    async def delete_documents(self, ids: List[str]) -> None:
+        """See ``VectorStore.delete_documents``."""
+        await self._run(self.WRITE, "delete_documents", ids)
+
+    async def update_document(
+        self,
+        document_id: str,
+        text: str,
+        embedding: np.ndarray,
+        metadata: Dict[str, Any]
+    ) -> None:
+        """See ``VectorStore.update_document``."""
+        await self._run(self.WRITE, "update_document", document_id, text, embedding, metadata)
+
+    async def reset_collection(self) -> None:
+        """See ``VectorStore.reset_collection``."""
+        await self._run(self.WRITE, "reset_collection")
+
+    async def _run(self, kind: str, method: str, *args: Any, **kwargs: Any) -> Any:
+        """Run a blocking store method on the pool for ``kind`` and await its result."""
+        stats = self._stats[kind]
+        submitted = time.perf_counter()
+
+        def call() -> Any:
+            with self._lock:
+                stats.queued -= 1
+                stats.active += 1
+                stats.wait_time += time.perf_counter() - submitted
+            try:
+                # Looked up here so opening the lazily created store also happens off the event loop
+                return getattr(self.store, method)(*args, **kwargs)
+            finally:
+                with self._lock:
+                    stats.active -= 1
+                    stats.completed += 1
+
+        with self._lock:
+            stats.queued += 1
+            stats.max_queued = max(stats.max_queued, stats.queued)
+        future = self._executors[kind].submit(call)
+        try:
+            return await asyncio.wrap_future(future)
+        except asyncio.CancelledError:
+            # A call that has not started yet is dropped; one already running finishes in the background
+            if future.cancel():
+                with self._lock:
+                    stats.queued -= 1
+            raise
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Get queue depth, active calls and average queue wait per pool."""
+        with self._lock:
+            return {kind: stats.as_dict() for kind, stats in self._stats.items()}
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the worker threads."""
+        for executor in self._executors.values():
+            executor.shutdown(wait=wait)
+
+
+# Global vector store instance, opened on first use
+vector_store: VectorStore = LazyProxy(VectorStore, "vector_store")
+
+# Async facade over the global store for callers on the event loop
+async_vector_store = AsyncVectorStore(vector_store)
@@ -60,10 +60,19 @@ async def global_exception_handler(request, exc):
 @app.get("/health")
 async def health_check():
     """Health check endpoint."""
+    from vector_store import async_vector_store, vector_store
+    from embeddings import embedder
+    from expansion_cache import expansion_cache
+
     return {
         "status": "healthy",
         "service": "Agentic Content Creation API",
-        "version": "1.0.0"
+        "version": "1.0.0",
+        # Queue depth of the vector store worker pools used by running jobs
+        "vector_store": async_vector_store.stats(),
+        "query_embeddings": embedder.cache_stats(),
+        "retrieval_results": vector_store.result_cache.stats() if vector_store.is_initialized else None,
+        "query_expansions": expansion_cache.stats() if expansion_cache.is_initialized else None
     }
 
 
@@ -3,6 +3,7 @@
 import logging
 import asyncio
 import uuid
+from functools import partial
 from typing import Optional, Dict, Any
 from datetime import datetime
 from pathlib import Path
@@ -15,6 +16,7 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 
 from agent.orchestrator import BlogGenerationOrchestrator
 from agent.models import GenerationSpec
+from llm_scheduler import Priority, request_priority
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -59,6 +61,7 @@ class JobStatus(BaseModel):
     completed_at: Optional[str] = None
     result: Optional[Dict[str, Any]] = None
     error: Optional[str] = None
+    usage: Optional[Dict[str, Any]] = None
     logs: list[LogEntry] = []
 
 
@@ -89,9 +92,16 @@ async def generate_content_task(job_id: str, request: GenerateRequest):
         generation_jobs[job_id]["progress"] = 50
         await broadcast_update(job_id, "Composing content...")
         
-        # Generate content (orchestrator expects topic and spec_data dict)
-        workflow_result = await orchestrator.generate_blog_post(request.topic, spec_data)
+        # Generate content (orchestrator expects topic and spec_data dict).
+        # A user is waiting on this job, so its LLM calls go ahead of batch runs.
+        with request_priority(Priority.INTERACTIVE):
+            workflow_result = await orchestrator.generate_blog_post(
+                request.topic, spec_data, on_delta=partial(stream_delta, job_id)
+            )
         
+        # Keep token accounting even when the workflow fails
+        generation_jobs[job_id]["usage"] = workflow_result.usage
+
         if not workflow_result.success:
             raise Exception(workflow_result.error or "Generation failed")
         
@@ -107,7 +117,8 @@ async def generate_content_task(job_id: str, request: GenerateRequest):
             "word_count": final_content.get("word_count"),
             "file_path": workflow_result.file_path,
             "seo_score": final_content.get("seo_score"),
-            "iterations": workflow_result.iterations
+            "iterations": workflow_result.iterations,
+            "usage": workflow_result.usage
         }
         
         await broadcast_update(job_id, f"✓ Content generated successfully: {final_content.get('title')}")
@@ -146,6 +157,23 @@ async def broadcast_update(job_id: str, message: str):
         generation_jobs[job_id].setdefault("logs", []).append(log_entry)
 
 
+async def stream_delta(job_id: str, phase: str, iteration: int, delta: str):
+    """Forward a chunk of a streamed draft to the job's WebSocket client, if connected."""
+    websocket = active_connections.get(job_id)
+    if websocket is None:
+        return
+    try:
+        await websocket.send_json({
+            "type": "delta",
+            "job_id": job_id,
+            "phase": phase,
+            "iteration": iteration,
+            "delta": delta
+        })
+    except Exception as e:
+        logger.debug(f"Error streaming delta to {job_id}: {e}")
+
+
 @router.post("/", response_model=GenerateResponse)
 async def generate_blog(request: GenerateRequest, background_tasks: BackgroundTasks):
     """
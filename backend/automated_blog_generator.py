@@ -19,10 +19,11 @@ Usage:
 
 import asyncio
 import sys
+import hashlib
 import logging
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import aiohttp
 import feedparser
 import yaml
@@ -43,12 +44,17 @@ if str(current_dir) not in sys.path:  # for run_agentic_blog.py
     sys.path.insert(0, str(current_dir))
 
 from agent.orchestrator import BlogGenerationOrchestrator
-from agent.llm_client import OpenAIClient
+# Import through the agent path so the topic generator shares the agents' request scheduler
+from llm_client import OpenAIClient
+from llm_scheduler import Priority, request_priority
+# Same for the vector store worker pools and the embedding model shared with retrieval
+from vector_store import async_vector_store
+from embeddings import embedder
+from expansion_cache import expansion_cache
+from near_duplicates import NearDuplicateIndex
 from agent.config import config
-from agent.vector_store import vector_store
 from agent.models import DocumentChunk
 from agent.utils.parser import chunk_content, clean_markdown
-from sentence_transformers import SentenceTransformer
 
 # Setup logging
 logging.basicConfig(
@@ -77,7 +83,19 @@ class RSSIngestor:
 
     def __init__(self):
         self.logger = logger
-        self.embed_model = SentenceTransformer(config.embedding_model)
+        self.embedder = embedder
+        # Load the model now so a missing model fails before any feeds are fetched
+        self.embedder.model
+        self.near_duplicates = self._open_near_duplicate_index()
+
+    def _open_near_duplicate_index(self) -> Optional[NearDuplicateIndex]:
+        """Index of stored RSS chunk signatures, tied to the current collection."""
+        if not config.near_duplicate_enabled:
+            return None
+        collection = async_vector_store.store.collection
+        if collection is None:
+            return None
+        return NearDuplicateIndex(namespace=str(collection.id), exists=async_vector_store.store.existing_ids)
 
     async def ingest_articles(self, articles: List[ArticleData]) -> Dict[str, Any]:
         """Ingest RSS articles into the vector database for retrieval."""
@@ -89,7 +107,6 @@ class RSSIngestor:
         processed_texts = []
         processed_metadata = []
         processed_ids = []
-        total_chunks = 0
 
         for i, article in enumerate(articles):
             try:
@@ -107,11 +124,11 @@ class RSSIngestor:
                     self.logger.warning(f"No chunks generated for article: {article.title}")
                     continue
 
-                # Generate embeddings for this article's chunks
-                embeddings = self.embed_model.encode(chunks, show_progress_bar=False)
+                # Ids derive from the article URL so the same article keeps its ids across runs
+                article_key = hashlib.md5((article.url or article.title).encode("utf-8")).hexdigest()[:16]
 
-                # Process each chunk
-                for j, (chunk, embedding) in enumerate(zip(chunks, embeddings)):
+                # Process each chunk (embedded together with all articles below)
+                for j, chunk in enumerate(chunks):
                     metadata = {
                         "source_type": "rss_feed",
                         "source_file": f"rss_{i}_{article.source.replace(' ', '_')}",
@@ -129,40 +146,75 @@ class RSSIngestor:
 
                     processed_texts.append(chunk)
                     processed_metadata.append(metadata)
-                    processed_ids.append(f"rss_{i}_chunk_{j}")
+                    processed_ids.append(f"rss_{article_key}_chunk_{j}")
 
-                total_chunks += len(chunks)
                 self.logger.info(f"Processed article {i+1}/{len(articles)}: {article.title} ({len(chunks)} chunks)")
 
             except Exception as e:
                 self.logger.error(f"Failed to process article {article.title}: {e}")
                 continue
 
+        dedup_report = {"duplicates_skipped": 0, "duplicate_articles": 0}
+        if processed_texts and self.near_duplicates is not None:
+            # Drop copies of stored chunks (or of chunks earlier in this run) before embedding them
+            matches = await asyncio.to_thread(self.near_duplicates.check, processed_ids, processed_texts)
+            kept = [i for i, match in enumerate(matches) if match is None]
+            unique_titles = {processed_metadata[i]["url"] or processed_metadata[i]["title"] for i in kept}
+            all_titles = {metadata["url"] or metadata["title"] for metadata in processed_metadata}
+            dedup_report = {
+                "duplicates_skipped": len(processed_texts) - len(kept),
+                "duplicate_articles": len(all_titles - unique_titles),
+            }
+            self.logger.info(
+                f"Near-duplicate check: skipped {dedup_report['duplicates_skipped']}/{len(processed_texts)} chunks, "
+                f"{dedup_report['duplicate_articles']} articles entirely"
+            )
+            processed_texts = [processed_texts[i] for i in kept]
+            processed_metadata = [processed_metadata[i] for i in kept]
+            processed_ids = [processed_ids[i] for i in kept]
+
+            if not processed_texts:
+                # Nothing to store, but keep the duplicate links
+                await asyncio.to_thread(self.near_duplicates.commit)
+                return {
+                    "success": True,
+                    "articles_ingested": len(articles),
+                    "chunks_created": 0,
+                    **dedup_report,
+                    "timestamp": datetime.now().isoformat()
+                }
+
         # Store all chunks in vector database if there are any
         if processed_texts:
             try:
                 self.logger.info(f"Storing {len(processed_texts)} chunks in vector database...")
 
                 # Generate embeddings for all texts at once
-                batch_embeddings = self.embed_model.encode(processed_texts, show_progress_bar=False)
+                # Encoding is CPU-bound, so keep it off the event loop
+                batch_embeddings = await asyncio.to_thread(self.embedder.embed_documents, processed_texts)
 
-                vector_store.add_documents(
+                await async_vector_store.add_documents(
                     texts=processed_texts,
                     embeddings=batch_embeddings,
                     metadata=processed_metadata,
                     ids=processed_ids
                 )
+                if self.near_duplicates is not None:
+                    await asyncio.to_thread(self.near_duplicates.commit)
 
-                self.logger.info(f"Successfully ingested {total_chunks} chunks from {len(articles)} RSS articles")
+                self.logger.info(f"Successfully ingested {len(processed_texts)} chunks from {len(articles)} RSS articles")
 
                 return {
                     "success": True,
                     "articles_ingested": len(articles),
-                    "chunks_created": total_chunks,
+                    "chunks_created": len(processed_texts),
+                    **dedup_report,
                     "timestamp": datetime.now().isoformat()
                 }
 
             except Exception as e:
+                if self.near_duplicates is not None:
+                    self.near_duplicates.rollback()
                 self.logger.error(f"Failed to store RSS articles: {e}")
                 return {"error": f"Storage failed: {e}"}
         else:
@@ -309,7 +361,8 @@ Vui lòng phản hồi với:
             result = await self.llm_client.generate(
                 prompt,
                 system_prompt="Bạn là một chiến lược gia chủ đề blog sáng tạo, người tìm kết nối trong tin tức và tạo các lời nhắc viết hấp dẫn.",
-                temperature=0.7
+                temperature=0.7,
+                route="topic_generator"
             )
             return result if result else "News Summary and Blog Topic"
         except Exception as e:
@@ -359,6 +412,9 @@ class AutomatedBlogGenerator:
                 return False
 
             print(f"✅ Ingested {ingestion_result['articles_ingested']} articles ({ingestion_result['chunks_created']} chunks)")
+            if ingestion_result.get("duplicates_skipped"):
+                print(f"   Skipped {ingestion_result['duplicates_skipped']} near-duplicate chunks "
+                      f"({ingestion_result['duplicate_articles']} articles already in the knowledge base)")
 
             # Step 3: Generate initial blog topic
             print("\n🎯 Step 3: Generating blog topic from RSS content...")
@@ -376,7 +432,9 @@ class AutomatedBlogGenerator:
                 'min_words': 1500,
                 'max_words': 5000,  # Increased maximum word count for unlimited generation
                 'categories': ['News', 'Analysis', 'Current Events'],
-                'tags': ['news', 'trends', 'analysis', 'rss', 'synthesis']
+                'tags': ['news', 'trends', 'analysis', 'rss', 'synthesis'],
+                # Retrieve from recent coverage only, not the whole archive
+                'context_max_age_days': config.news_context_max_age_days or None
             }
 
             print(f"📝 Generating blog post on: {blog_topic_prompt[:80]}...")
@@ -389,6 +447,8 @@ class AutomatedBlogGenerator:
                 print("🎉 SUCCESS: Blog post generated and saved!")
                 print(f"� File: {result.file_path}")
                 print(f"�🔄 Iterations: {result.iterations}")
+                if result.usage:
+                    print(f"🔢 LLM tokens: {result.usage['prompt_tokens']} prompt + {result.usage['completion_tokens']} completion over {result.usage['calls']} calls")
 
                 # The ingestor agent automatically adds the new blog post back to the knowledge base
                 print("♻️  Final blog post ingested back into knowledge base for future reference")
@@ -401,6 +461,15 @@ class AutomatedBlogGenerator:
                 print(f"   • This newly generated blog post")
                 print("   → Future generations can reference all this enriched context!")
 
+                cache_stats = self.orchestrator.retriever.llm_client.cache_stats()
+                if cache_stats.get("enabled"):
+                    print(f"🗄️  LLM response cache: {cache_stats['hits']} hits, {cache_stats['misses']} misses")
+                if config.expansion_cache_enabled:
+                    expansion_stats = expansion_cache.stats()
+                    print(f"🔎 Query expansion cache: {expansion_stats['exact_hits']} exact + "
+                          f"{expansion_stats['semantic_hits']} similar hits, {expansion_stats['misses']} misses "
+                          f"({expansion_stats['hit_rate']:.0%} hit rate)")
+
                 return True
             else:
                 print(f"❌ Blog generation failed: {result.error}")
@@ -420,7 +489,9 @@ async def main():
 
     generator = AutomatedBlogGenerator()
 
-    success = await generator.run_automated_pipeline()
+    # Nightly runs yield to interactive API jobs sharing the same rate limits
+    with request_priority(Priority.BATCH):
+        success = await generator.run_automated_pipeline()
 
     if success:
         print("\n🎉 Automation pipeline completed successfully!")
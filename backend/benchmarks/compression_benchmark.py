@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Prompt size and term retention of sentence compression on ``datas/``.
+
+For each article title the script runs the retrieval steps of
+``retrieve_relevant_context`` without the LLM (the title and three
+variants from ``retrieval_benchmark.query_variations`` stand in for the
+expansion), then compresses the selected chunks with
+``compression.compress_documents`` at several thresholds and packs them
+into the retriever synthesis budget (2000 tokens) like
+``RetrieverAgent`` does. It reports, per threshold:
+
+- chunk tokens before and after compression, and the ratio
+- tokens of the packed context window that reaches the prompt
+- term recall: share of the title words found in the uncompressed
+  chunks that are still in the compressed ones
+- compression time (one sentence embedding pass per topic)
+
+Usage:
+    python benchmarks/compression_benchmark.py
+    python benchmarks/compression_benchmark.py --thresholds 0.2 0.35 0.5 --neighbours 1
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+from retrieval_benchmark import load_embedder, percentile, query_variations
+from hybrid_search_benchmark import build_store
+
+
+def main() -> None:
+    from config import config
+    from retrieval import _merge_results, _rerank_results
+    from diversity import diversify_results
+    from compression import compress_documents
+    from context_packing import pack_context
+    from sparse_index import tokenize
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--thresholds", type=float, nargs="+", default=[0.2, 0.35, 0.5])
+    parser.add_argument("--neighbours", type=int, default=config.compression_neighbours)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--budget", type=int, default=2000, help="Context window tokens")
+    args = parser.parse_args()
+
+    model = config.llm_routes["retriever_synthesis"].model or config.openai_model
+    embedder, label = load_embedder()
+    print(f"Embeddings: {label}")
+    store, articles = build_store(Path(tempfile.mkdtemp(prefix="compression_benchmark_")), embedder)
+
+    topics = []
+    for title, _ in articles:
+        queries = query_variations(title)
+        results = _merge_results(store.similarity_search_batch(
+            queries, top_k=args.top_k * config.mmr_fetch_multiplier, include_embeddings=True
+        ))
+        selected = diversify_results(_rerank_results(results, title), args.top_k)
+        topics.append((title, queries, selected))
+
+    baseline_window = statistics.mean(pack_context(docs, args.budget, model).tokens for _, _, docs in topics)
+    print(f"\n{len(topics)} topics, top {args.top_k} chunks, {args.neighbours} neighbour(s), "
+          f"uncompressed context window {baseline_window:.0f} tokens")
+    print(f"{'threshold':>9} {'chunk tokens':>16} {'ratio':>6} {'window':>7} {'term recall':>12} {'p50 ms':>8}")
+    for threshold in args.thresholds:
+        before, after, windows, recalls, timings = [], [], [], [], []
+        for title, queries, docs in topics:
+            started = time.perf_counter()
+            result = compress_documents(queries, docs, threshold=threshold, neighbours=args.neighbours,
+                                        model=model, embedder=embedder)
+            timings.append(time.perf_counter() - started)
+            before.append(result.tokens)
+            after.append(result.compressed_tokens)
+            windows.append(pack_context(result.documents, args.budget, model).tokens)
+
+            title_terms = set(tokenize(title))
+            original = title_terms & set(tokenize(" ".join(d.page_content for d in docs)))
+            kept = title_terms & set(tokenize(" ".join(d.page_content for d in result.documents)))
+            if original:
+                recalls.append(len(kept) / len(original))
+
+        print(f"{threshold:>9.2f} {statistics.mean(before):>7.0f} -> {statistics.mean(after):>5.0f} "
+              f"{sum(after) / sum(before):>6.2f} {statistics.mean(windows):>7.0f} "
+              f"{statistics.mean(recalls):>11.1%} {percentile(timings, 50) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
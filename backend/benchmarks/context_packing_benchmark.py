@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Context window size and packing time on the ``datas/`` corpus.
+
+For each article title the script retrieves candidates (dense search, then
+``_rerank_results``) and assembles them two ways within the same budget:
+
+- heuristic: the previous 4-characters-per-token greedy assembly
+- packed:    ``context_packing.pack_context`` (real token counts, knapsack)
+
+and reports, per budget, the mean tokens actually sent, how often each
+exceeded the budget, the mean total score of the chunks included, and the
+packing time. Token counts use tiktoken when its encoding is available,
+otherwise the tokenizer's heuristic (the report says which).
+
+Usage:
+    python benchmarks/context_packing_benchmark.py
+    python benchmarks/context_packing_benchmark.py --budgets 1000 2000 3000 --top-k 10
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+from retrieval_benchmark import load_embedder, percentile
+from hybrid_search_benchmark import build_store
+
+
+def main() -> None:
+    from config import config
+    from retrieval import _merge_results, _rerank_results
+    from context_packing import heuristic_context, pack_context, _value
+    from tokenizer import _get_encoding, count_tokens
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--budgets", type=int, nargs="+", default=[1000, 2000, 3000])
+    parser.add_argument("--top-k", type=int, default=10, help="Chunks retrieved per topic")
+    args = parser.parse_args()
+
+    model = config.llm_routes["retriever_synthesis"].model or config.openai_model
+    counting = "tiktoken" if _get_encoding(model) is not None else "heuristic (tiktoken encoding unavailable)"
+    embedder, label = load_embedder()
+    print(f"Embeddings: {label}\nToken counts: {counting}, model {model}")
+    store, articles = build_store(Path(tempfile.mkdtemp(prefix="context_packing_benchmark_")), embedder)
+
+    candidate_sets = []
+    for title, _ in articles:
+        results = _merge_results(store.similarity_search_batch([title], top_k=args.top_k))
+        candidate_sets.append(_rerank_results(results, title))
+
+    print(f"\n{'budget':>6} {'method':<10} {'tokens':>8} {'over budget':>12} {'score':>7} {'p50 ms':>8}")
+    for budget in args.budgets:
+        heuristic_tokens, heuristic_over, heuristic_scores = [], 0, []
+        packed_tokens, packed_over, packed_scores, timings = [], 0, [], []
+        for results in candidate_sets:
+            text = heuristic_context(results, budget)
+            tokens = count_tokens(text, model)
+            heuristic_tokens.append(tokens)
+            heuristic_over += tokens > budget
+            heuristic_scores.append(sum(_value(doc) for doc in results if doc.page_content.strip() in text))
+
+            started = time.perf_counter()
+            packed = pack_context(results, budget, model)
+            timings.append(time.perf_counter() - started)
+            packed_tokens.append(packed.tokens)
+            packed_over += packed.tokens > budget
+            packed_scores.append(sum(_value(doc) for doc in packed.documents))
+
+        n = len(candidate_sets)
+        print(f"{budget:>6} {'heuristic':<10} {statistics.mean(heuristic_tokens):>8.0f} {heuristic_over / n:>11.0%} "
+              f"{statistics.mean(heuristic_scores):>7.2f}")
+        print(f"{budget:>6} {'packed':<10} {statistics.mean(packed_tokens):>8.0f} {packed_over / n:>11.0%} "
+              f"{statistics.mean(packed_scores):>7.2f} {percentile(timings, 50) * 1000:>8.2f}")
+        saved = sum(heuristic_tokens) - sum(packed_tokens)
+        print(f"{'':>6} saved {saved:+d} prompt tokens over {n} windows")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Ranking quality and latency of the cross-encoder stage on ``datas/``.
+
+Labelled queries come from the sample articles: each article's title and
+its three rarest words (see ``hybrid_search_benchmark.py``); the relevant
+chunks of a query are the chunks of its article. For each query the
+retrieval steps of ``retrieve_relevant_context`` run without expansion
+(dense search for ``top_k * mmr_fetch_multiplier`` candidates, then
+``_rerank_results``), and the script compares:
+
+- baseline:      the reranked order
+- cross-encoder: ``CrossEncoderReranker.rerank`` over the top N
+
+reporting hit rate and MRR at k, stage latency percentiles, how often the
+budget forced a fallback, and the score cache hit rate of a second pass.
+
+The cross-encoder is the configured model when it is available locally.
+Otherwise a lexical pair scorer stands in (it reads query and chunk
+together, like a cross-encoder, but is far weaker) and the report says so;
+``--pair-cost-ms`` adds simulated per-pair inference time to exercise the
+budget.
+
+Usage:
+    python benchmarks/cross_encoder_benchmark.py
+    python benchmarks/cross_encoder_benchmark.py --top-n 20 --budget 0.5 --pair-cost-ms 5
+"""
+
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+import numpy as np
+
+from retrieval_benchmark import load_embedder, percentile
+from hybrid_search_benchmark import build_store, lexical_queries
+
+
+class LexicalPairScorer:
+    """Stand-in cross-encoder: BM25-style overlap of query and chunk tokens, with optional simulated cost."""
+
+    def __init__(self, pair_cost: float = 0.0):
+        self.pair_cost = pair_cost
+
+    def predict(self, pairs: List[Tuple[str, str]], **kwargs) -> np.ndarray:
+        from sparse_index import tokenize
+
+        scores = []
+        for query, text in pairs:
+            tokens = tokenize(text)
+            counts: Dict[str, int] = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            norm = 1.2 * (0.25 + 0.75 * len(tokens) / 120)
+            scores.append(sum(counts.get(t, 0) * 2.2 / (counts.get(t, 0) + norm) for t in set(tokenize(query))))
+        if self.pair_cost:
+            time.sleep(self.pair_cost * len(pairs))
+        return np.asarray(scores, dtype=np.float32)
+
+
+def load_reranker(pair_cost: float):
+    from config import config
+    from cross_encoder import CrossEncoderReranker
+
+    try:
+        from sentence_transformers import CrossEncoder
+
+        model = CrossEncoder(config.cross_encoder_model, max_length=config.cross_encoder_max_length,
+                             device="cpu", local_files_only=True)
+        return CrossEncoderReranker(model=model), config.cross_encoder_model
+    except Exception as e:
+        label = f"lexical stand-in ({config.cross_encoder_model} unavailable: {e.__class__.__name__})"
+        return CrossEncoderReranker(model=LexicalPairScorer(pair_cost)), label
+
+
+def first_hit(results, title: str) -> int:
+    return next((i for i, doc in enumerate(results, start=1) if doc.metadata.get("title") == title), 0)
+
+
+async def run(store, reranker, queries, top_k: int, top_n: int, budget: float) -> Dict[str, Dict[str, float]]:
+    from config import config
+    from retrieval import _merge_results, _rerank_results
+
+    ranks: Dict[str, List[int]] = {"baseline": [], "cross-encoder": []}
+    timings, fallbacks = [], 0
+    for query, title in queries:
+        results = _merge_results(store.similarity_search_batch([query], top_k=top_k * config.mmr_fetch_multiplier))
+        baseline = _rerank_results(results, query)
+        ranks["baseline"].append(first_hit(baseline[:top_k], title))
+
+        started = time.perf_counter()
+        reranked, applied = await reranker.rerank(query, list(baseline), top_n=top_n, budget=budget)
+        timings.append(time.perf_counter() - started)
+        fallbacks += not applied
+        ranks["cross-encoder"].append(first_hit(reranked[:top_k], title))
+
+    report = {
+        name: {
+            "hit_rate": sum(1 for r in values if r) / len(values),
+            "mrr": statistics.mean(1.0 / r if r else 0.0 for r in values),
+        }
+        for name, values in ranks.items()
+    }
+    report["cross-encoder"].update(
+        p50=percentile(timings, 50), p95=percentile(timings, 95), fallbacks=fallbacks / len(queries)
+    )
+    return report
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--top-n", type=int, default=20, help="Candidates sent to the cross-encoder")
+    parser.add_argument("--budget", type=float, default=0.5, help="Latency budget in seconds")
+    parser.add_argument("--pair-cost-ms", type=float, default=0.0, help="Simulated cost per pair (stand-in only)")
+    args = parser.parse_args()
+
+    embedder, label = load_embedder()
+    reranker, reranker_label = load_reranker(args.pair_cost_ms / 1000)
+    print(f"Embeddings: {label}\nCross-encoder: {reranker_label}")
+    store, articles = build_store(Path(tempfile.mkdtemp(prefix="cross_encoder_benchmark_")), embedder)
+
+    query_sets = {
+        "title": [(title, title) for title, _ in articles],
+        "lexical": lexical_queries(articles),
+    }
+    for set_name, queries in query_sets.items():
+        report = asyncio.run(run(store, reranker, queries, args.top_k, args.top_n, args.budget))
+        print(f"\n{set_name} queries ({len(queries)}), top {args.top_k}, cross-encoder over top {args.top_n}")
+        for name, values in report.items():
+            line = f"  {name:<14} hit rate {values['hit_rate']:6.1%}   MRR {values['mrr']:.3f}"
+            if "p50" in values:
+                line += (f"   p50 {values['p50'] * 1000:7.2f} ms   p95 {values['p95'] * 1000:7.2f} ms"
+                         f"   fallbacks {values['fallbacks']:.0%}")
+            print(line)
+
+    # Same queries again: pairs scored before come from the score cache
+    hits, misses = reranker.hits, reranker.misses
+    report = asyncio.run(run(store, reranker, query_sets["title"], args.top_k, args.top_n, args.budget))
+    repeated_hits, repeated_misses = reranker.hits - hits, reranker.misses - misses
+    print(f"\nRepeated title pass: score cache hit rate {repeated_hits / (repeated_hits + repeated_misses):.1%}, "
+          f"p50 {report['cross-encoder']['p50'] * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
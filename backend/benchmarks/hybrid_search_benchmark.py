@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Hybrid search latency and recall on the ``datas/`` corpus.
+
+Indexes the sample articles into a scratch Chroma collection (which also
+builds the BM25 index) and compares two ``hybrid_search`` strategies:
+
+- keyword boost: semantic top 2k re-scored by keyword substring matches
+  (the previous behaviour, still used when the sparse index is disabled)
+- bm25 + rrf:    dense and BM25 searches fused by reciprocal rank fusion
+
+Two query sets are used per article: its title (a semantic query) and its
+three rarest words (a lexical query, like a model number or product name
+a user remembers). A query hits when any chunk of its article is in the
+top k; the report gives hit rate, mean reciprocal rank and latency.
+
+Embeddings come from the configured sentence-transformers model when it is
+available locally, otherwise from a hashing model (see
+``retrieval_benchmark.py``).
+
+Usage:
+    python benchmarks/hybrid_search_benchmark.py
+    python benchmarks/hybrid_search_benchmark.py --top-k 5 --rounds 3
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+from retrieval_benchmark import load_embedder, percentile
+
+
+def build_store(workdir: Path, embedder: object):
+    """Index the datas/ articles; returns the store and (title, text) per article."""
+    import frontmatter
+    from vector_store import VectorStore
+    from utils.parser import chunk_content
+
+    store = VectorStore(collection_name="hybrid_benchmark", persist_directory=str(workdir), embedder=embedder)
+
+    articles, texts, metadata = [], [], []
+    for path in sorted((BACKEND_DIR / "datas").glob("*.md")):
+        post = frontmatter.load(path)
+        title = str(post.get("title", path.stem))
+        articles.append((title, post.content))
+        for index, chunk in enumerate(chunk_content(post.content)):
+            texts.append(chunk)
+            metadata.append({"title": title, "source_file": path.name, "chunk_index": index})
+
+    ids = [f"chunk-{i}" for i in range(len(texts))]
+    started = time.perf_counter()
+    store.add_documents(texts, embedder.embed_documents(texts), metadata, ids)
+    print(f"Indexed {len(texts)} chunks in {time.perf_counter() - started:.2f} s (embedding included)")
+    return store, articles
+
+
+def lexical_queries(articles: List[Tuple[str, str]]) -> List[Tuple[str, str]]:
+    """(query, title) pairs made of the three rarest words of each article."""
+    from sparse_index import tokenize
+
+    document_frequency = Counter()
+    article_tokens = []
+    for _, text in articles:
+        tokens = set(t for t in tokenize(text) if len(t) >= 3)
+        article_tokens.append(tokens)
+        document_frequency.update(tokens)
+
+    queries = []
+    for (title, _), tokens in zip(articles, article_tokens):
+        rare = sorted(tokens, key=lambda t: (document_frequency[t], t))[:3]
+        if rare:
+            queries.append((" ".join(rare), title))
+    return queries
+
+
+def evaluate(search, queries: List[Tuple[str, str]], top_k: int, rounds: int) -> Dict[str, float]:
+    timings, hits, reciprocal_ranks = [], 0, []
+    for query, title in queries:
+        keywords = query.split()
+        search(query, keywords, top_k)  # warm-up
+        for _ in range(rounds):
+            started = time.perf_counter()
+            results = search(query, keywords, top_k)
+            timings.append(time.perf_counter() - started)
+        rank = next((i for i, doc in enumerate(results, start=1) if doc.metadata.get("title") == title), None)
+        hits += rank is not None
+        reciprocal_ranks.append(1.0 / rank if rank else 0.0)
+    return {
+        "hit_rate": hits / len(queries),
+        "mrr": statistics.mean(reciprocal_ranks),
+        "p50": percentile(timings, 50),
+        "p95": percentile(timings, 95),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs per query and strategy")
+    args = parser.parse_args()
+
+    embedder, label = load_embedder()
+    print(f"Embeddings: {label}")
+    store, articles = build_store(Path(tempfile.mkdtemp(prefix="hybrid_benchmark_")), embedder)
+    print(f"Sparse index: {store.sparse_index.stats()}")
+
+    query_sets = {
+        "title": [(title, title) for title, _ in articles],
+        "lexical": lexical_queries(articles),
+    }
+    strategies = {
+        "keyword boost": lambda q, kw, k: store._keyword_boosted_search(q, kw, k, None),
+        "bm25 + rrf": lambda q, kw, k: store.hybrid_search(q, kw, top_k=k),
+    }
+
+    for set_name, queries in query_sets.items():
+        print(f"\n{set_name} queries ({len(queries)}), top {args.top_k}")
+        for name, search in strategies.items():
+            report = evaluate(search, queries, args.top_k, args.rounds)
+            print(f"  {name:<14} hit rate {report['hit_rate']:6.1%}   MRR {report['mrr']:.3f}   "
+                  f"p50 {report['p50'] * 1000:7.2f} ms   p95 {report['p95'] * 1000:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
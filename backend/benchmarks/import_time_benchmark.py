@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check for the CLI.
+
+Imports ``agent.cli`` in fresh interpreters (without an OpenAI API key, like a
+host that only runs ``agent stats``) and exits non-zero if the median import
+time exceeds the budget. Use ``--profile`` to list the slowest modules from
+``python -X importtime``.
+
+Usage:
+    python benchmarks/import_time_benchmark.py
+    python benchmarks/import_time_benchmark.py --budget 1.0 --runs 7 --profile
+"""
+
+import os
+import sys
+import argparse
+import statistics
+import subprocess
+from pathlib import Path
+from typing import List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+
+MEASURE_SNIPPET = (
+    "import time; started = time.perf_counter(); import {module}; "
+    "print(time.perf_counter() - started)"
+)
+
+# Modules that must not be imported just to load the CLI
+HEAVY_MODULES = ["openai", "chromadb", "sentence_transformers", "torch"]
+
+
+def clean_env() -> dict:
+    """Environment for the child interpreter, without credentials."""
+    env = dict(os.environ)
+    env.pop("OPENAI_API_KEY", None)
+    env.pop("AGENT_OPENAI_API_KEY", None)
+    return env
+
+
+def measure(module: str) -> float:
+    """Import ``module`` in a fresh interpreter and return the seconds it took."""
+    result = subprocess.run(
+        [sys.executable, "-c", MEASURE_SNIPPET.format(module=module)],
+        cwd=BACKEND_DIR,
+        env=clean_env(),
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr.strip()}")
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def loaded_heavy_modules(module: str) -> List[str]:
+    """Heavy dependencies that importing ``module`` pulls in."""
+    snippet = f"import sys; import {module}; print(','.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    result = subprocess.run(
+        [sys.executable, "-c", snippet],
+        cwd=BACKEND_DIR,
+        env=clean_env(),
+        capture_output=True,
+        text=True,
+    )
+    output = result.stdout.strip()
+    return [name for name in output.split(",") if name]
+
+
+def slowest_imports(module: str, limit: int) -> List[Tuple[int, str]]:
+    """Parse ``-X importtime`` output into (cumulative microseconds, module) pairs."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        env=clean_env(),
+        capture_output=True,
+        text=True,
+    )
+    timings = []
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        timings.append((int(cumulative), name.rstrip()))
+    timings.sort(reverse=True)
+    return timings[:limit]
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--module", default="agent.cli", help="Module to import")
+    parser.add_argument("--budget", type=float, default=1.5, help="Maximum median import time in seconds")
+    parser.add_argument("--runs", type=int, default=5, help="Number of fresh interpreters to time")
+    parser.add_argument("--profile", action="store_true", help="Show the slowest imports")
+    args = parser.parse_args()
+
+    # One warm-up run so the first measurement does not include cold disk reads
+    measure(args.module)
+    timings = [measure(args.module) for _ in range(args.runs)]
+    median = statistics.median(timings)
+
+    print(f"import {args.module}: median {median:.3f}s, min {min(timings):.3f}s, max {max(timings):.3f}s "
+          f"over {args.runs} runs (budget {args.budget:.3f}s)")
+
+    heavy = loaded_heavy_modules(args.module)
+    if heavy:
+        print(f"Heavy modules imported eagerly: {', '.join(heavy)}")
+
+    if args.profile:
+        print("\nSlowest imports (cumulative):")
+        for micros, name in slowest_imports(args.module, 15):
+            print(f"  {micros / 1000:>8.1f} ms  {name}")
+
+    if median > args.budget:
+        print(f"FAIL: import time exceeds budget by {median - args.budget:.3f}s")
+        return 1
+
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark per-role LLM routing against a single-model setup.
+
+Every agent role is sent the same workload twice through ``OpenAIClient``:
+once with all roles on the default model and ``config.max_tokens``, and once
+with the routes from ``config.llm_routes``. Requests are answered by an
+in-process fake of the OpenAI API whose latency and output length depend on
+the model and the role, so no API key or network access is needed.
+
+Usage:
+    python benchmarks/llm_routes_benchmark.py
+    python benchmarks/llm_routes_benchmark.py --requests 10 --time-scale 0.05
+"""
+
+import sys
+import json
+import time
+import asyncio
+import argparse
+from pathlib import Path
+from typing import Dict, Tuple
+
+import httpx
+from openai import AsyncOpenAI
+
+# Add backend and agent directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "agent"))
+
+from agent.config import config, LLMRoute
+from agent.llm_client import OpenAIClient
+from agent.llm_scheduler import RequestScheduler
+
+# USD per 1M tokens (input, output)
+PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (2.00, 8.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1-nano": (0.10, 0.40),
+}
+
+# Simulated speed: (seconds to first token, output tokens per second)
+SPEEDS: Dict[str, Tuple[float, float]] = {
+    "gpt-4.1": (0.8, 60.0),
+    "gpt-4.1-mini": (0.4, 110.0),
+    "gpt-4.1-nano": (0.25, 180.0),
+}
+
+# Typical prompt size and natural answer length of each role, in tokens
+WORKLOAD: Dict[str, Tuple[int, int]] = {
+    "expansion": (300, 60),
+    "retriever_synthesis": (2500, 600),
+    "researcher": (2500, 800),
+    "composer": (3000, 2500),
+    "refiner": (5000, 2500),
+    "evaluator": (4000, 300),
+    "topic_generator": (3000, 700),
+}
+
+
+def make_transport(time_scale: float) -> httpx.MockTransport:
+    """Build a fake chat completions endpoint with model-dependent latency."""
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        body = json.loads(request.content)
+        model = body["model"]
+        role = body["messages"][0]["content"].split(":", 1)[1]
+        prompt_tokens, natural_tokens = WORKLOAD[role]
+        completion_tokens = min(natural_tokens, body.get("max_tokens") or natural_tokens)
+
+        ttft, tokens_per_second = SPEEDS.get(model, SPEEDS["gpt-4.1"])
+        await asyncio.sleep((ttft + completion_tokens / tokens_per_second) * time_scale)
+
+        return httpx.Response(200, json={
+            "id": "chatcmpl-benchmark",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": "token " * completion_tokens},
+                "finish_reason": "length" if completion_tokens < natural_tokens else "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            },
+        })
+
+    return httpx.MockTransport(handler)
+
+
+def cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    input_price, output_price = PRICES.get(model, PRICES["gpt-4.1"])
+    return (prompt_tokens * input_price + completion_tokens * output_price) / 1_000_000
+
+
+async def run_routes(client: OpenAIClient, requests: int, time_scale: float) -> Dict[str, Dict[str, float]]:
+    """Send ``requests`` calls per role concurrently and collect per-role results."""
+
+    async def call(role: str):
+        messages = [
+            {"role": "system", "content": f"role:{role}"},
+            {"role": "user", "content": "benchmark"},
+        ]
+        return role, await client.chat_with_usage(messages, temperature=0.0, use_cache=False, route=role)
+
+    responses = await asyncio.gather(*[call(role) for role in WORKLOAD for _ in range(requests)])
+
+    results: Dict[str, Dict[str, float]] = {}
+    for role, response in responses:
+        _, max_tokens, _ = client._resolve_route(role, None)
+        stats = results.setdefault(role, {
+            "model": response.model,
+            "max_tokens": max_tokens,
+            "latency": 0.0,
+            "cost": 0.0,
+            "reserved": 0,
+        })
+        stats["latency"] += response.latency / time_scale / requests
+        stats["cost"] += cost(response.model, response.prompt_tokens, response.completion_tokens)
+        # Tokens the scheduler holds against the TPM budget while the request runs
+        stats["reserved"] += response.prompt_tokens + max_tokens
+    return results
+
+
+def print_results(title: str, results: Dict[str, Dict[str, float]]) -> None:
+    print(f"\n{title}")
+    print(f"  {'role':<20} {'model':<14} {'max_tok':>8} {'latency':>9} {'cost $':>9} {'reserved':>9}")
+    for role, stats in results.items():
+        print(
+            f"  {role:<20} {stats['model']:<14} {stats['max_tokens']:>8} "
+            f"{stats['latency']:>8.2f}s {stats['cost']:>9.4f} {stats['reserved']:>9}"
+        )
+    print(
+        f"  {'total':<20} {'':<14} {'':>8} "
+        f"{sum(s['latency'] for s in results.values()):>8.2f}s "
+        f"{sum(s['cost'] for s in results.values()):>9.4f} "
+        f"{sum(s['reserved'] for s in results.values()):>9}"
+    )
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=5, help="Requests per role")
+    parser.add_argument("--time-scale", type=float, default=0.1,
+                        help="Fraction of simulated latency actually slept")
+    args = parser.parse_args()
+
+    client = OpenAIClient(
+        api_key="benchmark",
+        base_url="http://mock-openai/v1",
+        # Unlimited scheduler so only upstream latency is measured
+        scheduler=RequestScheduler(requests_per_minute=0, tokens_per_minute=0, max_concurrency=0),
+    )
+    client.client = AsyncOpenAI(
+        api_key="benchmark",
+        base_url="http://mock-openai/v1",
+        http_client=httpx.AsyncClient(transport=make_transport(args.time_scale)),
+    )
+
+    routed = dict(config.llm_routes)
+    try:
+        config.llm_routes = {role: LLMRoute() for role in WORKLOAD}
+        single = await run_routes(client, args.requests, args.time_scale)
+    finally:
+        config.llm_routes = routed
+    routed_results = await run_routes(client, args.requests, args.time_scale)
+
+    print(f"Per-role routing benchmark ({args.requests} requests per role, mean latency per request)")
+    print_results(f"Single model ({client.model}, max_tokens={config.max_tokens})", single)
+    print_results("Routed (config.llm_routes)", routed_results)
+
+    single_cost = sum(s["cost"] for s in single.values())
+    routed_cost = sum(s["cost"] for s in routed_results.values())
+    if single_cost:
+        print(f"\nCost reduction: {(1 - routed_cost / single_cost) * 100:.1f}%")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Selection time and redundancy of the MMR stage on synthetic candidates.
+
+Candidates are built as clusters of near-duplicates (a base embedding plus
+small noise, like overlapping chunks or syndicated copies of one article)
+with random relevance scores. For several pool sizes the script reports:
+
+- selection time of ``diversity.mmr_select`` (NumPy) against a pure-Python
+  reference implementation, and whether both pick the same candidates
+- how many distinct clusters the top-k by relevance covers versus MMR
+
+Usage:
+    python benchmarks/mmr_benchmark.py
+    python benchmarks/mmr_benchmark.py --candidates 200 500 1000 --k 10 --lambda 0.7
+"""
+
+import sys
+import time
+import argparse
+import statistics
+from pathlib import Path
+from typing import List, Sequence, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+import numpy as np
+
+
+def make_candidates(n: int, copies: int, dimensions: int, seed: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Clusters of ``copies`` near-identical embeddings, with cluster ids and relevance scores."""
+    rng = np.random.default_rng(seed)
+    clusters = np.arange(n) // copies
+    bases = rng.normal(size=(clusters.max() + 1, dimensions))
+    embeddings = bases[clusters] + rng.normal(scale=0.05, size=(n, dimensions))
+    # Copies of a chunk score alike, so top-k by relevance tends to take the whole cluster
+    relevance = rng.random(clusters.max() + 1)[clusters] + rng.normal(scale=0.01, size=n)
+    return embeddings.astype(np.float32), clusters, relevance
+
+
+def reference_mmr(embeddings: np.ndarray, relevance: Sequence[float], k: int, lambda_mult: float) -> List[int]:
+    """Straightforward loop implementation, used as the baseline."""
+    vectors = [list(map(float, row / (np.linalg.norm(row) or 1.0))) for row in embeddings]
+    low, high = min(relevance), max(relevance)
+    scores = [(r - low) / (high - low) if high > low else 1.0 for r in relevance]
+
+    def cosine(a: List[float], b: List[float]) -> float:
+        return sum(x * y for x, y in zip(a, b))
+
+    selected: List[int] = []
+    remaining = list(range(len(vectors)))
+    while remaining and len(selected) < k:
+        best, best_score = remaining[0], -float("inf")
+        for i in remaining:
+            redundancy = max((cosine(vectors[i], vectors[j]) for j in selected), default=0.0)
+            score = scores[i] if not selected else lambda_mult * scores[i] - (1 - lambda_mult) * redundancy
+            if score > best_score:
+                best, best_score = i, score
+        selected.append(best)
+        remaining.remove(best)
+    return selected
+
+
+def timed(run, rounds: int) -> Tuple[float, object]:
+    timings, result = [], None
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings), result
+
+
+def main() -> None:
+    from diversity import mmr_select
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[100, 300, 600, 1000])
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--lambda", dest="lambda_mult", type=float, default=0.7)
+    parser.add_argument("--copies", type=int, default=4, help="Near-duplicates per cluster")
+    parser.add_argument("--dimensions", type=int, default=384)
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"k={args.k} lambda={args.lambda_mult} copies={args.copies} dimensions={args.dimensions}")
+    print(f"{'candidates':>10} {'numpy ms':>9} {'python ms':>10} {'speedup':>8} {'same':>5} {'top-k clusters':>15} {'MMR clusters':>13}")
+    for n in args.candidates:
+        embeddings, clusters, relevance = make_candidates(n, args.copies, args.dimensions, seed=n)
+
+        fast_time, fast = timed(lambda: mmr_select(embeddings, relevance, args.k, args.lambda_mult), args.rounds)
+        slow_time, slow = timed(lambda: reference_mmr(embeddings, list(relevance), args.k, args.lambda_mult), 1)
+
+        top_k = np.argsort(-relevance)[:args.k]
+        print(f"{n:>10} {fast_time * 1000:>9.3f} {slow_time * 1000:>10.1f} {slow_time / fast_time:>7.0f}x "
+              f"{'yes' if fast == slow else 'no':>5} {len(set(clusters[top_k])):>15} {len(set(clusters[fast])):>13}")
+
+
+if __name__ == "__main__":
+    main()
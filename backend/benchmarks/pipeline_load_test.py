@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Offline load test of the full generation pipeline against the mock OpenAI server.
+
+Starts ``mock_openai_server`` in-process, points the agents at it through
+OPENAI_API_BASE and runs the pipeline with scratch data directories:
+
+1. RSS ingest of the sample articles in ``datas/`` (needs the embedding model
+   in the local Hugging Face cache; skipped with a notice otherwise)
+2. Concurrent ``BlogGenerationOrchestrator`` jobs: retrieval, compose, refine,
+   evaluate and final ingestion
+
+and reports job latency percentiles, throughput, LLM usage, scheduler stats
+and what the mock server saw (429s, errors, stalls).
+
+Usage:
+    python benchmarks/pipeline_load_test.py --jobs 8 --concurrency 4
+    python benchmarks/pipeline_load_test.py --latency lognormal --latency-mean 0.8 \\
+        --tokens-per-second 150 --rate-limit-rate 0.05 --stall-rate 0.02 --stall-seconds 10
+    python benchmarks/pipeline_load_test.py --mode replay --fixtures-dir fixtures/llm
+"""
+
+import os
+import sys
+import time
+import socket
+import asyncio
+import logging
+import argparse
+import tempfile
+import statistics
+import threading
+from pathlib import Path
+from typing import Any, Dict, List
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+import uvicorn
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_mock_server(app, port: int) -> uvicorn.Server:
+    """Run the mock API on a background thread and wait until it accepts connections."""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def configure_environment(port: int, workdir: Path, use_cache: bool) -> None:
+    """Point the agent configuration at the mock server and scratch directories (before import)."""
+    os.environ["OPENAI_API_BASE"] = f"http://127.0.0.1:{port}/v1"
+    os.environ["OPENAI_API_KEY"] = "mock"
+    os.environ["BLOG_DIR"] = str(workdir / "blog")
+    os.environ["VECTOR_DB_DIR"] = str(workdir / "vector_db")
+    os.environ["CACHE_DIR"] = str(workdir / "cache")
+    os.environ["LOGS_DIR"] = str(workdir / "logs")
+    os.environ["LLM_CACHE_ENABLED"] = "true" if use_cache else "false"
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+
+
+def load_articles(limit: int) -> List[Any]:
+    """Turn the markdown samples in datas/ into RSS articles."""
+    import frontmatter
+    from datetime import datetime
+    from automated_blog_generator import ArticleData
+
+    articles = []
+    for path in sorted((BACKEND_DIR / "datas").glob("*.md"))[:limit]:
+        post = frontmatter.load(path)
+        published = post.get("date")
+        articles.append(ArticleData(
+            title=str(post.get("title", path.stem)),
+            content=post.content,
+            url=str(post.get("source_url", "")),
+            source="datas",
+            published=datetime.fromisoformat(str(published)) if published else datetime.now(),
+        ))
+    return articles
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+async def run_ingest(articles: List[Any]) -> Dict[str, Any]:
+    from automated_blog_generator import RSSIngestor
+
+    started = time.perf_counter()
+    try:
+        ingestor = RSSIngestor()
+    except Exception as e:
+        return {"skipped": f"embedding model unavailable ({e.__class__.__name__})"}
+    result = await ingestor.ingest_articles(articles)
+    return {**result, "seconds": time.perf_counter() - started}
+
+
+async def run_jobs(topics: List[str], concurrency: int, spec_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    from agent.orchestrator import BlogGenerationOrchestrator
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def job(topic: str) -> Dict[str, Any]:
+        async with semaphore:
+            started = time.perf_counter()
+            result = await BlogGenerationOrchestrator().generate_blog_post(topic, {**spec_data, "topic": topic})
+            return {
+                "topic": topic,
+                "success": result.success,
+                "error": result.error,
+                "iterations": result.iterations,
+                "seconds": time.perf_counter() - started,
+                "usage": result.usage or {},
+            }
+
+    return await asyncio.gather(*[job(topic) for topic in topics])
+
+
+def report(jobs: List[Dict[str, Any]], wall: float, mock_stats: Dict[str, int], scheduler_stats: Dict[str, Any]) -> None:
+    durations = [j["seconds"] for j in jobs]
+    succeeded = [j for j in jobs if j["success"]]
+
+    print(f"\nJobs: {len(succeeded)}/{len(jobs)} succeeded in {wall:.1f}s "
+          f"({len(jobs) / wall * 60:.1f} jobs/min)")
+    print(f"Job latency: p50 {percentile(durations, 50):.2f}s, p95 {percentile(durations, 95):.2f}s, "
+          f"max {max(durations):.2f}s, mean {statistics.mean(durations):.2f}s")
+
+    calls = sum(j["usage"].get("calls", 0) for j in jobs)
+    prompt_tokens = sum(j["usage"].get("prompt_tokens", 0) for j in jobs)
+    completion_tokens = sum(j["usage"].get("completion_tokens", 0) for j in jobs)
+    print(f"LLM usage: {calls} calls, {prompt_tokens} prompt + {completion_tokens} completion tokens")
+
+    phases: Dict[str, List[float]] = {}
+    for j in jobs:
+        for phase, totals in j["usage"].get("phases", {}).items():
+            phases.setdefault(phase, []).append(totals.get("latency", 0.0))
+    for phase, latencies in phases.items():
+        print(f"  {phase:<12} mean LLM time per job {statistics.mean(latencies):.2f}s")
+
+    print(f"Scheduler: {scheduler_stats}")
+    print(f"Mock server: {mock_stats}")
+
+    for j in jobs:
+        if not j["success"]:
+            print(f"  ✗ {j['topic'][:60]}: {j['error']}")
+
+
+async def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--jobs", type=int, default=4, help="Blog posts to generate")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs running at once")
+    parser.add_argument("--articles", type=int, default=30, help="Sample articles to ingest first")
+    parser.add_argument("--length", choices=["short", "medium", "long"], default="short")
+    parser.add_argument("--skip-ingest", action="store_true")
+    parser.add_argument("--cache", action="store_true", help="Enable the LLM response cache")
+    parser.add_argument("--workdir", type=Path, default=None, help="Scratch directory (default: temporary)")
+    parser.add_argument("--verbose", action="store_true", help="Show agent INFO logs")
+    args, mock_argv = parser.parse_known_args()
+
+    port = free_port()
+    workdir = args.workdir or Path(tempfile.mkdtemp(prefix="pipeline_load_test_"))
+    configure_environment(port, workdir, args.cache)
+
+    # Imported only now because importing agent modules reads the configuration
+    from mock_openai_server import create_app, parse_args as parse_mock_args, settings_from_args
+
+    # Remaining options configure the mock server (see mock_openai_server.py --help)
+    mock_args = parse_mock_args(mock_argv)
+
+    app = create_app(settings_from_args(mock_args))
+    server = start_mock_server(app, port)
+    print(f"Mock server on port {port} ({mock_args.mode} mode), scratch data in {workdir}")
+
+    try:
+        articles = load_articles(args.articles)
+        if not args.verbose:
+            # The pipeline scripts configure INFO logging when imported
+            logging.getLogger().setLevel(logging.WARNING)
+        if args.skip_ingest:
+            print("RSS ingest: skipped")
+        else:
+            ingest = await run_ingest(articles)
+            if "skipped" in ingest:
+                print(f"RSS ingest: skipped, {ingest['skipped']}")
+            else:
+                print(f"RSS ingest: {ingest.get('chunks_created', 0)} chunks from "
+                      f"{ingest.get('articles_ingested', 0)} articles in {ingest['seconds']:.2f}s")
+
+        topics = [a.title for a in articles] or ["Đánh giá điện thoại mới"]
+        topics = [topics[i % len(topics)] for i in range(args.jobs)]
+
+        started = time.perf_counter()
+        jobs = await run_jobs(topics, args.concurrency, {"length": args.length})
+        wall = time.perf_counter() - started
+
+        from llm_scheduler import scheduler
+        report(jobs, wall, dict(app.state.mock.counters), scheduler.stats())
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Recency-window retrieval on ``datas/``: pushed down vs filtered afterwards.
+
+The sample articles are indexed with publication dates spread over the
+last two years, as an RSS archive grows. For each article title the
+script asks for the top k chunks published within the window, two ways:
+
+- post-filter: search the whole archive for top k, then drop older chunks
+  (what recency handling amounted to before: it only boosted the ranking)
+- pushdown:    ``similarity_search(..., max_age_days=N)``, the window is
+               part of the Chroma query
+
+and reports how many in-window chunks each returns and the search latency.
+
+Usage:
+    python benchmarks/recency_filter_benchmark.py
+    python benchmarks/recency_filter_benchmark.py --days 7 30 90 --top-k 5
+"""
+
+import sys
+import time
+import random
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+from retrieval_benchmark import load_embedder, percentile
+
+
+def build_archive(workdir: Path, embedder, seed: int):
+    """Index the datas/ articles as RSS chunks published over the last two years."""
+    import frontmatter
+    from vector_store import VectorStore
+    from utils.parser import chunk_content
+
+    rng = random.Random(seed)
+    store = VectorStore(collection_name="recency_benchmark", persist_directory=str(workdir), embedder=embedder)
+    titles, texts, metadata = [], [], []
+    now = time.time()
+    for path in sorted((BACKEND_DIR / "datas").glob("*.md")):
+        post = frontmatter.load(path)
+        title = str(post.get("title", path.stem))
+        titles.append(title)
+        published = now - rng.uniform(0, 730) * 86400
+        for index, chunk in enumerate(chunk_content(post.content)):
+            texts.append(chunk)
+            metadata.append({"title": title, "source_type": "rss_feed", "date_ts": published, "chunk_index": index})
+    store.add_documents(texts, embedder.embed_documents(texts), metadata, [f"chunk-{i}" for i in range(len(texts))])
+    return store, titles
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, nargs="+", default=[7, 30, 90])
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    embedder, label = load_embedder()
+    print(f"Embeddings: {label}")
+    store, titles = build_archive(Path(tempfile.mkdtemp(prefix="recency_benchmark_")), embedder, args.seed)
+    # Measure the collection query, not the result cache
+    store.result_cache.max_bytes = 0
+
+    print(f"\n{len(titles)} queries, top {args.top_k}")
+    print(f"{'window':>7} {'method':<12} {'in-window chunks':>17} {'empty':>6} {'p50 ms':>8}")
+    for days in args.days:
+        cutoff = time.time() - days * 86400
+        for method in ("post-filter", "pushdown"):
+            counts, timings = [], []
+            for title in titles:
+                started = time.perf_counter()
+                if method == "pushdown":
+                    results = store.similarity_search(title, top_k=args.top_k, max_age_days=days)
+                else:
+                    results = [d for d in store.similarity_search(title, top_k=args.top_k)
+                               if d.metadata.get("date_ts", 0) >= cutoff]
+                timings.append(time.perf_counter() - started)
+                counts.append(len(results))
+            empty = sum(1 for c in counts if c == 0) / len(counts)
+            print(f"{days:>6}d {method:<12} {statistics.mean(counts):>17.2f} {empty:>6.0%} "
+                  f"{percentile(timings, 50) * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
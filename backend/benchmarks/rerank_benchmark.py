@@ -0,0 +1,124 @@
+#!/usr/bin/env python3
+"""
+Rerank time for growing candidate pools, per-candidate loop vs arrays.
+
+Candidates are chunks of the ``datas/`` articles with random relevance
+scores and publication dates from the last two years. For each pool size
+the script reports the time of:
+
+- loop:   the previous ``_rerank_results``, which parses the ISO date,
+          lowercases and splits every chunk on every query
+- arrays: ``retrieval._rerank_results`` over features stored at ingest
+          (``rank_features.with_rank_features``)
+
+and how many of the top 10 both agree on. The keyword boost now counts
+query tokens present in the chunk instead of substrings, so a few
+rankings can differ.
+
+Usage:
+    python benchmarks/rerank_benchmark.py
+    python benchmarks/rerank_benchmark.py --candidates 50 200 1000 5000 --rounds 20
+"""
+
+import sys
+import time
+import random
+import argparse
+import statistics
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import List
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+
+def load_chunks() -> List[str]:
+    import frontmatter
+    from utils.parser import chunk_content
+
+    chunks = []
+    for path in sorted((BACKEND_DIR / "datas").glob("*.md")):
+        chunks.extend(chunk_content(frontmatter.load(path).content))
+    return chunks
+
+
+def make_candidates(chunks: List[str], n: int, seed: int):
+    from models import Document
+    from rank_features import with_rank_features
+
+    rng = random.Random(seed)
+    texts = [chunks[i % len(chunks)] for i in range(n)]
+    metadata = [
+        {
+            "relevance_score": rng.random(),
+            "date": (datetime.now() - timedelta(days=rng.randint(0, 730))).isoformat(),
+        }
+        for _ in range(n)
+    ]
+    metadata = with_rank_features(texts, metadata)
+    return [Document(page_content=text, metadata=meta) for text, meta in zip(texts, metadata)]
+
+
+def loop_rerank(results, original_query: str):
+    """The previous implementation, used as the baseline."""
+    for doc in results:
+        base_score = doc.metadata.get("relevance_score", 0)
+        recency_boost = 0
+        if doc.metadata.get("date"):
+            try:
+                post_date = datetime.fromisoformat(doc.metadata["date"])
+                days_old = (datetime.now(post_date.tzinfo) - post_date).days
+                if days_old < 30:
+                    recency_boost = 0.05
+                elif days_old < 365:
+                    recency_boost = 0.02
+            except ValueError:
+                pass
+        query_terms = original_query.lower().split()
+        content_lower = doc.page_content.lower()
+        keyword_matches = sum(1 for term in query_terms if term in content_lower)
+        keyword_boost = min(keyword_matches * 0.02, 0.1)
+        content_length = len(doc.page_content.split())
+        length_boost = max(0, min(0.05, (content_length - 50) / 1000))
+        doc.metadata["final_score"] = base_score + recency_boost + keyword_boost + length_boost
+    results.sort(key=lambda x: x.metadata["final_score"], reverse=True)
+    return results
+
+
+def timed(run, rounds: int) -> float:
+    timings = []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        run()
+        timings.append(time.perf_counter() - started)
+    return statistics.median(timings)
+
+
+def main() -> None:
+    from retrieval import _rerank_results
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candidates", type=int, nargs="+", default=[20, 100, 500, 2000])
+    parser.add_argument("--query", default="Đánh giá pin camera OPPO Find X9 Pro")
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    chunks = load_chunks()
+    print(f"query: {args.query!r}")
+    print(f"{'candidates':>10} {'loop ms':>9} {'arrays ms':>10} {'speedup':>8} {'top-10 agree':>13}")
+    for n in args.candidates:
+        candidates = make_candidates(chunks, n, seed=n)
+
+        loop_time = timed(lambda: loop_rerank(list(candidates), args.query), args.rounds)
+        array_time = timed(lambda: _rerank_results(list(candidates), args.query), args.rounds)
+
+        loop_top = {id(doc) for doc in loop_rerank(list(candidates), args.query)[:10]}
+        array_top = {id(doc) for doc in _rerank_results(list(candidates), args.query)[:10]}
+        print(f"{n:>10} {loop_time * 1000:>9.3f} {array_time * 1000:>10.3f} {loop_time / array_time:>7.1f}x "
+              f"{len(loop_top & array_top):>10}/10")
+
+
+if __name__ == "__main__":
+    main()
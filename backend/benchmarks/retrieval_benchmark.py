@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Multi-query retrieval latency on the ``datas/`` corpus.
+
+Indexes the sample articles into a scratch Chroma collection, then runs the
+retrieval step of ``retrieve_relevant_context`` for each article title with
+four query variations (the shape query expansion produces), two ways:
+
+- serial: one ``similarity_search`` per query, then deduplication
+- batch:  one ``similarity_search_batch`` for all queries, merged in one step
+
+and reports latency percentiles and whether both return the same chunks.
+
+Embeddings come from the configured sentence-transformers model when it is
+available locally; otherwise a hashing model is used and the report says
+so (collection lookups are still real, the embedding cost is not). Query
+embeddings are cached by the embedder, so after warm-up both strategies
+measure collection lookups.
+
+Usage:
+    python benchmarks/retrieval_benchmark.py
+    python benchmarks/retrieval_benchmark.py --topics 40 --top-k 5 --rounds 3
+"""
+
+import re
+import sys
+import time
+import zlib
+import argparse
+import tempfile
+import statistics
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+import numpy as np
+
+
+class HashingModel:
+    """Deterministic bag-of-words embeddings, used when no embedding model is available offline."""
+
+    def __init__(self, dimensions: int = 384):
+        self.dimensions = dimensions
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                vectors[row, zlib.crc32(token.encode("utf-8")) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+def load_embedder() -> Tuple[object, str]:
+    """The configured sentence-transformers model if it loads offline, else the hashing model."""
+    from config import config
+    from embeddings import Embedder
+
+    try:
+        from sentence_transformers import SentenceTransformer
+
+        model = SentenceTransformer(config.embedding_model, local_files_only=True)
+        return Embedder(model=model), config.embedding_model
+    except Exception as e:
+        label = f"hashing fallback ({config.embedding_model} unavailable: {e.__class__.__name__})"
+        return Embedder(model=HashingModel()), label
+
+
+def build_store(workdir: Path, embedder: object):
+    """Index the datas/ articles into a scratch collection."""
+    import frontmatter
+    from vector_store import VectorStore
+    from utils.parser import chunk_content
+
+    store = VectorStore(collection_name="retrieval_benchmark", persist_directory=str(workdir), embedder=embedder)
+
+    titles, texts, metadata = [], [], []
+    for path in sorted((BACKEND_DIR / "datas").glob("*.md")):
+        post = frontmatter.load(path)
+        title = str(post.get("title", path.stem))
+        titles.append(title)
+        for index, chunk in enumerate(chunk_content(post.content)):
+            texts.append(chunk)
+            metadata.append({"title": title, "source_file": path.name, "chunk_index": index})
+
+    ids = [f"chunk-{i}" for i in range(len(texts))]
+    embeddings = embedder.embed_documents(texts)
+    store.add_documents(texts, embeddings, metadata, ids)
+    return store, titles
+
+
+def query_variations(title: str) -> List[str]:
+    """Four formulations of a topic, like query expansion returns."""
+    words = title.split("|")[0].split()
+    half = max(1, len(words) // 2)
+    return [
+        title,
+        " ".join(words[:half]),
+        " ".join(words[half:]) or title,
+        f"Đánh giá {' '.join(words[:half])}",
+    ]
+
+
+def serial_retrieval(store, queries: List[str], top_k: int) -> List:
+    """Previous behaviour: one lookup per query, then deduplicate."""
+    all_results = []
+    for query in queries:
+        all_results.extend(store.similarity_search(query, top_k=top_k))
+    seen, unique = set(), []
+    for doc in all_results:
+        key = hash(doc.page_content[:200])
+        if key not in seen:
+            seen.add(key)
+            unique.append(doc)
+    return unique
+
+
+def batch_retrieval(store, queries: List[str], top_k: int) -> List:
+    from retrieval import _merge_results
+
+    return _merge_results(store.similarity_search_batch(queries, top_k=top_k))
+
+
+def measure(run: Callable[[], List], rounds: int) -> Tuple[List[float], List]:
+    timings, result = [], []
+    for _ in range(rounds):
+        started = time.perf_counter()
+        result = run()
+        timings.append(time.perf_counter() - started)
+    return timings, result
+
+
+def percentile(values: List[float], pct: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--topics", type=int, default=30, help="Article titles used as topics")
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3, help="Timed runs per topic and strategy")
+    args = parser.parse_args()
+
+    embedder, label = load_embedder()
+    store, titles = build_store(Path(tempfile.mkdtemp(prefix="retrieval_benchmark_")), embedder)
+    print(f"Indexed {store.collection.count()} chunks from {len(titles)} articles, embeddings: {label}")
+
+    serial_times, batch_times, mismatches = [], [], 0
+    for title in titles[:args.topics]:
+        queries = query_variations(title)
+        # Warm up both paths so the first topic does not pay one-off costs
+        serial_retrieval(store, queries, args.top_k)
+        batch_retrieval(store, queries, args.top_k)
+
+        timings, serial = measure(lambda: serial_retrieval(store, queries, args.top_k), args.rounds)
+        serial_times += timings
+        timings, batch = measure(lambda: batch_retrieval(store, queries, args.top_k), args.rounds)
+        batch_times += timings
+
+        if {d.page_content for d in serial} != {d.page_content for d in batch}:
+            mismatches += 1
+
+    for name, timings in (("serial", serial_times), ("batch", batch_times)):
+        print(f"{name:<7} p50 {percentile(timings, 50) * 1000:7.2f} ms   p95 {percentile(timings, 95) * 1000:7.2f} ms   "
+              f"mean {statistics.mean(timings) * 1000:7.2f} ms")
+    speedup = statistics.mean(serial_times) / statistics.mean(batch_times)
+    print(f"Batch retrieval is {speedup:.2f}x faster; result sets differ for {mismatches} topics")
+
+
+if __name__ == "__main__":
+    main()
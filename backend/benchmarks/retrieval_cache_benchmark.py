@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""
+Search latency with and without the versioned result cache on ``datas/``.
+
+Every article title is searched (``similarity_search_batch`` with the
+expansion-sized batch of the title and three variants) for several passes,
+as API retries and RSS reruns do. The script reports per-pass latency for:
+
+- uncached: every search goes to Chroma
+- cached:   ``VectorStore.result_cache`` (the first pass fills it)
+
+then adds one chunk between passes to show that a write invalidates every
+entry, and checks that cached results match uncached ones.
+
+Usage:
+    python benchmarks/retrieval_cache_benchmark.py
+    python benchmarks/retrieval_cache_benchmark.py --passes 5 --top-k 15
+"""
+
+import sys
+import time
+import argparse
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+from retrieval_benchmark import load_embedder, percentile
+from hybrid_search_benchmark import build_store
+
+
+def run_pass(store, batches, top_k: int):
+    timings, results = [], []
+    for queries in batches:
+        started = time.perf_counter()
+        results.append(store.similarity_search_batch(queries, top_k=top_k))
+        timings.append(time.perf_counter() - started)
+    return timings, [[[d.metadata["chunk_id"] for d in docs] for docs in batch] for batch in results]
+
+
+def main() -> None:
+    from result_cache import ResultCache
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--passes", type=int, default=3)
+    parser.add_argument("--top-k", type=int, default=15, help="Chunks per query (top_k * mmr_fetch_multiplier)")
+    args = parser.parse_args()
+
+    embedder, label = load_embedder()
+    print(f"Embeddings: {label}")
+    store, articles = build_store(Path(tempfile.mkdtemp(prefix="retrieval_cache_benchmark_")), embedder)
+    batches = [[title, f"{title} review", f"{title} guide", f"{title} news"] for title, _ in articles]
+
+    print(f"\n{len(batches)} batches of {len(batches[0])} queries, top {args.top_k}")
+    print(f"{'mode':<10} {'pass':>4} {'p50 ms':>8} {'p95 ms':>8} {'hit rate':>9}")
+    reference = None
+    for mode in ("uncached", "cached"):
+        store.result_cache = ResultCache(max_bytes=0) if mode == "uncached" else ResultCache()
+        for number in range(1, args.passes + 1):
+            if mode == "cached" and number == args.passes:
+                # A write between passes: nothing cached before it is served
+                texts = ["Một đoạn văn bản mới được thêm vào bộ sưu tập."]
+                store.add_documents(texts, embedder.embed_documents(texts), [{"title": "benchmark write"}])
+            before = store.result_cache.stats()
+            timings, ids = run_pass(store, batches, args.top_k)
+            after = store.result_cache.stats()
+            lookups = (after["hits"] + after["misses"]) - (before["hits"] + before["misses"])
+            hit_rate = (after["hits"] - before["hits"]) / lookups if lookups else 0.0
+            note = " (after a write)" if mode == "cached" and number == args.passes else ""
+            print(f"{mode:<10} {number:>4} {percentile(timings, 50) * 1000:>8.2f} "
+                  f"{percentile(timings, 95) * 1000:>8.2f} {hit_rate:>9.0%}{note}")
+            if reference is None:
+                reference = ids
+            elif mode == "cached" and number < args.passes and ids != reference:
+                print("  cached results differ from uncached ones")
+
+    stats = store.result_cache.stats()
+    print(f"\nCache: {stats['entries']} entries, {stats['bytes'] / 1024:.0f} KiB")
+
+
+if __name__ == "__main__":
+    main()
@@ -17,9 +17,8 @@ from datetime import datetime
 # Add agent directory to path
 sys.path.insert(0, str(Path(__file__).parent / "agent"))
 
-from sentence_transformers import SentenceTransformer
-
 from agent.config import config
+from agent.embeddings import Embedder, embedder
 from agent.vector_store import VectorStore, VectorStoreError
 from agent.utils.parser import chunk_content, clean_markdown
 from agent.models import BlogPost
@@ -149,7 +148,7 @@ def read_markdown_file(file_path: Path) -> Dict[str, Any]:
 
 def chunk_and_embed_documents(
     md_files: List[Path],
-    embed_model: SentenceTransformer,
+    embedder: Embedder,
     chunk_size: int = 500,
     chunk_overlap: int = 50
 ) -> tuple[List[str], List[List[float]], List[Dict[str, Any]], List[str]]:
@@ -206,7 +205,7 @@ def chunk_and_embed_documents(
     
     # Generate embeddings in batch
     logger.info(f"Generating embeddings for {len(all_texts)} chunks...")
-    embeddings = embed_model.encode(
+    embeddings = embedder.embed_documents(
         all_texts,
         show_progress_bar=True,
         batch_size=32
@@ -287,7 +286,7 @@ def build_vector_store(
     # Initialize embedding model
     print(f"\n🤖 Loading embedding model: {config.embedding_model}")
     try:
-        embed_model = SentenceTransformer(config.embedding_model)
+        embedder.model
     except Exception as e:
         print(f"❌ Failed to load embedding model: {e}")
         return {"error": f"Failed to load embedding model: {e}"}
@@ -327,7 +326,7 @@ def build_vector_store(
         try:
             texts, embeddings, metadata, ids = chunk_and_embed_documents(
                 md_files,
-                embed_model,
+                embedder,
                 chunk_size=chunk_size,
                 chunk_overlap=chunk_overlap
             )
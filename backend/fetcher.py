@@ -190,7 +190,8 @@ Vui lòng phản hồi với:
             result = await self.llm_client.generate(
                 prompt,
                 system_prompt="Bạn là một chiến lược gia chủ đề blog sáng tạo, người xác định các kết nối trong tin tức và đề xuất các lời nhắc viết hấp dẫn.",
-                temperature=0.7
+                temperature=0.7,
+                route="topic_generator"
             )
             return result if result else "News Summary and Blog Topic"
         except Exception as e:
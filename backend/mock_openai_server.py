@@ -0,0 +1,547 @@
+#!/usr/bin/env python3
+"""
+OpenAI-compatible mock server for offline development and load testing.
+
+Implements ``GET /v1/models`` and ``POST /v1/chat/completions`` (including
+server-sent-event streaming) with configurable latency, error injection and
+429 rate limiting. Answers are synthesized to match what each agent parses
+(query expansions, SUMMARY/EXCERPTS, APPROVED/REJECTED verdicts, markdown
+drafts within the requested word range, JSON for ``response_format`` schemas),
+so the whole pipeline runs end to end.
+
+Modes:
+    mock    Synthesize every response (default)
+    record  Forward requests to a real upstream and save each response as a fixture
+    replay  Serve saved fixtures, falling back to synthesized answers (or a 400) on a miss
+
+Point the agents at it through the usual base URL setting:
+    python mock_openai_server.py --port 8100 --latency lognormal --latency-mean 0.8
+    OPENAI_API_BASE=http://127.0.0.1:8100/v1 OPENAI_API_KEY=mock python run_agent.py ...
+
+Recording fixtures from the real API:
+    python mock_openai_server.py --mode record --fixtures-dir fixtures/llm \\
+        --upstream-base-url https://api.openai.com/v1
+"""
+
+import re
+import sys
+import json
+import time
+import random
+import asyncio
+import hashlib
+import logging
+import argparse
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, AsyncIterator, Deque, Dict, List, Optional, Tuple
+
+import httpx
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+
+# Add agent directory to path
+sys.path.insert(0, str(Path(__file__).parent / "agent"))
+
+from agent.llm_cache import make_request_key
+from agent.tokenizer import count_tokens
+
+logger = logging.getLogger("mock_openai_server")
+
+DEFAULT_MODELS = ["gpt-4.1", "gpt-4.1-mini", "gpt-4.1-nano"]
+
+WORDS = (
+    "hiệu năng thiết kế camera pin màn hình chip giá trải nghiệm người dùng thị trường "
+    "công nghệ sản phẩm tính năng phần mềm cập nhật kết nối bảo mật điện thoại laptop "
+    "performance design battery display processor pricing experience market update "
+    "feature software security network benchmark quality review comparison"
+).split()
+
+
+@dataclass
+class MockSettings:
+    """Behaviour of the mock server."""
+
+    mode: str = "mock"  # mock, record or replay
+    models: List[str] = field(default_factory=lambda: list(DEFAULT_MODELS))
+    # Time to first token: fixed, uniform (mean +/- jitter), normal or lognormal (median mean, sigma)
+    latency: str = "fixed"
+    latency_mean: float = 0.3
+    latency_jitter: float = 0.1
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 0.0  # output speed, 0 for instant generation
+    # Occasional stalls to exercise timeouts and hedging
+    stall_rate: float = 0.0
+    stall_seconds: float = 30.0
+    # Error injection
+    error_rate: float = 0.0  # random 500s
+    rate_limit_rate: float = 0.0  # random 429s
+    retry_after: float = 1.0  # Retry-After sent with random 429s
+    requests_per_minute: int = 0  # enforced server-side limit, 0 disables
+    approve_rate: float = 1.0  # share of evaluations answered APPROVED
+    seed: Optional[int] = None
+    # Record / replay
+    fixtures_dir: Path = Path("fixtures/llm")
+    upstream_base_url: str = "https://api.openai.com/v1"
+    upstream_api_key: Optional[str] = None
+    replay_miss: str = "mock"  # mock or error
+
+
+class MockState:
+    """Counters and the rate limit window shared by all requests."""
+
+    def __init__(self, settings: MockSettings):
+        self.settings = settings
+        self.random = random.Random(settings.seed)
+        self.request_times: Deque[float] = deque()
+        self.lock = threading.Lock()
+        self.counters: Dict[str, int] = {
+            "requests": 0,
+            "streamed": 0,
+            "errors": 0,
+            "rate_limited": 0,
+            "stalls": 0,
+            "recorded": 0,
+            "replayed": 0,
+            "replay_misses": 0,
+        }
+
+    def count(self, name: str) -> None:
+        with self.lock:
+            self.counters[name] += 1
+
+    def first_token_delay(self) -> float:
+        """Sample the time to first token from the configured distribution."""
+        s = self.settings
+        if s.stall_rate and self.random.random() < s.stall_rate:
+            self.count("stalls")
+            return s.stall_seconds
+        if s.latency == "uniform":
+            delay = self.random.uniform(s.latency_mean - s.latency_jitter, s.latency_mean + s.latency_jitter)
+        elif s.latency == "normal":
+            delay = self.random.gauss(s.latency_mean, s.latency_jitter)
+        elif s.latency == "lognormal":
+            delay = self.random.lognormvariate(0.0, s.latency_sigma) * s.latency_mean
+        else:
+            delay = s.latency_mean
+        return max(0.0, delay)
+
+    def generation_time(self, completion_tokens: int) -> float:
+        if self.settings.tokens_per_second <= 0:
+            return 0.0
+        return completion_tokens / self.settings.tokens_per_second
+
+    def check_rate_limit(self) -> Optional[float]:
+        """Return seconds to wait if this request exceeds a limit, else None."""
+        s = self.settings
+        if s.rate_limit_rate and self.random.random() < s.rate_limit_rate:
+            return s.retry_after
+        if s.requests_per_minute <= 0:
+            return None
+
+        now = time.monotonic()
+        with self.lock:
+            while self.request_times and now - self.request_times[0] >= 60.0:
+                self.request_times.popleft()
+            if len(self.request_times) >= s.requests_per_minute:
+                return 60.0 - (now - self.request_times[0])
+            self.request_times.append(now)
+        return None
+
+
+def error_response(status: int, message: str, error_type: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    return JSONResponse(
+        status_code=status,
+        content={"error": {"message": message, "type": error_type, "param": None, "code": error_type}},
+        headers=headers,
+    )
+
+
+# ---------------------------------------------------------------------------
+# Synthesized answers
+# ---------------------------------------------------------------------------
+
+def _sentence(rng: random.Random, words: int) -> str:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[0].upper() + text[1:] + "."
+
+
+def _paragraph(rng: random.Random, words: int) -> str:
+    sentences = []
+    while words > 0:
+        length = min(words, rng.randint(8, 16))
+        sentences.append(_sentence(rng, length))
+        words -= length
+    return " ".join(sentences)
+
+
+def _topic(prompt: str) -> str:
+    match = re.search(r"(?:CHỦ ĐỀ|about):\s*\"?([^\n\"]+)", prompt)
+    return match.group(1).strip() if match else "Công nghệ mới"
+
+
+def _article(rng: random.Random, topic: str, words: int) -> str:
+    """Markdown post with the structure the evaluator's SEO checks look for."""
+    sections = ["Giới thiệu", "Tổng quan", "Phân tích chi tiết", "Ứng dụng thực tế", "Kết luận"]
+    per_section = max(40, words // len(sections))
+    title = f"{topic[:35]}: Hướng dẫn toàn diện"
+    parts = [f"# {title}", ""]
+    for index, section in enumerate(sections):
+        slug = re.sub(r"\W+", "-", section.lower()).strip("-")
+        parts += [f"## {section}", ""]
+        if section == "Phân tích chi tiết":
+            parts += [f"### {rng.choice(WORDS).capitalize()} và {rng.choice(WORDS)}", ""]
+        parts += [
+            f"**{rng.choice(WORDS).capitalize()}**: {_paragraph(rng, per_section - 25)} "
+            f"[{rng.choice(WORDS)}](https://example.com/{slug}).",
+            "",
+            f"- {_sentence(rng, 6)}",
+            f"- {_sentence(rng, 6)}",
+            "",
+        ]
+        if index < 3:
+            parts += [f"![{section}](https://example.com/images/{slug}.jpg)", ""]
+    return "\n".join(parts).strip()
+
+
+def synthesize_answer(state: MockState, messages: List[Dict[str, Any]], max_tokens: Optional[int]) -> str:
+    """Build an answer shaped like what the calling agent expects."""
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    # Same prompt, same answer (unless the server was seeded differently)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    rng = random.Random(f"{state.settings.seed}:{digest}")
+
+    if "search queries" in prompt:
+        topic = _topic(prompt)
+        return "\n".join(f"{topic} {_sentence(rng, 4).rstrip('.').lower()}" for _ in range(4))
+
+    if "NỘI DUNG CẦN ĐÁNH GIÁ" in prompt:
+        if state.random.random() < state.settings.approve_rate:
+            return "APPROVED\nThe draft meets the structure, length and formatting requirements."
+        return "REJECTED\n- Expand the analysis section with concrete examples\n- Tighten the conclusion"
+
+    if "CÁC ĐOẠN TRÍCH LIÊN QUAN" in prompt or "EXCERPTS" in prompt:
+        excerpts = "\n".join(f"- {_sentence(rng, 14)}" for _ in range(5))
+        return f"SUMMARY: {_paragraph(rng, 120)}\n\nEXCERPTS:\n{excerpts}"
+
+    if "KEY_THEMES" in prompt:
+        return "\n".join(
+            f"{section}: {_paragraph(rng, 30)}"
+            for section in ("KEY_THEMES", "RELEVANT_FACTS", "RELATED_TOPICS", "GAPS_IDENTIFIED", "RECOMMENDED_FOCUS")
+        )
+
+    word_range = re.search(r"(\d+)\s*-\s*(\d+)\)", prompt)
+    if word_range:
+        low, high = int(word_range.group(1)), int(word_range.group(2))
+        return _article(rng, _topic(prompt), (low + high) // 2)
+
+    return _paragraph(rng, min(150, max_tokens or 150))
+
+
+def _schema_from_request(body: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """JSON schema of a structured request: from json_schema, or the prompt for json_object."""
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        return (response_format.get("json_schema") or {}).get("schema") or {}
+    if response_format.get("type") == "json_object":
+        for message in body.get("messages") or []:
+            match = re.search(r"JSON schema[^\n]*\n(\{.*\})", str(message.get("content") or ""), re.DOTALL)
+            if match:
+                try:
+                    return json.loads(match.group(1))
+                except ValueError:
+                    pass
+        return {}
+    return None
+
+
+def synthesize_structured(state: MockState, messages: List[Dict[str, Any]], schema: Dict[str, Any]) -> str:
+    """Build a JSON answer that matches a (flat) JSON schema."""
+    prompt = "\n".join(str(m.get("content") or "") for m in messages)
+    digest = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    rng = random.Random(f"{state.settings.seed}:{digest}")
+
+    answer: Dict[str, Any] = {}
+    for name, prop in (schema.get("properties") or {}).items():
+        kind = prop.get("type")
+        if kind == "boolean":
+            # Verdict fields follow the configured approval rate
+            answer[name] = state.random.random() < state.settings.approve_rate
+        elif kind == "array":
+            answer[name] = [_sentence(rng, 10) for _ in range(rng.randint(3, 5))]
+        elif kind in ("integer", "number"):
+            answer[name] = rng.randint(1, 100)
+        else:
+            answer[name] = _paragraph(rng, 60 if name == "summary" else 20)
+    return json.dumps(answer, ensure_ascii=False)
+
+
+def truncate_to_tokens(content: str, max_tokens: Optional[int], model: str) -> Tuple[str, str]:
+    """Cut the answer to max_tokens like the real API does."""
+    if not max_tokens or count_tokens(content, model) <= max_tokens:
+        return content, "stop"
+    words = content.split(" ")
+    low, high = 0, len(words)
+    while low < high:
+        mid = (low + high + 1) // 2
+        if count_tokens(" ".join(words[:mid]), model) <= max_tokens:
+            low = mid
+        else:
+            high = mid - 1
+    return " ".join(words[:low]), "length"
+
+
+def completion_payload(model: str, content: str, finish_reason: str, prompt_tokens: int, completion_tokens: int) -> Dict[str, Any]:
+    return {
+        "id": f"chatcmpl-mock-{random.getrandbits(48):012x}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{
+            "index": 0,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": finish_reason,
+        }],
+        "usage": {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+        },
+    }
+
+
+# ---------------------------------------------------------------------------
+# Fixtures
+# ---------------------------------------------------------------------------
+
+def fixture_key(body: Dict[str, Any]) -> str:
+    return make_request_key(
+        body.get("model", ""),
+        body.get("messages", []),
+        body.get("temperature", 1.0),
+        body.get("max_tokens"),
+        body.get("response_format"),
+    )
+
+
+def load_fixture(settings: MockSettings, key: str) -> Optional[Dict[str, Any]]:
+    path = settings.fixtures_dir / f"{key}.json"
+    if not path.exists():
+        return None
+    return json.loads(path.read_text(encoding="utf-8"))["response"]
+
+
+def save_fixture(settings: MockSettings, key: str, body: Dict[str, Any], response: Dict[str, Any]) -> None:
+    settings.fixtures_dir.mkdir(parents=True, exist_ok=True)
+    request = {k: body[k] for k in ("model", "messages", "temperature", "max_tokens", "response_format") if k in body}
+    fixture = {"request": request, "response": response, "recorded_at": time.time()}
+    path = settings.fixtures_dir / f"{key}.json"
+    path.write_text(json.dumps(fixture, ensure_ascii=False, indent=2), encoding="utf-8")
+
+
+async def fetch_upstream(settings: MockSettings, body: Dict[str, Any], authorization: Optional[str]) -> httpx.Response:
+    """Send the request (non-streaming) to the real API."""
+    headers = {"Content-Type": "application/json"}
+    if settings.upstream_api_key:
+        headers["Authorization"] = f"Bearer {settings.upstream_api_key}"
+    elif authorization:
+        headers["Authorization"] = authorization
+
+    upstream_body = {k: v for k, v in body.items() if k not in ("stream", "stream_options")}
+    async with httpx.AsyncClient(base_url=settings.upstream_base_url, timeout=600) as client:
+        return await client.post("/chat/completions", json=upstream_body, headers=headers)
+
+
+# ---------------------------------------------------------------------------
+# App
+# ---------------------------------------------------------------------------
+
+async def stream_events(
+    state: MockState,
+    completion: Dict[str, Any],
+    include_usage: bool,
+    first_token_delay: float,
+) -> AsyncIterator[str]:
+    """Replay a completion as chat.completion.chunk server-sent events."""
+    model = completion["model"]
+    choice = completion["choices"][0]
+    content = choice["message"]["content"] or ""
+    base = {"id": completion["id"], "object": "chat.completion.chunk", "created": completion["created"], "model": model}
+
+    def event(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> str:
+        chunk = {**base, "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}]}
+        return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+
+    await asyncio.sleep(first_token_delay)
+    yield event({"role": "assistant", "content": ""})
+
+    # Roughly four words per chunk, paced at the configured output speed
+    pieces = re.findall(r"\S+\s*", content)
+    for start in range(0, len(pieces), 4):
+        text = "".join(pieces[start:start + 4])
+        await asyncio.sleep(state.generation_time(count_tokens(text, model)))
+        yield event({"content": text})
+
+    yield event({}, choice.get("finish_reason") or "stop")
+    if include_usage:
+        yield f"data: {json.dumps({**base, 'choices': [], 'usage': completion['usage']})}\n\n"
+    yield "data: [DONE]\n\n"
+
+
+def create_app(settings: Optional[MockSettings] = None) -> FastAPI:
+    """Build the mock API application."""
+    settings = settings or MockSettings()
+    state = MockState(settings)
+    app = FastAPI(title="Mock OpenAI API", version="1.0.0")
+    app.state.mock = state
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {
+            "object": "list",
+            "data": [{"id": m, "object": "model", "created": 0, "owned_by": "mock"} for m in settings.models],
+        }
+
+    @app.get("/mock/stats")
+    async def stats():
+        return state.counters
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        state.count("requests")
+        model = body.get("model") or settings.models[0]
+        messages = body.get("messages") or []
+        max_tokens = body.get("max_tokens") or body.get("max_completion_tokens")
+
+        if settings.mode == "mock" and model not in settings.models:
+            return error_response(404, f"The model '{model}' does not exist", "model_not_found")
+
+        wait = state.check_rate_limit()
+        if wait is not None:
+            state.count("rate_limited")
+            return error_response(
+                429,
+                "Rate limit reached for requests",
+                "rate_limit_exceeded",
+                headers={"Retry-After": f"{wait:.3f}", "retry-after-ms": str(int(wait * 1000))},
+            )
+        if settings.error_rate and state.random.random() < settings.error_rate:
+            state.count("errors")
+            return error_response(500, "The server had an error while processing your request", "server_error")
+
+        completion = None
+        key = fixture_key(body)
+        if settings.mode == "replay":
+            completion = load_fixture(settings, key)
+            if completion is not None:
+                state.count("replayed")
+            else:
+                state.count("replay_misses")
+                if settings.replay_miss == "error":
+                    # 400 rather than 404 so clients do not mistake a miss for an unknown model
+                    return error_response(400, f"No fixture recorded for request {key[:12]}", "fixture_not_found")
+        elif settings.mode == "record":
+            upstream = await fetch_upstream(settings, body, request.headers.get("authorization"))
+            if upstream.status_code != 200:
+                # Pass rate limit hints through so clients back off as they would upstream
+                headers = {k: v for k, v in upstream.headers.items() if k.lower().startswith(("retry-after", "x-ratelimit"))}
+                return JSONResponse(status_code=upstream.status_code, content=upstream.json(), headers=headers)
+            completion = upstream.json()
+            save_fixture(settings, key, body, completion)
+            state.count("recorded")
+
+        if completion is None:
+            schema = _schema_from_request(body)
+            if schema is not None:
+                content, finish_reason = synthesize_structured(state, messages, schema), "stop"
+            else:
+                content, finish_reason = truncate_to_tokens(
+                    synthesize_answer(state, messages, max_tokens), max_tokens, model
+                )
+            prompt_tokens = sum(count_tokens(str(m.get("content") or ""), model) + 4 for m in messages)
+            completion = completion_payload(model, content, finish_reason, prompt_tokens, count_tokens(content, model))
+
+        # Recorded responses already took real time upstream
+        first_token_delay = 0.0 if settings.mode == "record" else state.first_token_delay()
+
+        if body.get("stream"):
+            state.count("streamed")
+            include_usage = bool((body.get("stream_options") or {}).get("include_usage"))
+            return StreamingResponse(
+                stream_events(state, completion, include_usage, first_token_delay),
+                media_type="text/event-stream",
+            )
+
+        if settings.mode != "record":
+            await asyncio.sleep(
+                first_token_delay + state.generation_time(completion["usage"]["completion_tokens"])
+            )
+        return completion
+
+    return app
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8100)
+    parser.add_argument("--mode", choices=["mock", "record", "replay"], default="mock")
+    parser.add_argument("--models", default=",".join(DEFAULT_MODELS), help="Comma-separated model ids to serve")
+    parser.add_argument("--latency", choices=["fixed", "uniform", "normal", "lognormal"], default="fixed")
+    parser.add_argument("--latency-mean", type=float, default=0.3, help="Time to first token in seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.1, help="Spread for uniform/normal latency")
+    parser.add_argument("--latency-sigma", type=float, default=0.5, help="Sigma for lognormal latency")
+    parser.add_argument("--tokens-per-second", type=float, default=0.0, help="Output speed (0 = instant)")
+    parser.add_argument("--stall-rate", type=float, default=0.0, help="Share of requests that stall")
+    parser.add_argument("--stall-seconds", type=float, default=30.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of requests answered with 500")
+    parser.add_argument("--rate-limit-rate", type=float, default=0.0, help="Share of requests answered with 429")
+    parser.add_argument("--retry-after", type=float, default=1.0, help="Retry-After for random 429s")
+    parser.add_argument("--rpm", type=int, default=0, help="Enforce a requests-per-minute limit")
+    parser.add_argument("--approve-rate", type=float, default=1.0, help="Share of evaluations that approve")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--fixtures-dir", type=Path, default=Path("fixtures/llm"))
+    parser.add_argument("--upstream-base-url", default="https://api.openai.com/v1")
+    parser.add_argument("--upstream-api-key", default=None, help="Defaults to the caller's Authorization header")
+    parser.add_argument("--replay-miss", choices=["mock", "error"], default="mock")
+    return parser.parse_args(argv)
+
+
+def settings_from_args(args: argparse.Namespace) -> MockSettings:
+    return MockSettings(
+        mode=args.mode,
+        models=[m.strip() for m in args.models.split(",") if m.strip()],
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_jitter=args.latency_jitter,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        stall_rate=args.stall_rate,
+        stall_seconds=args.stall_seconds,
+        error_rate=args.error_rate,
+        rate_limit_rate=args.rate_limit_rate,
+        retry_after=args.retry_after,
+        requests_per_minute=args.rpm,
+        approve_rate=args.approve_rate,
+        seed=args.seed,
+        fixtures_dir=args.fixtures_dir,
+        upstream_base_url=args.upstream_base_url,
+        upstream_api_key=args.upstream_api_key,
+        replay_miss=args.replay_miss,
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    args = parse_args()
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    logger.info(f"Mock OpenAI API ({args.mode} mode) on http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(settings_from_args(args)), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,44 @@
+"""Shared test setup: the agent modules are imported the way the scripts import them."""
+
+import re
+import sys
+import zlib
+from pathlib import Path
+from typing import List
+
+import numpy as np
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "agent"))
+
+
+class HashingModel:
+    """Deterministic bag-of-words embeddings, so tests need no downloaded model."""
+
+    def __init__(self, dimensions: int = 64):
+        self.dimensions = dimensions
+
+    def encode(self, texts: List[str], **kwargs) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for token in re.findall(r"\w+", text.lower()):
+                vectors[row, zlib.crc32(token.encode("utf-8")) % self.dimensions] += 1.0
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        return vectors / np.where(norms == 0, 1.0, norms)
+
+
+@pytest.fixture
+def embedder():
+    from embeddings import Embedder
+
+    return Embedder(model=HashingModel())
+
+
+@pytest.fixture
+def vector_store(tmp_path, embedder):
+    """An empty collection in a scratch directory."""
+    from vector_store import VectorStore
+
+    return VectorStore(collection_name="test", persist_directory=str(tmp_path / "vector_db"), embedder=embedder)
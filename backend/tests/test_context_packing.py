@@ -0,0 +1,73 @@
+"""Tests for token-budgeted context packing."""
+
+import random
+
+import pytest
+
+from context_packing import _header, _knapsack, pack_context
+from models import Document
+from tokenizer import count_tokens
+
+
+def _doc(title: str, words: int, score: float, seed: int = 0) -> Document:
+    rng = random.Random(seed)
+    text = " ".join(rng.choice(["giá", "điện thoại", "camera", "pin", "màn hình", "battery", "price"]) for _ in range(words))
+    return Document(page_content=text + ".", metadata={"title": title, "final_score": score})
+
+
+@pytest.mark.parametrize("max_tokens", [40, 120, 300, 800, 2000])
+def test_packed_context_never_exceeds_budget(max_tokens):
+    rng = random.Random(max_tokens)
+    results = [
+        _doc(f"Source {rng.randrange(5)}", rng.randrange(5, 120), rng.random(), seed=i)
+        for i in range(25)
+    ]
+
+    packed = pack_context(results, max_tokens)
+
+    assert count_tokens(packed.text) <= max_tokens
+    assert packed.tokens == count_tokens(packed.text)
+    assert packed.documents
+
+
+def test_knapsack_pays_header_once_per_group():
+    # Both chunks fit only if the header is paid once: 10 + 20 + 20
+    assert _knapsack([(10, [(20, 1.0), (20, 1.0)])], 50) == [[0, 1]]
+    assert _knapsack([(10, [(20, 1.0), (20, 1.0)])], 49) == [[0]]
+
+
+def test_knapsack_header_cost_decides_between_groups():
+    # Two chunks of one source beat two equally valued chunks of two sources
+    groups = [(10, [(20, 1.0)]), (10, [(20, 1.0)]), (10, [(20, 1.0), (20, 1.0)])]
+    assert _knapsack(groups, 50) == [[], [], [0, 1]]
+
+
+def test_source_header_rendered_once_per_source():
+    results = [_doc("Shared", 20, 0.9, seed=1), _doc("Other", 20, 0.5, seed=2), _doc("Shared", 20, 0.8, seed=3)]
+
+    packed = pack_context(results, 2000)
+
+    assert len(packed.documents) == 3
+    assert packed.sources == 2
+    assert packed.text.count(_header(results[0]).strip()) == 1
+    assert packed.text.count(_header(results[1]).strip()) == 1
+
+
+def test_truncates_best_chunk_when_none_fits():
+    results = [_doc("Long", 400, 0.9, seed=1), _doc("Longer", 500, 0.5, seed=2)]
+    max_tokens = 60
+    assert all(count_tokens(doc.page_content) > max_tokens for doc in results)
+
+    packed = pack_context(results, max_tokens)
+
+    assert packed.documents == [results[0]]
+    assert packed.text.startswith(_header(results[0]).strip())
+    assert packed.text.endswith("...")
+    assert 0 < count_tokens(packed.text) <= max_tokens
+
+
+def test_empty_results():
+    packed = pack_context([], 500)
+
+    assert packed.text == ""
+    assert packed.documents == []
@@ -0,0 +1,29 @@
+"""Tests for the query expansion cache."""
+
+from expansion_cache import ExpansionCache, identifiers
+
+
+def test_identifiers_are_tokens_with_digits():
+    assert identifiers("oppo find x8 pro 2025 ra mắt") == {"x8", "2025"}
+    assert identifiers("đánh giá điện thoại") == frozenset()
+
+
+def test_reworded_query_hits(tmp_path, embedder):
+    cache = ExpansionCache(cache_dir=tmp_path, similarity=0.9, ttl=0, max_entries=0, embedder=embedder)
+    cache.set("Đánh giá Oppo Find X8", ["camera oppo find x8", "pin oppo find x8"])
+
+    assert cache.get("  ĐÁNH GIÁ oppo   find X8") == ["camera oppo find x8", "pin oppo find x8"]
+    assert cache.get("Find X8 Oppo đánh giá") == ["camera oppo find x8", "pin oppo find x8"]
+    assert cache.stats()["exact_hits"] == 1
+    assert cache.stats()["semantic_hits"] == 1
+
+
+def test_other_model_number_misses(tmp_path, embedder):
+    # Low enough that the embeddings of both topics match
+    cache = ExpansionCache(cache_dir=tmp_path, similarity=0.5, ttl=0, max_entries=0, embedder=embedder)
+    cache.set("Đánh giá Oppo Find X8", ["camera oppo find x8"])
+    cache.set("Đánh giá Oppo Find X9 2024", ["camera oppo find x9 2024"])
+
+    assert cache.get("Đánh giá Oppo Find X9") is None
+    assert cache.get("Oppo Find X9 2024 đánh giá chi tiết") == ["camera oppo find x9 2024"]
+    assert cache.stats()["misses"] == 1
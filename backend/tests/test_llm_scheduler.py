@@ -0,0 +1,134 @@
+"""Tests for LLM request admission: priority lanes and RPM/TPM buckets."""
+
+import types
+import asyncio
+
+import pytest
+
+import llm_scheduler
+from llm_scheduler import Priority, RequestScheduler
+
+
+class FakeClock:
+    """Monotonic clock that only moves when the test advances it."""
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = FakeClock()
+    monkeypatch.setattr(llm_scheduler, "time", types.SimpleNamespace(monotonic=fake))
+    return fake
+
+
+async def _settle():
+    """Let woken waiters run (listeners are resolved with call_soon)."""
+    for _ in range(10):
+        await asyncio.sleep(0)
+
+
+def test_interactive_lane_admitted_before_batch(clock):
+    async def run():
+        scheduler = RequestScheduler(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+        holder = await scheduler.acquire(100, Priority.NORMAL)
+        admitted = []
+
+        async def request(priority):
+            ticket = await scheduler.acquire(100, priority)
+            admitted.append(priority)
+            return ticket
+
+        batch = asyncio.create_task(request(Priority.BATCH))
+        await _settle()
+        interactive = asyncio.create_task(request(Priority.INTERACTIVE))
+        await _settle()
+        assert admitted == []
+        assert scheduler.stats()["queued"] == {"interactive": 1, "normal": 0, "batch": 1}
+
+        scheduler.release(holder)
+        await _settle()
+        assert admitted == [Priority.INTERACTIVE]
+
+        scheduler.release(await interactive)
+        await _settle()
+        scheduler.release(await batch)
+        return admitted
+
+    assert asyncio.run(run()) == [Priority.INTERACTIVE, Priority.BATCH]
+
+
+def test_reservation_larger_than_token_bucket_is_admitted(clock):
+    async def run():
+        scheduler = RequestScheduler(requests_per_minute=0, tokens_per_minute=1000, max_concurrency=0)
+
+        # A full bucket admits an oversized request at once, draining it
+        first = await asyncio.wait_for(scheduler.acquire(5000), timeout=1)
+        assert scheduler.tokens.tokens == 0
+
+        # The next one waits for the bucket to refill to capacity, not to 5000 tokens
+        second = asyncio.create_task(scheduler.acquire(5000))
+        await _settle()
+        assert not second.done()
+        assert scheduler.tokens.wait_time(5000) == pytest.approx(60.0)
+
+        clock.advance(60.0)
+        scheduler.release(first)
+        await _settle()
+        assert second.done()
+        scheduler.release(second.result())
+
+    asyncio.run(run())
+
+
+def test_unused_reservation_is_refunded(clock):
+    async def run():
+        scheduler = RequestScheduler(requests_per_minute=0, tokens_per_minute=1000, max_concurrency=0)
+
+        ticket = await scheduler.acquire(600)
+        assert scheduler.tokens.tokens == pytest.approx(400)
+        scheduler.release(ticket, actual_tokens=250)
+        assert scheduler.tokens.tokens == pytest.approx(750)
+
+        # Through ``slot``, the client reports usage on the ticket
+        async with scheduler.slot(300) as ticket:
+            ticket.actual_tokens = 100
+        assert scheduler.tokens.tokens == pytest.approx(650)
+
+        # Usage above the estimate is not charged again
+        ticket = await scheduler.acquire(200)
+        scheduler.release(ticket, actual_tokens=900)
+        assert scheduler.tokens.tokens == pytest.approx(450)
+
+    asyncio.run(run())
+
+
+def test_request_waits_for_refill(clock):
+    async def run():
+        scheduler = RequestScheduler(requests_per_minute=0, tokens_per_minute=600, max_concurrency=0)
+        first = await scheduler.acquire(600)
+
+        waiting = asyncio.create_task(scheduler.acquire(100))
+        await _settle()
+        assert not waiting.done()
+
+        # 600 tokens per minute refill 100 tokens in 10 seconds
+        clock.advance(9.0)
+        scheduler.release(first)
+        await _settle()
+        assert not waiting.done()
+
+        clock.advance(1.0)
+        scheduler.defer(0)
+        await _settle()
+        assert waiting.done()
+        scheduler.release(waiting.result())
+
+    asyncio.run(run())
@@ -0,0 +1,57 @@
+"""Tests for near-duplicate detection of ingested chunks."""
+
+from near_duplicates import NearDuplicateIndex
+
+STORY = (
+    "Oppo ra mắt Find X8 với camera tiềm vọng 50 MP, pin 5630 mAh và sạc nhanh 80 W. "
+    "Máy có giá từ 22,99 triệu đồng và bán ra tại Việt Nam từ cuối tháng 11."
+)
+REWORDED = STORY.replace("cuối tháng 11", "cuối tháng này")
+
+
+def _ingest(index, store, embedder, ids, texts):
+    matches = index.check(ids, texts)
+    kept = [i for i, match in enumerate(matches) if match is None]
+    if kept:
+        kept_texts = [texts[i] for i in kept]
+        store.add_documents(kept_texts, embedder.embed_documents(kept_texts), [{} for _ in kept], [ids[i] for i in kept])
+    index.commit()
+    return matches
+
+
+def test_copies_of_stored_chunks_are_skipped(tmp_path, vector_store, embedder):
+    index = NearDuplicateIndex("collection", tmp_path / "dups.sqlite3", exists=vector_store.existing_ids)
+    _ingest(index, vector_store, embedder, ["feed-a"], [STORY])
+
+    matches = _ingest(index, vector_store, embedder, ["feed-a", "feed-b"], [STORY, REWORDED])
+
+    assert matches[0] == ("feed-a", 1.0)
+    assert matches[1][0] == "feed-a"
+    assert index.canonical_id("feed-b") == "feed-a"
+
+
+def test_chunks_deleted_from_collection_no_longer_match(tmp_path, vector_store, embedder):
+    index = NearDuplicateIndex("collection", tmp_path / "dups.sqlite3", exists=vector_store.existing_ids)
+    _ingest(index, vector_store, embedder, ["feed-a"], [STORY])
+    _ingest(index, vector_store, embedder, ["feed-b"], [REWORDED])
+    assert index.stats()["linked_duplicates"] == 1
+
+    # Deleted behind the index's back, as clean_vector_store.py does
+    vector_store.delete_documents(["feed-a"])
+
+    matches = _ingest(index, vector_store, embedder, ["feed-c"], [REWORDED])
+
+    assert matches == [None]
+    assert vector_store.existing_ids(["feed-a", "feed-c"]) == {"feed-c"}
+    assert index.stats()["indexed_chunks"] == 1
+    assert index.canonical_id("feed-b") is None
+
+
+def test_remove_forgets_chunks(tmp_path):
+    index = NearDuplicateIndex("collection", tmp_path / "dups.sqlite3")
+    index.check(["feed-a"], [STORY])
+    index.commit()
+
+    index.remove(["feed-a"])
+
+    assert index.check(["feed-b"], [STORY]) == [None]
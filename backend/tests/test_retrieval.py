@@ -0,0 +1,57 @@
+"""Tests for multi-query retrieval."""
+
+import asyncio
+
+import numpy as np
+
+import retrieval
+from models import Document
+
+
+class FlakyVectorStore:
+    """Batched search that fails whenever a batch contains a query it cannot run."""
+
+    def __init__(self, failing: str):
+        self.failing = failing
+        self.batches = []
+
+    async def similarity_search_batch(self, queries, top_k, filters=None, include_embeddings=False):
+        self.batches.append(list(queries))
+        if any(self.failing in q for q in queries):
+            raise RuntimeError("query embedding failed")
+        rng = np.random.default_rng(len(self.batches))
+        return [
+            [
+                Document(
+                    page_content=f"{q} chunk {i}",
+                    metadata={"chunk_id": f"{q}-{i}", "relevance_score": 1.0 / (i + 1)},
+                    embedding=rng.normal(size=8).tolist(),
+                )
+                for i in range(top_k)
+            ]
+            for q in queries
+        ]
+
+
+def test_failed_query_keeps_results_of_the_others(monkeypatch):
+    store = FlakyVectorStore("bad")
+    monkeypatch.setattr(retrieval, "async_vector_store", store)
+
+    async def expand(query):
+        return [query, "bad variant", "other variant"]
+
+    monkeypatch.setattr(retrieval, "expand_query", expand)
+
+    results = asyncio.run(retrieval._retrieve("oppo find x8", top_k=4, expand_queries=True, filters=None))
+
+    assert store.batches[0] == ["oppo find x8", "bad variant", "other variant"]
+    assert sorted(store.batches[1:]) == [["bad variant"], ["oppo find x8"], ["other variant"]]
+    assert len(results) == 4
+    sources = {doc.metadata["chunk_id"].rsplit("-", 1)[0] for doc in results}
+    assert sources <= {"oppo find x8", "other variant"}
+
+
+def test_all_queries_failing_returns_nothing(monkeypatch):
+    monkeypatch.setattr(retrieval, "async_vector_store", FlakyVectorStore(""))
+
+    assert asyncio.run(retrieval.retrieve_relevant_context("oppo", top_k=3, expand_queries=False)) == []
@@ -0,0 +1,106 @@
+"""Tests for the per-job retrieval session."""
+
+import asyncio
+
+import pytest
+
+import retrieval_session
+from models import Document
+from retrieval_session import RetrievalSession
+
+
+class FakeVectorStore:
+    """Answers batched searches, optionally holding each one until released."""
+
+    def __init__(self, hold: bool = False, error: Exception = None):
+        self.calls = []
+        self.release = asyncio.Event() if hold else None
+        self.error = error
+
+    async def similarity_search_batch(self, queries, top_k, filters=None, include_embeddings=False):
+        self.calls.append(list(queries))
+        if self.release is not None:
+            await self.release.wait()
+        if self.error is not None:
+            raise self.error
+        return [[Document(page_content=f"{q} {i}", metadata={}) for i in range(top_k)] for q in queries]
+
+
+@pytest.fixture
+def use_store(monkeypatch):
+    def install(store):
+        monkeypatch.setattr(retrieval_session, "async_vector_store", store)
+        return store
+    return install
+
+
+def test_concurrent_searches_share_one_batch(use_store):
+    async def run():
+        store = use_store(FakeVectorStore())
+        session = RetrievalSession()
+        first, second = await asyncio.gather(session.search(["q", "r"], 10), session.search(["q"], 5))
+        return store, session, first, second
+
+    store, session, first, second = asyncio.run(run())
+
+    assert store.calls == [["q", "r"]]
+    assert [len(docs) for docs in first] == [10, 10]
+    assert [doc.page_content for doc in second[0]] == [f"q {i}" for i in range(5)]
+    assert session.stats()["search_hits"] == 1
+
+
+def test_waiter_searches_again_when_owner_is_cancelled(use_store):
+    async def run():
+        store = use_store(FakeVectorStore(hold=True))
+        session = RetrievalSession()
+        owner = asyncio.create_task(session.search(["q"], 5))
+        await asyncio.sleep(0)
+        waiter = asyncio.create_task(session.search(["q"], 5))
+        await asyncio.sleep(0)
+
+        owner.cancel()
+        await asyncio.sleep(0)
+        store.release.set()
+        results = await waiter
+        with pytest.raises(asyncio.CancelledError):
+            await owner
+        return store, results
+
+    store, results = asyncio.run(run())
+
+    assert store.calls == [["q"], ["q"]]
+    assert [doc.page_content for doc in results[0]] == [f"q {i}" for i in range(5)]
+
+
+def test_failed_search_is_shared_then_forgotten(use_store):
+    async def run():
+        store = use_store(FakeVectorStore(hold=True, error=RuntimeError("collection unavailable")))
+        session = RetrievalSession()
+        searches = asyncio.gather(session.search(["q"], 5), session.search(["q"], 5), return_exceptions=True)
+        await asyncio.sleep(0)
+        store.release.set()
+        outcomes = await searches
+        store.error = None
+        retried = await session.search(["q"], 5)
+        return store, outcomes, retried
+
+    store, outcomes, retried = asyncio.run(run())
+
+    assert all(isinstance(outcome, RuntimeError) for outcome in outcomes)
+    assert store.calls == [["q"], ["q"]]
+    assert len(retried[0]) == 5
+
+
+def test_completed_work_is_reused_under_a_new_event_loop(use_store):
+    store = FakeVectorStore()
+    session = RetrievalSession()
+
+    async def attempt():
+        use_store(store)
+        return await session.search(["q"], 5)
+
+    asyncio.run(attempt())
+    again = asyncio.run(attempt())
+
+    assert store.calls == [["q"]]
+    assert len(again[0]) == 5
@@ -0,0 +1,178 @@
+"""Tests for the persistent BM25 index and its fusion with dense search."""
+
+import math
+
+import numpy as np
+import pytest
+
+import sparse_index
+from config import config
+from models import Document
+from sparse_index import SparseIndex, decode_postings, encode_postings, tokenize
+from vector_store import VectorStore
+
+CORPUS = {
+    "a": "oppo find x8 camera zoom camera",
+    "b": "samsung galaxy camera",
+    "c": "pin sạc nhanh oppo",
+    "d": "màn hình amoled samsung galaxy galaxy",
+    "e": "giá bán oppo find x9",
+}
+
+
+def _index(tmp_path, docs=CORPUS, namespace="collection-1", name="sparse.sqlite3"):
+    index = SparseIndex(namespace, tmp_path / name, k1=1.2, b=0.75)
+    index.add(list(docs), list(docs.values()), [{"n": i} for i in range(len(docs))])
+    return index
+
+
+def _bm25(query, docs, k1=1.2, b=0.75):
+    """Reference BM25 scores computed directly from the texts."""
+    tokenized = {chunk_id: tokenize(text) for chunk_id, text in docs.items()}
+    avg_length = sum(len(tokens) for tokens in tokenized.values()) / len(tokenized)
+    scores = {}
+    for term in set(tokenize(query)):
+        df = sum(1 for tokens in tokenized.values() if term in tokens)
+        if not df:
+            continue
+        idf = math.log(1.0 + (len(docs) - df + 0.5) / (df + 0.5))
+        for chunk_id, tokens in tokenized.items():
+            tf = tokens.count(term)
+            if tf:
+                norm = k1 * (1.0 - b + b * len(tokens) / avg_length)
+                scores[chunk_id] = scores.get(chunk_id, 0.0) + idf * tf * (k1 + 1.0) / (tf + norm)
+    return scores
+
+
+def test_postings_round_trip():
+    rng = np.random.default_rng(0)
+    doc_nums = np.cumsum(rng.integers(1, 5000, size=1000))
+    freqs = rng.integers(1, 40, size=1000)
+
+    decoded_nums, decoded_freqs = decode_postings(encode_postings(doc_nums, freqs), len(doc_nums))
+
+    assert decoded_nums.tolist() == doc_nums.tolist()
+    assert decoded_freqs.tolist() == freqs.tolist()
+
+
+def test_postings_round_trip_edge_values():
+    doc_nums = np.array([1, 2, 2 ** 31, 2 ** 32 - 1], dtype=np.int64)
+    freqs = np.array([1, 70000, 3, 0xFFFF], dtype=np.int64)
+
+    decoded_nums, decoded_freqs = decode_postings(encode_postings(doc_nums, freqs), len(doc_nums))
+
+    assert decoded_nums.tolist() == doc_nums.tolist()
+    # Term frequencies saturate at 16 bits
+    assert decoded_freqs.tolist() == [1, 0xFFFF, 3, 0xFFFF]
+
+
+@pytest.mark.parametrize("query", ["oppo camera", "samsung galaxy", "find x9", "sạc nhanh"])
+def test_bm25_scores_match_reference(tmp_path, query):
+    index = _index(tmp_path)
+
+    results = index.search(query, top_k=10)
+
+    expected = _bm25(query, CORPUS)
+    assert dict(results) == pytest.approx(expected)
+    assert [score for _, score in results] == pytest.approx(sorted(expected.values(), reverse=True))
+
+
+def test_search_applies_metadata_filters(tmp_path):
+    index = _index(tmp_path)
+
+    results = index.search("oppo", top_k=10, filters={"n": {"$in": [2, 4]}})
+
+    assert {chunk_id for chunk_id, _ in results} == {"c", "e"}
+
+
+def test_deleted_chunks_are_not_returned_before_compaction(tmp_path, monkeypatch):
+    monkeypatch.setattr(sparse_index, "COMPACT_DEAD_FRACTION", 1.1)
+    index = _index(tmp_path)
+
+    assert index.delete(["a"]) == 1
+
+    assert index.stats()["dead_postings"] > 0
+    live = {k: v for k, v in CORPUS.items() if k != "a"}
+    assert dict(index.search("oppo camera", top_k=10)) == pytest.approx(_bm25("oppo camera", live))
+
+
+def test_compaction_after_deletes(tmp_path):
+    index = _index(tmp_path)
+
+    # Two of five chunks are well above the compaction threshold
+    assert index.delete(["a", "d"]) == 2
+
+    stats = index.stats()
+    live = {k: v for k, v in CORPUS.items() if k not in ("a", "d")}
+    assert stats["dead_postings"] == 0
+    assert stats["indexed_chunks"] == 3
+    assert stats["postings"] == sum(len(set(tokenize(text))) for text in live.values())
+    assert stats["postings_blocks"] == stats["terms"]
+
+    # Scores equal those of an index that never held the deleted chunks
+    fresh = _index(tmp_path, live, name="fresh.sqlite3")
+    for query in ("oppo camera", "samsung galaxy", "find"):
+        assert dict(index.search(query, top_k=10)) == pytest.approx(dict(fresh.search(query, top_k=10)))
+
+
+def test_fragmented_terms_are_merged(tmp_path):
+    index = SparseIndex("collection-1", tmp_path / "sparse.sqlite3")
+    for i in range(sparse_index.MAX_BLOCKS_PER_TERM + 3):
+        index.add([f"chunk-{i}"], [f"oppo review {i}"], [{}])
+
+    blocks = index._conn.execute("SELECT COUNT(*) FROM postings WHERE term = 'oppo'").fetchone()[0]
+    assert blocks < sparse_index.MAX_BLOCKS_PER_TERM
+    assert len(index.search("oppo", top_k=100)) == sparse_index.MAX_BLOCKS_PER_TERM + 3
+
+
+def test_index_persists_per_collection(tmp_path):
+    _index(tmp_path).close()
+
+    reopened = SparseIndex("collection-1", tmp_path / "sparse.sqlite3")
+    assert reopened.count() == len(CORPUS)
+    assert reopened.add(["a"], ["duplicate id"], [{}]) == 0
+    reopened.close()
+
+    # A recreated collection starts from an empty index
+    recreated = SparseIndex("collection-2", tmp_path / "sparse.sqlite3")
+    assert recreated.count() == 0
+    assert recreated.search("oppo", top_k=10) == []
+
+
+def _doc(chunk_id):
+    return Document(page_content=chunk_id, metadata={"chunk_id": chunk_id, "relevance_score": 0.5})
+
+
+def test_fusion_orders_by_reciprocal_rank(monkeypatch):
+    store = VectorStore.__new__(VectorStore)
+    # "d" is only in the BM25 ranking; "gone" was deleted from the collection
+    monkeypatch.setattr(store, "_get_documents", lambda ids, query: [_doc(i) for i in ids if i != "gone"], raising=False)
+    dense = [_doc("a"), _doc("b"), _doc("c")]
+    sparse = [("c", 9.0), ("gone", 8.0), ("d", 7.0), ("a", 1.0)]
+
+    fused = store._fuse(dense, sparse, "query", top_k=10)
+
+    rrf_k = config.hybrid_rrf_k
+    expected = {
+        "a": 1 / (rrf_k + 1) + 1 / (rrf_k + 4),
+        "c": 1 / (rrf_k + 3) + 1 / (rrf_k + 1),
+        "b": 1 / (rrf_k + 2),
+        "d": 1 / (rrf_k + 3),
+    }
+    assert [doc.metadata["chunk_id"] for doc in fused] == ["c", "a", "b", "d"]
+    assert {doc.metadata["chunk_id"]: doc.metadata["hybrid_score"] for doc in fused} == pytest.approx(expected)
+    assert fused[0].metadata["dense_rank"] == 3 and fused[0].metadata["sparse_rank"] == 1
+    assert "dense_rank" not in fused[3].metadata
+    assert [doc.metadata["chunk_id"] for doc in store._fuse(dense, sparse, "query", top_k=2)] == ["c", "a"]
+
+
+def test_hybrid_search_finds_exact_terms(vector_store, embedder):
+    texts = [f"{text} bài viết số {i}" for i, text in enumerate(CORPUS.values())]
+    ids = list(CORPUS)
+    vector_store.add_documents(texts, embedder.embed_documents(texts), [{"title": i} for i in ids], ids)
+
+    results = vector_store.hybrid_search("điện thoại mới", ["x9"], top_k=3)
+
+    assert results[0].metadata["chunk_id"] == "e"
+    assert results[0].metadata["sparse_rank"] == 1
+    assert all("relevance_score" in doc.metadata for doc in results)
@@ -6,7 +6,7 @@ import { useGeneration } from '@/hooks/useGeneration';
 
 export default function DashboardPage() {
   const router = useRouter();
-  const { generate, isGenerating, status, error, logs, progress } = useGeneration();
+  const { generate, isGenerating, status, error, logs, draft, progress } = useGeneration();
   
   const [formData, setFormData] = useState({
     topic: '',
@@ -232,6 +232,30 @@ export default function DashboardPage() {
                 </div>
               </div>
 
+              {/* Streaming Draft */}
+              {draft && (
+                <div className="mt-6 bg-gray-50 dark:bg-gray-900 rounded-lg border border-gray-200 dark:border-gray-700 overflow-hidden">
+                  <div className="bg-gradient-to-r from-indigo-500 to-purple-600 px-4 py-2 flex items-center justify-between">
+                    <h4 className="text-sm font-semibold text-white flex items-center gap-2">
+                      <svg className="w-4 h-4" fill="none" viewBox="0 0 24 24" stroke="currentColor">
+                        <path strokeLinecap="round" strokeLinejoin="round" strokeWidth={2} d="M11 5H6a2 2 0 00-2 2v11a2 2 0 002 2h11a2 2 0 002-2v-5m-1.414-9.414a2 2 0 112.828 2.828L11.828 15H9v-2.828l8.586-8.586z" />
+                      </svg>
+                      Live Draft
+                    </h4>
+                    <span className="text-xs font-medium text-white/90 capitalize">
+                      {draft.phase} · iteration {draft.iteration}
+                    </span>
+                  </div>
+
+                  <div className="p-4 max-h-96 overflow-y-auto custom-scrollbar">
+                    <p className="text-sm text-gray-700 dark:text-gray-300 whitespace-pre-wrap break-words">
+                      {draft.text}
+                      <span className="inline-block w-2 h-4 ml-0.5 align-text-bottom bg-indigo-500 animate-pulse"></span>
+                    </p>
+                  </div>
+                </div>
+              )}
+
               {/* Activity Logs */}
               <div className="mt-6 bg-gray-50 dark:bg-gray-900 rounded-lg border border-gray-200 dark:border-gray-700 overflow-hidden">
                 <div className="bg-gradient-to-r from-indigo-500 to-purple-600 px-4 py-2">
@@ -11,12 +11,15 @@ export function useGeneration() {
   const [status, setStatus] = useState<JobStatus | null>(null);
   const [error, setError] = useState<string | null>(null);
   const [logs, setLogs] = useState<Array<{ message: string; timestamp: string }>>([]);
+  // Draft text streamed over the WebSocket while the composer/refiner is writing
+  const [draft, setDraft] = useState<{ phase: string; iteration: number; text: string } | null>(null);
 
   // Start generation
   const generate = useCallback(async (request: GenerateRequest): Promise<void> => {
     setIsGenerating(true);
     setError(null);
     setLogs([]);
+    setDraft(null);
 
     try {
       const response = await api.generatePost(request);
@@ -70,7 +73,17 @@ export function useGeneration() {
       };
 
       ws.onmessage = (event) => {
-        const data = JSON.parse(event.data) as { message: string; timestamp: string; status?: 'queued' | 'processing' | 'completed' | 'failed'; progress?: number };
+        const data = JSON.parse(event.data) as { type?: string; phase?: string; iteration?: number; delta?: string; message: string; timestamp: string; status?: 'queued' | 'processing' | 'completed' | 'failed'; progress?: number };
+
+        if (data.type === 'delta' && data.delta) {
+          const phase = data.phase || 'composition';
+          const iteration = data.iteration || 1;
+          // A new phase or iteration starts a fresh draft
+          setDraft(prev => prev && prev.phase === phase && prev.iteration === iteration
+            ? { ...prev, text: prev.text + data.delta }
+            : { phase, iteration, text: data.delta as string });
+          return;
+        }
         
         if (data.message) {
           // Store the full log entry with timestamp
@@ -116,6 +129,7 @@ export function useGeneration() {
     setStatus(null);
     setError(null);
     setLogs([]);
+    setDraft(null);
   }, []);
 
   return {
@@ -126,6 +140,7 @@ export function useGeneration() {
     status,
     error,
     logs,
+    draft,
     progress: status?.progress || 0,
   };
 }